@@ -0,0 +1,3 @@
+"""
+Benchmarks reproducibles de los endpoints críticos del API
+"""
@@ -0,0 +1,53 @@
+"""
+Comparación de dos ejecuciones del benchmark
+
+Uso (desde backend/):
+    python -m benchmarks.compare base.json candidate.json
+"""
+
+import argparse
+import json
+
+
+def load(path: str) -> dict:
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def change(base, candidate) -> str:
+    if base in (None, 0) or candidate is None:
+        return "n/a"
+    return f"{(candidate - base) / base * 100:+.1f}%"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Comparar dos resultados de benchmark")
+    parser.add_argument("base")
+    parser.add_argument("candidate")
+    args = parser.parse_args(argv)
+
+    base, candidate = load(args.base), load(args.candidate)
+    print(f"base: {base['meta']['commit']}  candidate: {candidate['meta']['commit']}")
+    if base["meta"]["parameters"] != candidate["meta"]["parameters"]:
+        print("Advertencia: los parámetros de las ejecuciones no coinciden")
+
+    base_scenarios = {scenario["name"]: scenario for scenario in base["scenarios"]}
+    header = f"{'escenario':<28} {'req/s':>18} {'p95 ms':>18} {'p99 ms':>18} {'queries':>12}"
+    print(header)
+    print("-" * len(header))
+
+    for scenario in candidate["scenarios"]:
+        previous = base_scenarios.get(scenario["name"])
+        if not previous:
+            continue
+        print(
+            f"{scenario['name']:<28} "
+            f"{change(previous['throughput_rps'], scenario['throughput_rps']):>18} "
+            f"{change(previous['latency_ms']['p95'], scenario['latency_ms']['p95']):>18} "
+            f"{change(previous['latency_ms']['p99'], scenario['latency_ms']['p99']):>18} "
+            f"{change(previous['queries_per_request']['mean'], scenario['queries_per_request']['mean']):>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Utilidades comunes de los benchmarks: ejecución concurrente y estadísticas
+"""
+
+import asyncio
+import math
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+
+_SERVER_TIMING = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+@dataclass
+class Scenario:
+    """Escenario de carga: construye (método, ruta, cuerpo) para la iteración i"""
+    name: str
+    build_request: Callable[[int], Tuple[str, str, Optional[dict]]]
+    requests: int
+    concurrency: int
+    setup: Optional[Callable] = None
+
+
+@dataclass
+class Sample:
+    """Resultado de una petición individual"""
+    latency: float
+    status: int
+    queries: Optional[int] = None
+    db_ms: Optional[float] = None
+
+
+@dataclass
+class ScenarioResult:
+    """Resultado agregado de un escenario"""
+    name: str
+    samples: List[Sample] = field(default_factory=list)
+    wall_time: float = 0.0
+
+    def summary(self) -> dict:
+        latencies = sorted(sample.latency * 1000 for sample in self.samples)
+        errors = sum(1 for sample in self.samples if sample.status >= 400)
+        queries = [sample.queries for sample in self.samples if sample.queries is not None]
+        db_times = [sample.db_ms for sample in self.samples if sample.db_ms is not None]
+
+        return {
+            "name": self.name,
+            "requests": len(self.samples),
+            "errors": errors,
+            "wall_time_s": round(self.wall_time, 4),
+            "throughput_rps": round(len(self.samples) / self.wall_time, 2) if self.wall_time else 0.0,
+            "latency_ms": {
+                "mean": round(sum(latencies) / len(latencies), 3) if latencies else None,
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+                "max": round(latencies[-1], 3) if latencies else None,
+            },
+            "queries_per_request": {
+                "mean": round(sum(queries) / len(queries), 2) if queries else None,
+                "max": max(queries) if queries else None,
+            },
+            "db_ms_mean": round(sum(db_times) / len(db_times), 3) if db_times else None,
+        }
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return round(sorted_values[rank], 3)
+
+
+def parse_server_timing(header: Optional[str]) -> Tuple[Optional[int], Optional[float]]:
+    """Extraer consultas y tiempo de BD de la cabecera Server-Timing"""
+    if not header:
+        return None, None
+    match = _SERVER_TIMING.search(header)
+    if not match:
+        return None, None
+    return int(match.group(2)), float(match.group(1))
+
+
+async def run_scenario(client, scenario: Scenario) -> ScenarioResult:
+    """Ejecutar un escenario con un número fijo de trabajadores concurrentes"""
+    result = ScenarioResult(name=scenario.name)
+    counter = iter(range(scenario.requests))
+
+    async def worker():
+        for index in counter:
+            method, path, body = scenario.build_request(index)
+            started = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            latency = time.perf_counter() - started
+            queries, db_ms = parse_server_timing(response.headers.get("server-timing"))
+            result.samples.append(Sample(latency, response.status_code, queries, db_ms))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(scenario.concurrency)))
+    result.wall_time = time.perf_counter() - started
+    return result
@@ -0,0 +1,186 @@
+"""
+Benchmark de inserción e índice según el formato de transaction_id
+
+Compara uuid4 en texto (formato anterior), uuid4 nativo y UUIDv7 nativo
+(formato actual) insertando filas en tablas con el mismo índice único que
+`transactions.transaction_id`. Reporta el throughput por tramos, para ver cómo
+se degrada al crecer el índice, y el tamaño final del índice.
+
+Uso (desde backend/):
+    python -m benchmarks.identifiers --rows 10000000
+    python -m benchmarks.identifiers --rows 1000000 --database-url postgresql://...
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, text
+
+
+RESULTS_DIR = Path(__file__).parent / "results"
+VARIANTS = ("uuid4_text", "uuid4_native", "uuid7_native")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Inserción e índice de transaction_id por formato")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--segments", type=int, default=10, help="Tramos en los que se mide el throughput")
+    parser.add_argument("--variants", default=",".join(VARIANTS))
+    parser.add_argument("--database-url", default=None,
+                        help="Base de datos a usar (por defecto un SQLite temporal)")
+    parser.add_argument("--output", default=None, help="Archivo JSON de resultados")
+    return parser.parse_args(argv)
+
+
+def build_table(metadata: MetaData, variant: str) -> Table:
+    from database.types import UUIDString
+
+    column_type = String(36) if variant == "uuid4_text" else UUIDString
+    return Table(
+        f"bench_ids_{variant}", metadata,
+        Column("id", Integer, primary_key=True, autoincrement=False),
+        Column("transaction_id", column_type, nullable=False, unique=True, index=True),
+    )
+
+
+def make_ids(variant: str, count: int) -> list:
+    from core.ids import uuid7
+
+    if variant == "uuid7_native":
+        return [str(uuid7()) for _ in range(count)]
+    return [str(uuid.uuid4()) for _ in range(count)]
+
+
+def index_size(connection, index_name: str):
+    """Tamaño en bytes del índice, o None si el motor no permite medirlo"""
+    dialect = connection.dialect.name
+    try:
+        if dialect == "sqlite":
+            return connection.execute(
+                text("SELECT SUM(pgsize) FROM dbstat WHERE name = :name"), {"name": index_name}
+            ).scalar()
+        if dialect == "postgresql":
+            return connection.execute(
+                text("SELECT pg_relation_size(CAST(:name AS regclass))"), {"name": index_name}
+            ).scalar()
+    except Exception:
+        return None
+    return None
+
+
+def run_variant(engine, variant: str, args) -> dict:
+    metadata = MetaData()
+    table = build_table(metadata, variant)
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    # Valores ya en el formato del driver: se mide la base de datos, no la conversión en Python
+    to_driver = table.c.transaction_id.type.bind_processor(engine.dialect) or (lambda value: value)
+    placeholder = "?" if engine.dialect.paramstyle == "qmark" else "%s"
+    statement = f"INSERT INTO {table.name} (id, transaction_id) VALUES ({placeholder}, {placeholder})"
+
+    segment_rows = max(args.rows // args.segments, 1)
+    segments = []
+    inserted = 0
+    segment_started_at = 0
+    segment_elapsed = 0.0
+    total_elapsed = 0.0
+
+    try:
+        while inserted < args.rows:
+            count = min(args.batch_size, args.rows - inserted, segment_rows - segment_started_at)
+            # Los identificadores se generan fuera de la medición
+            rows = [
+                (inserted + offset + 1, to_driver(value))
+                for offset, value in enumerate(make_ids(variant, count))
+            ]
+
+            started = time.perf_counter()
+            with engine.begin() as connection:
+                connection.exec_driver_sql(statement, rows)
+            elapsed = time.perf_counter() - started
+
+            inserted += count
+            segment_started_at += count
+            segment_elapsed += elapsed
+            total_elapsed += elapsed
+
+            if segment_started_at >= segment_rows or inserted >= args.rows:
+                segments.append({
+                    "rows_total": inserted,
+                    "rows_per_s": round(segment_started_at / segment_elapsed, 1),
+                })
+                print(
+                    f"{variant:<14} {inserted:>12,} filas  {segments[-1]['rows_per_s']:>12,.0f} filas/s",
+                    file=sys.stderr,
+                )
+                segment_started_at = 0
+                segment_elapsed = 0.0
+
+        index_name = next(iter(table.indexes)).name
+        with engine.connect() as connection:
+            size = index_size(connection, index_name)
+    finally:
+        metadata.drop_all(engine)
+
+    return {
+        "variant": variant,
+        "rows": inserted,
+        "rows_per_s": round(inserted / total_elapsed, 1),
+        "segments": segments,
+        "index_bytes": size,
+        "index_bytes_per_row": round(size / inserted, 2) if size else None,
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.database_url:
+        database_url = args.database_url
+    else:
+        database_path = Path(tempfile.mkdtemp(prefix="fpv-ids-")) / "identifiers.db"
+        database_url = f"sqlite:///{database_path}"
+    engine = create_engine(database_url)
+
+    results = [run_variant(engine, variant, args) for variant in args.variants.split(",")]
+    for result in results:
+        size = f"{result['index_bytes'] / 2**20:,.1f} MiB" if result["index_bytes"] else "n/d"
+        print(
+            f"{result['variant']:<14} {result['rows_per_s']:>12,.0f} filas/s  "
+            f"último tramo {result['segments'][-1]['rows_per_s']:>12,.0f} filas/s  índice {size}",
+            file=sys.stderr,
+        )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "database": database_url.split(":", 1)[0],
+            "rows": args.rows,
+            "batch_size": args.batch_size,
+        },
+        "variants": results,
+    }
+
+    if args.output:
+        output = Path(args.output)
+    else:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / f"{datetime.utcnow():%Y%m%dT%H%M%S}-identifiers.json"
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Resultados guardados en {output}", file=sys.stderr)
+
+    if not args.database_url:
+        os.remove(database_url.replace("sqlite:///", ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Benchmark de los endpoints críticos del API
+
+Ejecuta la aplicación en proceso (cliente ASGI) o sobre HTTP real contra
+uvicorn, y guarda los resultados en JSON para compararlos entre commits.
+
+Uso (desde backend/):
+    python -m benchmarks.run --mode inprocess --transactions 20000 --concurrency 8
+    python -m benchmarks.run --mode http --workers 2 --requests 500
+    python -m benchmarks.compare benchmarks/results/a.json benchmarks/results/b.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de los endpoints críticos del API")
+    parser.add_argument("--mode", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--database-url", default=None,
+                        help="Base de datos a usar (por defecto un SQLite temporal)")
+    parser.add_argument("--transactions", type=int, default=10000,
+                        help="Transacciones históricas del usuario por defecto")
+    parser.add_argument("--requests", type=int, default=200,
+                        help="Peticiones por escenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--background-users", type=int, default=0,
+                        help="Usuarios sintéticos adicionales (commands.generate_data) para "
+                             "que el historial del usuario por defecto compita con otras filas")
+    parser.add_argument("--workers", type=int, default=1, help="Workers de uvicorn (modo http)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--scenarios", default=None,
+                        help="Lista separada por comas de escenarios a ejecutar")
+    parser.add_argument("--group-commit", action="store_true",
+                        help="Activar GROUP_COMMIT_ENABLED para comparar con el commit por petición")
+    parser.add_argument("--history-cache", action="store_true",
+                        help="Activar HISTORY_CACHE_ENABLED; sin él los escenarios de historial "
+                             "miden las consultas indexadas y no aciertos de la caché")
+    parser.add_argument("--output", default=None, help="Archivo JSON de resultados")
+    return parser.parse_args(argv)
+
+
+def git_revision() -> dict:
+    """Commit actual para poder comparar ejecuciones"""
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+        dirty = bool(subprocess.check_output(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            stderr=subprocess.DEVNULL, text=True
+        ).strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": "unknown", "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def build_scenarios(args, engine):
+    """Escenarios sobre los endpoints críticos, en orden de ejecución"""
+    from benchmarks.harness import Scenario
+    from datetime import timedelta
+    from sqlalchemy import select
+    from models.fund import Fund
+    from benchmarks.seed import create_benchmark_funds, get_active_subscription_ids, history_cursor
+
+    deep_offset = max(args.transactions - args.page_size, 0)
+    state = {"fund_ids": [], "subscription_ids": [], "cursor": None, "history_fund_id": None}
+
+    # Ventana de un día en mitad del historial (una transacción por minuto)
+    middle = datetime.utcnow().replace(microsecond=0) - timedelta(minutes=args.transactions // 2)
+    date_range = f"start_date={(middle - timedelta(hours=12)).isoformat()}&end_date={(middle + timedelta(hours=12)).isoformat()}"
+
+    def prepare_fund_filter():
+        with engine.connect() as connection:
+            state["history_fund_id"] = connection.execute(select(Fund.id).order_by(Fund.id)).scalar()
+
+    def prepare_cursor():
+        state["cursor"] = history_cursor(engine, deep_offset)
+
+    def cursor_page(i):
+        cursor = f"&cursor={state['cursor']}" if state["cursor"] else ""
+        return ("GET", f"/api/v1/transactions?limit={args.page_size}{cursor}", None)
+
+    def prepare_subscriptions():
+        state["fund_ids"] = create_benchmark_funds(engine, args.requests)
+
+    def prepare_cancellations():
+        state["subscription_ids"] = get_active_subscription_ids(engine)
+
+    scenarios = [
+        Scenario("get_funds", lambda i: ("GET", "/api/v1/funds", None),
+                 args.requests, args.concurrency),
+        Scenario("get_transactions_shallow",
+                 lambda i: ("GET", f"/api/v1/transactions?limit={args.page_size}&offset=0", None),
+                 args.requests, args.concurrency),
+        Scenario("get_transactions_deep",
+                 lambda i: ("GET", f"/api/v1/transactions?limit={args.page_size}&offset={deep_offset}", None),
+                 args.requests, args.concurrency),
+        Scenario("get_transactions_deep_cursor", cursor_page,
+                 args.requests, args.concurrency, setup=prepare_cursor),
+        Scenario("get_transactions_by_fund",
+                 lambda i: ("GET", f"/api/v1/transactions?limit={args.page_size}&fund_id={state['history_fund_id']}", None),
+                 args.requests, args.concurrency, setup=prepare_fund_filter),
+        Scenario("get_transactions_type_range",
+                 lambda i: ("GET", f"/api/v1/transactions?limit={args.page_size}&transaction_type=subscription&{date_range}", None),
+                 args.requests, args.concurrency),
+        Scenario("post_subscriptions",
+                 lambda i: ("POST", "/api/v1/subscriptions",
+                            {"fund_id": state["fund_ids"][i], "amount": 5000.0}),
+                 args.requests, args.concurrency, setup=prepare_subscriptions),
+        Scenario("get_user_subscriptions", lambda i: ("GET", "/api/v1/user/subscriptions", None),
+                 args.requests, args.concurrency),
+        Scenario("post_cancellations",
+                 lambda i: ("POST", "/api/v1/cancellations",
+                            {"subscription_id": state["subscription_ids"][i % len(state["subscription_ids"])]}),
+                 args.requests, args.concurrency, setup=prepare_cancellations),
+    ]
+
+    if args.scenarios:
+        selected = set(args.scenarios.split(","))
+        scenarios = [scenario for scenario in scenarios if scenario.name in selected]
+    return scenarios
+
+
+async def run_scenarios(client, scenarios):
+    from benchmarks.harness import run_scenario
+
+    summaries = []
+    for scenario in scenarios:
+        if scenario.setup:
+            scenario.setup()
+        # Los envíos simulados de notificaciones escriben en stdout
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            result = await run_scenario(client, scenario)
+        summary = result.summary()
+        summaries.append(summary)
+        print(
+            f"{summary['name']:<28} {summary['throughput_rps']:>9.1f} req/s  "
+            f"p50={summary['latency_ms']['p50']}ms p95={summary['latency_ms']['p95']}ms "
+            f"p99={summary['latency_ms']['p99']}ms  queries={summary['queries_per_request']['mean']}  "
+            f"errors={summary['errors']}",
+            file=sys.stderr,
+        )
+    return summaries
+
+
+def prepare_database(engine, args):
+    """Migrar el esquema y sembrar los datos por defecto, como en un despliegue"""
+    from database.migrations import upgrade_to_head
+    from database.seed import seed_defaults
+
+    upgrade_to_head(engine)
+    seed_defaults(engine)
+
+    if args.background_users:
+        from commands import generate_data
+
+        generate_data.generate(
+            generate_data.parse_args(["--users", str(args.background_users)]), engine
+        )
+
+
+async def run_inprocess(args):
+    import httpx
+    from main import app
+    from database.connection import engine
+    from benchmarks.seed import seed_history
+
+    prepare_database(engine, args)
+    async with app.router.lifespan_context(app):
+        seed_history(engine, args.transactions)
+        scenarios = build_scenarios(args, engine)
+        async with httpx.AsyncClient(app=app, base_url="http://benchmark") as client:
+            return await run_scenarios(client, scenarios)
+
+
+async def wait_for_server(client, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("uvicorn no respondió a /health a tiempo")
+
+
+async def run_http(args):
+    import httpx
+    from database.connection import engine
+    from benchmarks.seed import seed_history
+
+    # Inicializar esquema y datos antes de levantar el servidor
+    prepare_database(engine, args)
+    seed_history(engine, args.transactions)
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(args.port), "--workers", str(args.workers), "--log-level", "warning"],
+        env=os.environ.copy(),
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60.0
+        ) as client:
+            await wait_for_server(client)
+            return await run_scenarios(client, build_scenarios(args, engine))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # La configuración se lee al importar la aplicación: fijar la BD antes
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        database_path = Path(tempfile.mkdtemp(prefix="fpv-bench-")) / "benchmark.db"
+        os.environ["DATABASE_URL"] = f"sqlite:///{database_path}"
+
+    if args.group_commit:
+        os.environ["GROUP_COMMIT_ENABLED"] = "true"
+    # La caché de páginas está activa por defecto en la aplicación, no en el benchmark
+    os.environ["HISTORY_CACHE_ENABLED"] = "true" if args.history_cache else "false"
+
+    runner = run_inprocess if args.mode == "inprocess" else run_http
+    summaries = asyncio.run(runner(args))
+
+    revision = git_revision()
+    report = {
+        "meta": {
+            **revision,
+            "timestamp": datetime.utcnow().isoformat(),
+            "mode": args.mode,
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+            "python": platform.python_version(),
+            "parameters": {
+                "transactions": args.transactions,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "page_size": args.page_size,
+                "workers": args.workers if args.mode == "http" else None,
+                "group_commit": args.group_commit,
+                "history_cache": args.history_cache,
+            },
+        },
+        "scenarios": summaries,
+    }
+
+    if args.output:
+        output = Path(args.output)
+    else:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        output = RESULTS_DIR / f"{stamp}-{revision['commit']}-{args.mode}.json"
+
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Resultados guardados en {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Datos de prueba para los benchmarks
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select, update
+
+from core.ids import uuid7
+from models.fund import Fund
+from models.subscription import Subscription
+from models.transaction import Transaction
+from models.user import User
+
+
+DEFAULT_USER_EMAIL = "user@fpv.com"
+
+
+def get_default_user_id(connection) -> int:
+    """ID del usuario por defecto que usan los endpoints"""
+    return connection.execute(
+        select(User.id).where(User.email == DEFAULT_USER_EMAIL)
+    ).scalar_one()
+
+
+def seed_history(engine, transactions: int, batch_size: int = 5000) -> None:
+    """Insertar historial de transacciones del usuario por defecto"""
+    now = datetime.utcnow()
+
+    with engine.begin() as connection:
+        user_id = get_default_user_id(connection)
+        fund_ids = connection.execute(select(Fund.id).order_by(Fund.id)).scalars().all()
+
+        for start in range(0, transactions, batch_size):
+            rows = []
+            for index in range(start, min(start + batch_size, transactions)):
+                is_subscription = index % 2 == 0
+                created_at = now - timedelta(minutes=transactions - index)
+                rows.append({
+                    "transaction_id": str(uuid7(created_at)),
+                    "user_id": user_id,
+                    "fund_id": fund_ids[index % len(fund_ids)],
+                    "transaction_type": "subscription" if is_subscription else "cancellation",
+                    "amount": 100000.0,
+                    "status": "completed",
+                    "description": "Transacción de benchmark",
+                    "created_at": created_at,
+                })
+            connection.execute(insert(Transaction), rows)
+
+
+def history_cursor(engine, offset: int):
+    """Cursor equivalente a OFFSET `offset` en el historial del usuario por defecto"""
+    from services.transaction_service import encode_cursor
+
+    if offset <= 0:
+        return None
+    with engine.connect() as connection:
+        user_id = get_default_user_id(connection)
+        row = connection.execute(
+            select(Transaction.created_at, Transaction.id).where(
+                Transaction.user_id == user_id
+            ).order_by(Transaction.created_at.desc(), Transaction.id.desc()).offset(offset - 1).limit(1)
+        ).first()
+    return encode_cursor(row.created_at, row.id) if row else None
+
+
+def create_benchmark_funds(engine, count: int) -> list:
+    """Crear fondos adicionales para que cada suscripción use un fondo distinto"""
+    with engine.begin() as connection:
+        first_id = (connection.execute(select(Fund.id).order_by(Fund.id.desc())).scalar() or 0) + 1
+        connection.execute(insert(Fund), [
+            {
+                "id": first_id + index,
+                "name": f"BENCH_FUND_{first_id + index}",
+                "minimum_amount": 1000.0,
+                "category": "FIC",
+                "is_active": True,
+            }
+            for index in range(count)
+        ])
+        # Saldo suficiente para todas las suscripciones del escenario
+        connection.execute(
+            update(User).where(User.email == DEFAULT_USER_EMAIL).values(balance=count * 10000.0)
+        )
+    return list(range(first_id, first_id + count))
+
+
+def get_active_subscription_ids(engine) -> list:
+    """Suscripciones activas del usuario por defecto"""
+    with engine.connect() as connection:
+        user_id = get_default_user_id(connection)
+        return connection.execute(
+            select(Subscription.id).where(
+                Subscription.user_id == user_id,
+                Subscription.is_active == True
+            ).order_by(Subscription.id)
+        ).scalars().all()
@@ -0,0 +1,79 @@
+"""
+Medición del tiempo de arranque de la aplicación
+
+Cada repetición corre en un proceso nuevo, como un worker que reinicia
+durante un despliegue: mide la importación de `main` y el arranque del
+lifespan sobre una base ya migrada. Con --max-ms el comando termina con
+error si la mediana supera el umbral, para usarlo como control en CI.
+
+Uso (desde backend/):
+    python -m benchmarks.startup --runs 10 --max-ms 1500
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+
+PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+from main import app
+imported = time.perf_counter()
+
+async def start():
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+ready = asyncio.run(start())
+print(json.dumps({"import_ms": (imported - started) * 1000, "startup_ms": (ready - imported) * 1000}))
+"""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Medir el tiempo de arranque de la aplicación")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="Umbral para la mediana de importación + arranque")
+    args = parser.parse_args(argv)
+
+    env = os.environ.copy()
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+    else:
+        database_path = Path(tempfile.mkdtemp(prefix="fpv-startup-")) / "startup.db"
+        env["DATABASE_URL"] = f"sqlite:///{database_path}"
+
+    # El arranque solo verifica el esquema: migrar una vez antes de medir
+    subprocess.run([sys.executable, "-m", "commands.migrate"], env=env, check=True,
+                   stderr=subprocess.DEVNULL)
+
+    samples = []
+    for _ in range(args.runs):
+        output = subprocess.check_output([sys.executable, "-c", PROBE], env=env, text=True)
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    totals = [sample["import_ms"] + sample["startup_ms"] for sample in samples]
+    report = {
+        "runs": args.runs,
+        "import_ms_median": round(statistics.median(s["import_ms"] for s in samples), 2),
+        "startup_ms_median": round(statistics.median(s["startup_ms"] for s in samples), 2),
+        "total_ms_median": round(statistics.median(totals), 2),
+        "total_ms_max": round(max(totals), 2),
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.max_ms is not None and report["total_ms_median"] > args.max_ms:
+        print(f"El arranque ({report['total_ms_median']} ms) supera el umbral de {args.max_ms} ms",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark del motor de valoración diaria
+
+Crea `--positions` suscripciones activas sintéticas repartidas entre los
+fondos existentes y una serie diaria de rentabilidades para cada fondo, y
+mide por separado la carga, el cálculo vectorizado y la escritura del
+snapshot de `ValuationService.run`.
+
+Uso (desde backend/):
+    python -m benchmarks.valuation --positions 2000000
+    python -m benchmarks.valuation --positions 500000 --days 1825
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+
+RESULTS_DIR = Path(__file__).parent / "results"
+SUBSCRIPTION_COLUMNS = ("id", "user_id", "fund_id", "amount", "is_active", "subscribed_at")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Valoración de posiciones activas")
+    parser.add_argument("--positions", type=int, default=2_000_000)
+    parser.add_argument("--days", type=int, default=730, help="Historia de rentabilidades por fondo")
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=None,
+                        help="Base de datos a usar (por defecto un SQLite temporal)")
+    parser.add_argument("--output", default=None, help="Archivo JSON de resultados")
+    return parser.parse_args(argv)
+
+
+def seed_positions(engine, positions: int, valuation_date: date, days: int, batch_size: int, seed: int) -> None:
+    import numpy as np
+    from sqlalchemy import select
+    from database.bulk import BulkWriter
+    from models.fund import Fund
+    from benchmarks.seed import get_default_user_id
+
+    with engine.connect() as connection:
+        user_id = get_default_user_id(connection)
+        fund_ids = np.array(connection.execute(select(Fund.id).order_by(Fund.id)).scalars().all())
+
+    rng = np.random.default_rng(seed)
+    start = datetime.combine(valuation_date - timedelta(days=days - 1), datetime.min.time())
+    writer = BulkWriter(engine, relaxed_durability=True)
+    try:
+        for first in range(0, positions, batch_size):
+            count = min(batch_size, positions - first)
+            funds = rng.choice(fund_ids, count).tolist()
+            amounts = (rng.integers(50, 500, count) * 1000.0).tolist()
+            offsets = rng.integers(0, days * 86400, count).tolist()
+            writer.write("subscriptions", SUBSCRIPTION_COLUMNS, [
+                (first + index + 1, user_id, funds[index], amounts[index], True,
+                 start + timedelta(seconds=offsets[index]))
+                for index in range(count)
+            ])
+            writer.commit()
+        writer.reset_sequences(["subscriptions"])
+    finally:
+        writer.close()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        database_path = Path(tempfile.mkdtemp(prefix="fpv-valuation-")) / "valuation.db"
+        os.environ["DATABASE_URL"] = f"sqlite:///{database_path}"
+
+    from sqlalchemy import select
+    from commands.import_fund_returns import import_returns, synthetic_returns
+    from database.connection import SessionLocal, engine
+    from database.migrations import upgrade_to_head
+    from database.seed import seed_defaults
+    from models.fund import Fund
+    from services.valuation_service import ValuationService
+
+    upgrade_to_head(engine)
+    seed_defaults(engine)
+
+    valuation_date = date.today()
+    started = time.perf_counter()
+    with engine.connect() as connection:
+        funds = connection.execute(select(Fund.id, Fund.category)).all()
+    import_returns(engine, synthetic_returns(
+        funds, valuation_date - timedelta(days=args.days - 1), valuation_date, args.seed
+    ))
+    seed_positions(engine, args.positions, valuation_date, args.days, args.batch_size, args.seed)
+    print(f"Datos preparados en {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    db = SessionLocal()
+    try:
+        result = ValuationService(db).run(valuation_date)
+    finally:
+        db.close()
+
+    total = result["load_seconds"] + result["compute_seconds"] + result["write_seconds"]
+    print(
+        f"{result['positions']:,} posiciones en {total:.2f}s  "
+        f"(carga {result['load_seconds']:.2f}s, cálculo {result['compute_seconds']:.3f}s, "
+        f"escritura {result['write_seconds']:.2f}s)  "
+        f"{result['positions'] / result['compute_seconds']:,.0f} posiciones/s de cálculo",
+        file=sys.stderr,
+    )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+            "positions": args.positions,
+            "days": args.days,
+        },
+        "result": result,
+    }
+
+    if args.output:
+        output = Path(args.output)
+    else:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / f"{datetime.utcnow():%Y%m%dT%H%M%S}-valuation.json"
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Resultados guardados en {output}", file=sys.stderr)
+
+    if not args.database_url:
+        engine.dispose()
+        os.remove(os.environ["DATABASE_URL"].replace("sqlite:///", ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Comandos de línea de comandos para tareas operativas (python -m commands.<nombre>)
+"""
@@ -0,0 +1,63 @@
+"""
+Archivar transacciones más antiguas que la ventana de retención
+
+Pensado para ejecutarse periódicamente (cron o un CronJob) fuera de los
+workers del API. Mueve las filas por lotes a `transactions_archive`
+(particionada por mes en PostgreSQL) o a archivos NDJSON comprimidos.
+Los agregados de analítica no se modifican.
+
+Uso (desde backend/):
+    python -m commands.archive_transactions --retention-days 365
+    python -m commands.archive_transactions --target ndjson --output-dir /backups/archive
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+
+
+def main(argv=None):
+    from core.config import settings
+
+    parser = argparse.ArgumentParser(description="Archivar transacciones antiguas")
+    parser.add_argument("--retention-days", type=int, default=settings.archive_retention_days,
+                        help="Días que permanecen en la tabla caliente")
+    parser.add_argument("--target", choices=["table", "ndjson"], default="table")
+    parser.add_argument("--output-dir", default=settings.archive_dir,
+                        help="Directorio de los archivos NDJSON (--target ndjson)")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--max-chunks", type=int, default=None,
+                        help="Detenerse tras N lotes para acotar la duración de la ejecución")
+    args = parser.parse_args(argv)
+
+    from database.connection import SessionLocal
+    from services.archive_service import ArchiveService
+
+    cutoff = datetime.utcnow() - timedelta(days=args.retention_days)
+    db = SessionLocal()
+    archived = 0
+    chunks = 0
+    started = time.perf_counter()
+
+    try:
+        archive_service = ArchiveService(db)
+        while args.max_chunks is None or chunks < args.max_chunks:
+            moved = archive_service.archive_chunk(cutoff, args.chunk_size, args.target, args.output_dir)
+            if not moved:
+                break
+            archived += moved
+            chunks += 1
+            print(
+                f"Archivadas {archived:,} transacciones anteriores a {cutoff:%Y-%m-%d} "
+                f"({time.perf_counter() - started:.1f}s)",
+                file=sys.stderr,
+            )
+    finally:
+        db.close()
+
+    print(f"Total archivadas: {archived:,}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
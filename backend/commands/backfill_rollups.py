@@ -0,0 +1,117 @@
+"""
+Reconstruir los agregados de transacciones a partir del historial
+
+Recorre `transactions` y `transactions_archive` por rangos de ID, agrupa
+cada rango por día, fondo y tipo en la base de datos y suma el resultado a
+los agregados diarios y mensuales. Cada rango confirma por separado para no
+bloquear la tabla. Las filas exportadas a NDJSON ya no están en la base de
+datos: no reconstruya los agregados después de exportar.
+
+Se puede ejecutar con la aplicación en marcha. El vaciado de los agregados y
+el ID límite del recorrido se fijan en una misma transacción que espera a las
+escrituras en curso y frena las nuevas: lo confirmado antes queda por debajo
+del límite y se cuenta en el recorrido, y lo posterior queda por encima y ya
+lo suma la propia escritura. En PostgreSQL eso es un LOCK TABLE en modo
+SHARE de pocos milisegundos; en SQLite lo garantiza el bloqueo de escritura
+que toma el DELETE.
+
+Uso (desde backend/):
+    python -m commands.backfill_rollups --rebuild
+    python -m commands.backfill_rollups --rebuild --chunk-size 200000
+"""
+
+import argparse
+import sys
+import time
+from datetime import date
+
+
+def to_date(value) -> date:
+    # SQLite devuelve date() como texto, PostgreSQL como date
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def backfill(engine, chunk_size: int, rebuild: bool) -> int:
+    from sqlalchemy import delete, func, select, text
+    from models.transaction import Transaction
+    from models.transaction_archive import TransactionArchive
+    from models.transaction_rollup import TransactionRollup
+
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            # Espera a las transacciones que ya insertaron (y sumaron a los
+            # agregados) y frena las nuevas hasta fijar el límite
+            connection.execute(text(f"LOCK TABLE {Transaction.__tablename__} IN SHARE MODE"))
+        if rebuild:
+            connection.execute(delete(TransactionRollup))
+        elif connection.execute(select(func.count()).select_from(TransactionRollup)).scalar():
+            raise SystemExit(
+                "La tabla de agregados no está vacía; use --rebuild para reconstruirla desde cero"
+            )
+        # Las transacciones posteriores a este punto ya se agregan de forma incremental
+        ranges = {
+            model: connection.execute(select(func.min(model.id), func.max(model.id))).one()
+            for model in (Transaction, TransactionArchive)
+        }
+
+    # El archivo frío en tabla también forma parte del historial
+    processed = 0
+    for model, (first_id, last_id) in ranges.items():
+        if last_id is not None:
+            processed += backfill_table(engine, model, first_id, last_id, chunk_size)
+    return processed
+
+
+def backfill_table(engine, model, first_id: int, last_id: int, chunk_size: int) -> int:
+    from sqlalchemy import func, select
+    from services.analytics_service import apply_rollup_deltas
+
+    day = func.date(model.created_at)
+    processed = 0
+    started = time.perf_counter()
+
+    for low in range(first_id, last_id + 1, chunk_size):
+        high = min(low + chunk_size - 1, last_id)
+        with engine.begin() as connection:
+            rows = connection.execute(
+                select(
+                    day,
+                    model.fund_id,
+                    model.transaction_type,
+                    func.sum(model.amount),
+                    func.count()
+                ).where(
+                    model.id >= low,
+                    model.id <= high
+                ).group_by(day, model.fund_id, model.transaction_type)
+            ).all()
+
+            apply_rollup_deltas(connection, {
+                (to_date(bucket_day), fund_id, transaction_type): [amount, count]
+                for bucket_day, fund_id, transaction_type, amount, count in rows
+            })
+            processed += sum(row[4] for row in rows)
+
+        print(
+            f"{model.__tablename__}: IDs {low:,}-{high:,} de {last_id:,}  "
+            f"transacciones {processed:,}  {time.perf_counter() - started:.1f}s",
+            file=sys.stderr,
+        )
+
+    return processed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reconstruir los agregados de transacciones")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="IDs de transacción por lote")
+    parser.add_argument("--rebuild", action="store_true", help="Vaciar los agregados antes de empezar")
+    args = parser.parse_args(argv)
+
+    from database.connection import engine
+
+    processed = backfill(engine, args.chunk_size, args.rebuild)
+    print(f"Agregadas {processed:,} transacciones", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
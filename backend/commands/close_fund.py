@@ -0,0 +1,90 @@
+"""
+Cerrar un fondo y devolver el monto de todas sus suscripciones activas
+
+Desactiva el fondo y procesa sus suscripciones por lotes: cada lote cancela,
+devuelve los saldos e inserta las transacciones con sentencias masivas en una
+sola transacción, que también guarda el avance del cierre. Si el proceso se
+interrumpe basta con volver a ejecutarlo: continúa desde el último lote
+confirmado. El progreso se consulta en GET /api/v1/funds/{id}/closure.
+
+Las notificaciones de cada lote se envían en segundo plano mientras se
+procesa el siguiente, siempre después de su commit.
+
+Uso (desde backend/):
+    python -m commands.close_fund --fund-id 3
+    python -m commands.close_fund --fund-id 3 --chunk-size 5000 --no-notify
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def main(argv=None):
+    from core.config import settings
+
+    parser = argparse.ArgumentParser(description="Cerrar un fondo devolviendo sus suscripciones")
+    parser.add_argument("--fund-id", type=int, required=True, help="ID del fondo a cerrar")
+    parser.add_argument("--chunk-size", type=int, default=settings.fund_closure_chunk_size,
+                        help="Suscripciones por lote")
+    parser.add_argument("--no-notify", action="store_true", help="No enviar notificaciones")
+    args = parser.parse_args(argv)
+
+    from fastapi import HTTPException
+
+    from database.connection import SessionLocal
+    from services.fund_closure_service import FundClosureService
+    from services.notification_service import NotificationService
+
+    sender = NotificationService()
+    totals = {"subscriptions": 0, "refunded": 0, "amount": 0.0}
+    pending = []
+    started = time.perf_counter()
+
+    db = SessionLocal()
+    # Un solo hilo de envío: los lotes se notifican en orden sin frenar al siguiente
+    with ThreadPoolExecutor(max_workers=1) as notifier:
+        try:
+            service = FundClosureService(db)
+            for chunk in service.run(args.fund_id, args.chunk_size):
+                for key in totals:
+                    totals[key] += getattr(chunk, key)
+                if chunk.notifications and not args.no_notify:
+                    pending.append(notifier.submit(
+                        asyncio.run, sender.send_fund_closure_notifications(chunk.notifications)
+                    ))
+
+                elapsed = time.perf_counter() - started
+                print(
+                    f"suscripciones {totals['subscriptions']:,}  devueltas {totals['refunded']:,}  "
+                    f"COP ${totals['amount']:,.0f}  {elapsed:.1f}s "
+                    f"({totals['subscriptions'] / elapsed:,.0f} suscripciones/s)",
+                    file=sys.stderr,
+                )
+            closure = service.get_closure(args.fund_id)
+            summary = {
+                "fund_id": closure.fund_id,
+                "status": closure.status,
+                "total_subscriptions": closure.total_subscriptions,
+                "refunded_subscriptions": closure.refunded_subscriptions,
+                "refunded_amount": round(closure.refunded_amount, 2),
+            }
+        except HTTPException as e:
+            raise SystemExit(e.detail)
+        finally:
+            db.close()
+        notified = sum(future.result() for future in pending)
+
+    print(json.dumps({
+        **summary,
+        "this_run": {**totals, "amount": round(totals["amount"], 2)},
+        "notified": notified,
+        "elapsed_s": round(time.perf_counter() - started, 3),
+    }), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Generador masivo de datos sintéticos para pruebas de carga
+
+Crea usuarios, suscripciones y transacciones con distribuciones realistas
+(usuarios "calientes", popularidad sesgada de fondos y fechas repartidas en
+el tiempo). Escribe por lotes con executemany, o COPY en PostgreSQL, y es
+determinista a partir de la semilla y la fecha final.
+
+Uso (desde backend/):
+    python -m commands.generate_data --users 1000000 --seed 42
+    python -m commands.generate_data --users 50000 --avg-events 8 --funds 20
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+
+USER_COLUMNS = (
+    "id", "name", "email", "phone", "balance", "notification_preference",
+    "is_active", "created_at", "updated_at",
+)
+SUBSCRIPTION_COLUMNS = (
+    "id", "user_id", "fund_id", "amount", "is_active", "subscribed_at", "unsubscribed_at",
+)
+TRANSACTION_COLUMNS = (
+    "id", "transaction_id", "user_id", "fund_id", "transaction_type", "amount",
+    "status", "description", "created_at",
+)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generar datos sintéticos de carga")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--avg-events", type=float, default=6.0,
+                        help="Operaciones promedio (suscripciones y cancelaciones) por usuario")
+    parser.add_argument("--user-skew", type=float, default=1.6,
+                        help="Alfa de Pareto para la actividad por usuario (menor = usuarios más calientes)")
+    parser.add_argument("--fund-skew", type=float, default=1.1,
+                        help="Exponente Zipf de la popularidad de los fondos")
+    parser.add_argument("--cancel-rate", type=float, default=0.3,
+                        help="Probabilidad de que una operación sea una cancelación")
+    parser.add_argument("--funds", type=int, default=0,
+                        help="Fondos adicionales a crear además de los existentes")
+    parser.add_argument("--days", type=int, default=730, help="Ventana temporal de created_at")
+    parser.add_argument("--end-date", default=None,
+                        help="Fecha final de la ventana (YYYY-MM-DD); por defecto hoy")
+    parser.add_argument("--initial-balance", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=20000, help="Usuarios por lote")
+    parser.add_argument("--database-url", default=None)
+    return parser.parse_args(argv)
+
+
+def zipf_cumulative_weights(count: int, exponent: float):
+    """Pesos acumulados de una distribución Zipf para `random.choices`"""
+    total = 0.0
+    weights = []
+    for rank in range(1, count + 1):
+        total += 1.0 / rank ** exponent
+        weights.append(total)
+    return weights
+
+
+def next_ids(connection, tables):
+    """Siguiente ID libre por tabla, para insertar IDs explícitos sin RETURNING"""
+    from sqlalchemy import text
+
+    return {
+        table: (connection.execute(text(f"SELECT MAX(id) FROM {table}")).scalar() or 0) + 1
+        for table in tables
+    }
+
+
+def create_extra_funds(engine, count: int, rng: random.Random) -> None:
+    from sqlalchemy import insert
+    from models.fund import Fund
+
+    if count <= 0:
+        return
+    with engine.begin() as connection:
+        first_id = next_ids(connection, ["funds"])["funds"]
+        connection.execute(insert(Fund), [
+            {
+                "id": first_id + index,
+                "name": f"LOADTEST_FUND_{first_id + index}",
+                "minimum_amount": float(rng.choice([25000, 50000, 75000, 100000, 150000, 250000])),
+                "category": rng.choice(["FPV", "FIC"]),
+                "is_active": True,
+            }
+            for index in range(count)
+        ])
+
+
+def generate(args, engine) -> dict:
+    from sqlalchemy import select
+    from models.fund import Fund
+    from core.config import settings
+    from core.ids import uuid7
+    from database.bulk import BulkWriter
+
+    rng = random.Random(args.seed)
+    initial_balance = args.initial_balance or settings.initial_balance
+    end = (
+        datetime.strptime(args.end_date, "%Y-%m-%d") if args.end_date
+        else datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    )
+    window = timedelta(days=args.days).total_seconds()
+    start = end - timedelta(days=args.days)
+
+    create_extra_funds(engine, args.funds, rng)
+
+    with engine.connect() as connection:
+        funds = connection.execute(
+            select(Fund.id, Fund.name, Fund.minimum_amount).where(Fund.is_active == True).order_by(Fund.id)
+        ).all()
+        ids = next_ids(connection, ["users", "subscriptions", "transactions"])
+
+    if not funds:
+        raise SystemExit("No hay fondos activos: ejecute primero la inicialización de la base de datos")
+
+    # El orden de popularidad de los fondos también depende de la semilla
+    funds = list(funds)
+    rng.shuffle(funds)
+    fund_weights = zipf_cumulative_weights(len(funds), args.fund_skew)
+
+    # Media de Pareto = alfa / (alfa - 1): escalar para obtener el promedio pedido
+    pareto_mean = args.user_skew / (args.user_skew - 1) if args.user_skew > 1 else 1.0
+    event_scale = args.avg_events / pareto_mean
+
+    writer = BulkWriter(engine, relaxed_durability=True)
+    totals = {"users": 0, "subscriptions": 0, "transactions": 0}
+    user_rows, subscription_rows, transaction_rows = [], [], []
+    user_id, subscription_id, transaction_id = ids["users"], ids["subscriptions"], ids["transactions"]
+    started = time.perf_counter()
+
+    def flush():
+        writer.write("users", USER_COLUMNS, user_rows)
+        writer.write("subscriptions", SUBSCRIPTION_COLUMNS, subscription_rows)
+        writer.write("transactions", TRANSACTION_COLUMNS, transaction_rows)
+        writer.commit()
+        totals["users"] += len(user_rows)
+        totals["subscriptions"] += len(subscription_rows)
+        totals["transactions"] += len(transaction_rows)
+        user_rows.clear()
+        subscription_rows.clear()
+        transaction_rows.clear()
+
+        elapsed = time.perf_counter() - started
+        print(
+            f"usuarios {totals['users']:,}/{args.users:,} ({totals['users'] / args.users:.1%})  "
+            f"suscripciones {totals['subscriptions']:,}  transacciones {totals['transactions']:,}  "
+            f"{elapsed:.1f}s ({totals['users'] / elapsed:,.0f} usuarios/s)",
+            file=sys.stderr,
+        )
+
+    try:
+        for _ in range(args.users):
+            signup = start + timedelta(seconds=rng.random() * window * 0.5)
+            balance = initial_balance
+            active = {}  # fund_id -> (fila de suscripción, monto)
+
+            events = int(rng.paretovariate(args.user_skew) * event_scale)
+            remaining = (end - signup).total_seconds()
+            times = sorted(signup + timedelta(seconds=rng.random() * remaining) for _ in range(events))
+
+            for created_at in times:
+                if active and rng.random() < args.cancel_rate:
+                    fund_id = rng.choice(list(active))
+                else:
+                    fund_id, fund_name, minimum = rng.choices(funds, cum_weights=fund_weights)[0]
+
+                if fund_id in active:
+                    row, amount = active.pop(fund_id)
+                    row[4] = False
+                    row[6] = created_at
+                    balance += amount
+                    transaction_type = "cancellation"
+                    description = "Cancelación de suscripción a fondo"
+                else:
+                    amount = float(round(minimum * (1 + rng.expovariate(2.0)), -3))
+                    if amount > balance:
+                        continue
+                    row = [subscription_id, user_id, fund_id, amount, True, created_at, None]
+                    subscription_rows.append(row)
+                    active[fund_id] = (row, amount)
+                    subscription_id += 1
+                    balance -= amount
+                    transaction_type = "subscription"
+                    description = "Suscripción a fondo"
+
+                transaction_rows.append((
+                    transaction_id,
+                    uuid7(created_at, rng),
+                    user_id, fund_id, transaction_type, amount,
+                    "completed", description, created_at,
+                ))
+                transaction_id += 1
+
+            user_rows.append((
+                user_id, f"Usuario Carga {user_id}", f"loadtest.user{user_id}@fpv.test",
+                f"+57300{user_id % 10000000:07d}", balance,
+                "sms" if rng.random() < 0.2 else "email", True, signup, signup,
+            ))
+            user_id += 1
+
+            if len(user_rows) >= args.chunk_size:
+                flush()
+
+        if user_rows:
+            flush()
+        writer.reset_sequences(["users", "subscriptions", "transactions", "funds"])
+    finally:
+        writer.close()
+
+    totals["elapsed_s"] = round(time.perf_counter() - started, 2)
+    return totals
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.database_url:
+        import os
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from database.connection import engine
+    from database.migrations import upgrade_to_head
+    from database.seed import seed_defaults
+
+    upgrade_to_head(engine)
+    seed_defaults(engine)
+    totals = generate(args, engine)
+    print(
+        f"Generados {totals['users']:,} usuarios, {totals['subscriptions']:,} suscripciones y "
+        f"{totals['transactions']:,} transacciones en {totals['elapsed_s']}s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
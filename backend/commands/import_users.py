@@ -0,0 +1,96 @@
+"""
+Carga masiva de usuarios desde un archivo
+
+Acepta CSV (columnas name, email, phone y opcionalmente
+notification_preference), NDJSON/JSONL (un usuario por línea) o un arreglo
+JSON. Usa la misma ruta que POST /users/bulk: por lote, una consulta de
+emails ya registrados y un solo INSERT, confirmado antes del siguiente lote.
+Los usuarios no creados se escriben en un reporte CSV con su posición en el
+archivo (desde 0, sin contar encabezado ni líneas vacías).
+
+Uso (desde backend/):
+    python -m commands.import_users --file clientes.csv
+    python -m commands.import_users --file clientes.ndjson --chunk-size 2000 --errors errores.csv
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+
+
+ERROR_COLUMNS = ("index", "email", "status", "error")
+
+
+def read_users(path: Path):
+    """Usuarios del archivo según su extensión, sin cargarlo entero salvo en JSON"""
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as source:
+            for row in csv.DictReader(source):
+                # Celdas vacías: que apliquen los valores por defecto del schema
+                yield {column: value for column, value in row.items() if value not in ("", None)}
+    elif suffix in (".ndjson", ".jsonl"):
+        with open(path, "rb") as source:
+            for line in source:
+                if line.strip():
+                    yield line
+    elif suffix == ".json":
+        with open(path, encoding="utf-8") as source:
+            yield from json.load(source)
+    else:
+        raise SystemExit(f"Formato no soportado: {suffix} (use .csv, .ndjson, .jsonl o .json)")
+
+
+def main(argv=None):
+    from core.config import settings
+
+    parser = argparse.ArgumentParser(description="Crear usuarios en lote desde un archivo")
+    parser.add_argument("--file", required=True, type=Path)
+    parser.add_argument("--chunk-size", type=int, default=settings.bulk_users_chunk_size)
+    parser.add_argument("--errors", type=Path, default=None, help="Reporte CSV de usuarios no creados")
+    args = parser.parse_args(argv)
+
+    from database.connection import SessionLocal
+    from services.user_service import UserService
+
+    errors_path = args.errors or args.file.with_name(f"{args.file.stem}-errores.csv")
+    totals = {"processed": 0, "created": 0, "duplicates": 0, "invalid": 0}
+    started = time.perf_counter()
+
+    db = SessionLocal()
+    try:
+        with open(errors_path, "w", newline="") as report:
+            writer = csv.DictWriter(report, fieldnames=ERROR_COLUMNS)
+            writer.writeheader()
+
+            for chunk in UserService(db).import_users(read_users(args.file), args.chunk_size):
+                totals["processed"] += chunk.created + chunk.duplicates + chunk.invalid
+                totals["created"] += chunk.created
+                totals["duplicates"] += chunk.duplicates
+                totals["invalid"] += chunk.invalid
+                writer.writerows(error.model_dump() for error in chunk.errors)
+
+                elapsed = time.perf_counter() - started
+                print(
+                    f"procesados {totals['processed']:,}  creados {totals['created']:,}  "
+                    f"duplicados {totals['duplicates']:,}  inválidos {totals['invalid']:,}  "
+                    f"{elapsed:.1f}s ({totals['processed'] / elapsed:,.0f} usuarios/s)",
+                    file=sys.stderr,
+                )
+    finally:
+        db.close()
+
+    print(
+        f"Creados {totals['created']:,} de {totals['processed']:,} usuarios en "
+        f"{time.perf_counter() - started:.1f}s. Errores en {errors_path}",
+        file=sys.stderr,
+    )
+    if totals["created"] < totals["processed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Aplicar migraciones del esquema y sembrar los datos por defecto
+
+Paso único de despliegue: se ejecuta una vez antes de arrancar los workers.
+
+Uso (desde backend/):
+    python -m commands.migrate
+    python -m commands.migrate --no-seed
+"""
+
+import argparse
+import sys
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrar el esquema y sembrar datos por defecto")
+    parser.add_argument("--no-seed", action="store_true", help="No crear fondos ni usuario por defecto")
+    args = parser.parse_args(argv)
+
+    from database.connection import engine
+    from database.migrations import upgrade_to_head
+    from database.seed import seed_defaults
+
+    revision = upgrade_to_head(engine)
+    print(f"Esquema en la revisión {revision}", file=sys.stderr)
+
+    if not args.no_seed:
+        seed_defaults(engine)
+        print("Datos por defecto verificados", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Conciliar el saldo de cada usuario con su historial de transacciones
+
+Verifica que `users.balance` sea igual a
+`saldo inicial - suscripciones - aportes + cancelaciones`, sumando `transactions` y
+`transactions_archive`. El espacio de IDs de usuario se divide en rangos que
+procesa un pool de procesos; cada rango se resuelve con una sola consulta
+agrupada por usuario. Las diferencias se escriben en un reporte CSV a medida
+que terminan los rangos y, con `--fix`, se corrigen.
+
+La corrección solo se aplica si el saldo sigue siendo el que se leyó, así que
+una escritura concurrente nunca se pisa: ese usuario queda como no corregido
+para la siguiente pasada. Las transacciones exportadas a NDJSON ya no están
+en la base de datos y aparecerían como diferencias.
+
+Uso (desde backend/):
+    python -m commands.reconcile_balances
+    python -m commands.reconcile_balances --workers 8 --range-size 50000 --fix
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+
+REPORT_COLUMNS = ("user_id", "balance", "expected", "difference", "fixed")
+
+# Engine propio de cada proceso del pool
+_engine = None
+
+
+def _init_worker(database_url: str) -> None:
+    global _engine
+    from sqlalchemy import create_engine
+
+    _engine = create_engine(database_url)
+
+
+def balance_query(low: int, high: int):
+    """Saldo actual y flujo neto de transacciones de los usuarios con ID en [low, high]"""
+    from sqlalchemy import case, func, select, union_all
+    from models.transaction import Transaction
+    from models.transaction_archive import TransactionArchive
+    from models.user import User
+
+    def flows(model):
+        return select(
+            model.user_id,
+            case((model.transaction_type == "cancellation", model.amount), else_=-model.amount).label("delta")
+        ).where(
+            model.user_id >= low,
+            model.user_id <= high,
+            model.status == "completed"
+        )
+
+    history = union_all(flows(Transaction), flows(TransactionArchive)).subquery()
+    totals = select(
+        history.c.user_id, func.sum(history.c.delta).label("delta")
+    ).group_by(history.c.user_id).subquery()
+
+    return select(
+        User.id, User.balance, func.coalesce(totals.c.delta, 0.0)
+    ).outerjoin(
+        totals, totals.c.user_id == User.id
+    ).where(
+        User.id >= low,
+        User.id <= high
+    )
+
+
+def reconcile_range(low: int, high: int, initial_balance: float, tolerance: float, fix: bool):
+    """Conciliar un rango de usuarios; devuelve (usuarios revisados, diferencias)"""
+    from sqlalchemy import update
+    from models.user import User
+    from services.cache_service import bump_versions, user_key
+
+    with _engine.connect() as connection:
+        rows = connection.execute(balance_query(low, high)).all()
+
+    mismatches = []
+    for user_id, balance, delta in rows:
+        expected = round(initial_balance + delta, 2)
+        if abs(balance - expected) > tolerance:
+            mismatches.append({
+                "user_id": user_id,
+                "balance": balance,
+                "expected": expected,
+                "difference": round(balance - expected, 2),
+                "fixed": False,
+            })
+
+    if fix and mismatches:
+        with _engine.begin() as connection:
+            fixed = []
+            for mismatch in mismatches:
+                # Solo si nadie ha escrito desde la lectura
+                result = connection.execute(
+                    update(User).where(
+                        User.id == mismatch["user_id"],
+                        User.balance == mismatch["balance"]
+                    ).values(balance=mismatch["expected"], updated_at=datetime.utcnow())
+                )
+                if result.rowcount == 1:
+                    mismatch["fixed"] = True
+                    fixed.append(mismatch["user_id"])
+            bump_versions(connection, [user_key(user_id) for user_id in fixed])
+
+    return len(rows), mismatches
+
+
+def user_ranges(engine, range_size: int):
+    from sqlalchemy import func, select
+    from models.user import User
+
+    with engine.connect() as connection:
+        first_id, last_id = connection.execute(select(func.min(User.id), func.max(User.id))).one()
+    if last_id is None:
+        return []
+    return [(low, min(low + range_size - 1, last_id)) for low in range(first_id, last_id + 1, range_size)]
+
+
+def reconcile(database_url: str, workers: int, range_size: int, initial_balance: float,
+              tolerance: float, fix: bool, output: Path) -> dict:
+    from sqlalchemy import create_engine
+
+    engine = create_engine(database_url)
+    ranges = user_ranges(engine, range_size)
+    # Ninguna conexión del proceso principal debe heredarse en los procesos del pool
+    engine.dispose()
+
+    checked = found = fixed = 0
+    started = time.perf_counter()
+
+    with open(output, "w", newline="") as report, ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(database_url,)
+    ) as executor:
+        writer = csv.DictWriter(report, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+
+        futures = [
+            executor.submit(reconcile_range, low, high, initial_balance, tolerance, fix)
+            for low, high in ranges
+        ]
+        for done, future in enumerate(as_completed(futures), start=1):
+            range_checked, mismatches = future.result()
+            checked += range_checked
+            found += len(mismatches)
+            fixed += sum(1 for mismatch in mismatches if mismatch["fixed"])
+            writer.writerows(mismatches)
+            report.flush()
+
+            print(
+                f"rangos {done:,}/{len(ranges):,}  usuarios {checked:,}  diferencias {found:,}  "
+                f"corregidas {fixed:,}  {time.perf_counter() - started:.1f}s",
+                file=sys.stderr,
+            )
+
+    return {"checked": checked, "mismatches": found, "fixed": fixed, "seconds": time.perf_counter() - started}
+
+
+def main(argv=None):
+    from core.config import settings
+
+    parser = argparse.ArgumentParser(description="Conciliar saldos con el historial de transacciones")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--range-size", type=int, default=50000, help="IDs de usuario por rango")
+    parser.add_argument("--initial-balance", type=float, default=settings.initial_balance)
+    parser.add_argument("--tolerance", type=float, default=0.01,
+                        help="Diferencia máxima aceptada por redondeo")
+    parser.add_argument("--fix", action="store_true", help="Corregir los saldos con diferencias")
+    parser.add_argument("--output", default=None, help="Reporte CSV de diferencias")
+    args = parser.parse_args(argv)
+
+    output = Path(args.output or f"reconciliation-{datetime.utcnow():%Y%m%dT%H%M%S}.csv")
+    result = reconcile(
+        settings.database_url, args.workers, args.range_size,
+        args.initial_balance, args.tolerance, args.fix, output
+    )
+
+    print(
+        f"Revisados {result['checked']:,} usuarios en {result['seconds']:.1f}s: "
+        f"{result['mismatches']:,} diferencias, {result['fixed']:,} corregidas. Reporte en {output}",
+        file=sys.stderr,
+    )
+
+    # Código de salida distinto de cero si quedan saldos sin conciliar (útil en cron)
+    if result["mismatches"] > result["fixed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
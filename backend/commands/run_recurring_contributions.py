@@ -0,0 +1,83 @@
+"""
+Cobrar los aportes periódicos programados vencidos
+
+Pensado para ejecutarse una vez al día. Procesa por lotes de usuarios todas
+las programaciones con `next_run_on` hasta la fecha indicada: cada lote se
+valida y se escribe con sentencias masivas en una sola transacción, que
+también avanza la próxima fecha de cada programación. Si el proceso se
+interrumpe basta con volver a ejecutarlo con la misma fecha: los lotes ya
+confirmados no se cobran de nuevo.
+
+Las notificaciones de cada lote se envían en segundo plano mientras se
+procesa el siguiente. Son posteriores al commit: si el proceso muere antes de
+enviarlas, esos avisos se pierden, pero nunca se avisa de un cobro que no se
+confirmó.
+
+Uso (desde backend/):
+    python -m commands.run_recurring_contributions
+    python -m commands.run_recurring_contributions --date 2026-11-05 --chunk-size 1000
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+
+def main(argv=None):
+    from core.config import settings
+
+    parser = argparse.ArgumentParser(description="Cobrar los aportes programados vencidos")
+    parser.add_argument("--date", type=date.fromisoformat, default=date.today(),
+                        help="Fecha de ejecución: se cobran las programaciones vencidas hasta ese día")
+    parser.add_argument("--chunk-size", type=int, default=settings.recurring_contributions_chunk_size,
+                        help="Usuarios por lote")
+    parser.add_argument("--no-notify", action="store_true", help="No enviar notificaciones")
+    args = parser.parse_args(argv)
+
+    from database.connection import SessionLocal
+    from services.notification_service import NotificationService
+    from services.recurring_contribution_service import RecurringContributionService
+
+    sender = NotificationService()
+    totals = {"users": 0, "schedules": 0, "charged": 0, "insufficient_funds": 0, "deactivated": 0, "amount": 0.0}
+    pending = []
+    started = time.perf_counter()
+
+    db = SessionLocal()
+    # Un solo hilo de envío: los lotes se notifican en orden sin frenar al siguiente
+    with ThreadPoolExecutor(max_workers=1) as notifier:
+        try:
+            for chunk in RecurringContributionService(db).run_due(args.date, args.chunk_size):
+                for key in totals:
+                    totals[key] += getattr(chunk, key)
+                if chunk.notifications and not args.no_notify:
+                    pending.append(notifier.submit(
+                        asyncio.run, sender.send_contribution_notifications(chunk.notifications)
+                    ))
+
+                elapsed = time.perf_counter() - started
+                print(
+                    f"usuarios {totals['users']:,}  cobrados {totals['charged']:,}  "
+                    f"sin saldo {totals['insufficient_funds']:,}  desactivados {totals['deactivated']:,}  "
+                    f"{elapsed:.1f}s ({totals['schedules'] / elapsed:,.0f} programaciones/s)",
+                    file=sys.stderr,
+                )
+        finally:
+            db.close()
+        notified = sum(future.result() for future in pending)
+
+    totals["amount"] = round(totals["amount"], 2)
+    print(json.dumps({
+        "date": args.date.isoformat(),
+        **totals,
+        "notified": notified,
+        "elapsed_s": round(time.perf_counter() - started, 3),
+    }), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
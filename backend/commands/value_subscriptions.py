@@ -0,0 +1,38 @@
+"""
+Valorar a precios de mercado todas las suscripciones activas
+
+Pensado para ejecutarse una vez al día tras cargar las rentabilidades del
+día (commands.import_fund_returns). Reemplaza el snapshot de la fecha en
+`subscription_valuations`; `/user/subscriptions` muestra el más reciente.
+
+Uso (desde backend/):
+    python -m commands.value_subscriptions
+    python -m commands.value_subscriptions --date 2026-10-18
+"""
+
+import argparse
+import json
+import sys
+from datetime import date
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Valorar las suscripciones activas")
+    parser.add_argument("--date", type=date.fromisoformat, default=date.today(),
+                        help="Fecha de valoración (cierre del día)")
+    args = parser.parse_args(argv)
+
+    from database.connection import SessionLocal
+    from services.valuation_service import ValuationService
+
+    db = SessionLocal()
+    try:
+        result = ValuationService(db).run(args.date)
+    finally:
+        db.close()
+
+    print(json.dumps(result), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,67 @@ class Settings(BaseSettings):
     app_name: str = Field(default="FPV Management System", env="APP_NAME")
     debug: bool = Field(default=True, env="DEBUG")
     initial_balance: float = Field(default=500000.0, env="INITIAL_BALANCE")
+    seed_on_startup: bool = Field(default=False, env="SEED_ON_STARTUP")
+    
+    # Archive
+    archive_retention_days: int = Field(default=365, env="ARCHIVE_RETENTION_DAYS")
+    archive_dir: str = Field(default="./archive", env="ARCHIVE_DIR")
+    
+    # Group commit de suscripciones y cancelaciones
+    group_commit_enabled: bool = Field(default=False, env="GROUP_COMMIT_ENABLED")
+    group_commit_max_batch: int = Field(default=64, env="GROUP_COMMIT_MAX_BATCH")
+    group_commit_max_delay_ms: float = Field(default=5.0, env="GROUP_COMMIT_MAX_DELAY_MS")
+    
+    # Stream de eventos (SSE)
+    events_queue_size: int = Field(default=100, env="EVENTS_QUEUE_SIZE")
+    events_keepalive_seconds: float = Field(default=15.0, env="EVENTS_KEEPALIVE_SECONDS")
+    
+    # Cache
+    cache_enabled: bool = Field(default=True, env="CACHE_ENABLED")
+    cache_listen_notify: bool = Field(default=True, env="CACHE_LISTEN_NOTIFY")
+    history_cache_enabled: bool = Field(default=True, env="HISTORY_CACHE_ENABLED")
+    history_cache_max_bytes: int = Field(default=16 * 1024 * 1024, env="HISTORY_CACHE_MAX_BYTES")
+    profile_cache_max_bytes: int = Field(default=8 * 1024 * 1024, env="PROFILE_CACHE_MAX_BYTES")
+    single_flight_enabled: bool = Field(default=True, env="SINGLE_FLIGHT_ENABLED")
+    
+    # Observability
+    metrics_enabled: bool = Field(default=True, env="METRICS_ENABLED")
+    sql_instrumentation_enabled: bool = Field(default=True, env="SQL_INSTRUMENTATION_ENABLED")
+    sql_n_plus_one_threshold: int = Field(default=5, env="SQL_N_PLUS_ONE_THRESHOLD")
+    sql_n_plus_one_raise: bool = Field(default=False, env="SQL_N_PLUS_ONE_RAISE")
+    
+    # Trazas (OpenTelemetry)
+    tracing_enabled: bool = Field(default=False, env="TRACING_ENABLED")
+    tracing_exporter: str = Field(default="console", env="TRACING_EXPORTER")
+    
+    # Perfilado de peticiones bajo demanda
+    profiling_enabled: bool = Field(default=False, env="PROFILING_ENABLED")
+    profiling_token: Optional[str] = Field(default=None, env="PROFILING_TOKEN")
+    profiling_sample_rate: float = Field(default=0.0, env="PROFILING_SAMPLE_RATE")
+    profiling_dir: str = Field(default="./profiles", env="PROFILING_DIR")
+    profiling_max_files: int = Field(default=50, env="PROFILING_MAX_FILES")
+    profiling_max_statements: int = Field(default=500, env="PROFILING_MAX_STATEMENTS")
+    
+    # Carga masiva de usuarios
+    bulk_users_chunk_size: int = Field(default=1000, env="BULK_USERS_CHUNK_SIZE")
+    bulk_users_max_json_items: int = Field(default=10000, env="BULK_USERS_MAX_JSON_ITEMS")
+    bulk_users_spool_bytes: int = Field(default=8 * 1024 * 1024, env="BULK_USERS_SPOOL_BYTES")
+    
+    # Proyección Monte Carlo del portafolio
+    projection_max_paths: int = Field(default=100000, env="PROJECTION_MAX_PATHS")
+    projection_max_years: int = Field(default=40, env="PROJECTION_MAX_YEARS")
+    projection_batch_paths: int = Field(default=10000, env="PROJECTION_BATCH_PATHS")
+    projection_parallel_min_paths: int = Field(default=50000, env="PROJECTION_PARALLEL_MIN_PATHS")
+    projection_workers: Optional[int] = Field(default=None, env="PROJECTION_WORKERS")
+    projection_lookback_days: int = Field(default=730, env="PROJECTION_LOOKBACK_DAYS")
+    projection_cache_size: int = Field(default=256, env="PROJECTION_CACHE_SIZE")
+    
+    # Aportes periódicos programados
+    recurring_contributions_chunk_size: int = Field(default=500, env="RECURRING_CONTRIBUTIONS_CHUNK_SIZE")
+    notification_batch_concurrency: int = Field(default=20, env="NOTIFICATION_BATCH_CONCURRENCY")
+    
+    # Cierre de fondos
+    fund_closure_chunk_size: int = Field(default=1000, env="FUND_CLOSURE_CHUNK_SIZE")
     
     class Config:
         env_file = ".env"
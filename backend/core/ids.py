@@ -0,0 +1,50 @@
+"""
+Generación de identificadores ordenados por tiempo (UUID versión 7)
+"""
+
+import random
+import secrets
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+
+_lock = threading.Lock()
+_last_ms = 0
+_last_counter = 0
+
+
+def uuid7(timestamp: Optional[datetime] = None, rng: Optional[random.Random] = None) -> uuid.UUID:
+    """UUID versión 7 (RFC 9562): 48 bits de milisegundos Unix seguidos de bits aleatorios
+
+    Sin `timestamp` se usa la hora actual y los UUID generados en el proceso son
+    estrictamente crecientes: dentro de un mismo milisegundo los 12 bits rand_a
+    actúan como contador. Con `timestamp` (fechas naive en UTC, como created_at)
+    y `rng` se obtienen identificadores reproducibles para datos sintéticos.
+    """
+    global _last_ms, _last_counter
+
+    if timestamp is None:
+        with _lock:
+            ms = time.time_ns() // 1_000_000
+            if ms > _last_ms:
+                # Arrancar en la mitad inferior deja margen al contador
+                counter = secrets.randbits(11)
+            else:
+                ms = _last_ms
+                counter = _last_counter + 1
+                if counter > 0xFFF:
+                    ms += 1
+                    counter = secrets.randbits(11)
+            _last_ms, _last_counter = ms, counter
+    else:
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        ms = int(timestamp.timestamp() * 1000)
+        counter = (rng or secrets.SystemRandom()).getrandbits(12)
+
+    rand_b = (rng or secrets.SystemRandom()).getrandbits(62)
+    value = (ms & 0xFFFFFFFFFFFF) << 80 | 0x7 << 76 | counter << 64 | 0b10 << 62 | rand_b
+    return uuid.UUID(int=value)
@@ -0,0 +1,194 @@
+"""
+Métricas Prometheus de la aplicación
+"""
+
+import time
+from functools import wraps
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    CONTENT_TYPE_LATEST,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+
+# Registro propio para no exponer métricas de otros módulos importados
+registry = CollectorRegistry(auto_describe=True)
+
+# Buckets pensados para una API con latencias de milisegundos
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latencia de las peticiones HTTP por ruta y estado",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Peticiones HTTP en curso",
+    registry=registry,
+)
+
+NOTIFICATION_LATENCY = Histogram(
+    "notification_send_duration_seconds",
+    "Latencia del envío de notificaciones por canal",
+    ["channel"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+
+NOTIFICATION_FAILURES = Counter(
+    "notification_failures_total",
+    "Notificaciones que no pudieron enviarse por canal",
+    ["channel"],
+    registry=registry,
+)
+
+SUBSCRIPTIONS_TOTAL = Counter(
+    "fund_subscriptions_total",
+    "Suscripciones realizadas por fondo",
+    ["fund_id"],
+    registry=registry,
+)
+
+CANCELLATIONS_TOTAL = Counter(
+    "fund_cancellations_total",
+    "Cancelaciones realizadas por fondo",
+    ["fund_id"],
+    registry=registry,
+)
+
+
+EVENT_STREAMS = Gauge(
+    "event_streams_connected",
+    "Conexiones abiertas al stream de eventos /events",
+    registry=registry,
+)
+
+EVENT_OVERFLOWS = Counter(
+    "event_stream_overflows_total",
+    "Eventos descartados por clientes lentos (sustituidos por resync)",
+    registry=registry,
+)
+
+SINGLE_FLIGHT_SHARED = Counter(
+    "single_flight_shared_total",
+    "Lecturas servidas por una llamada idéntica que ya estaba en curso",
+    ["call"],
+    registry=registry,
+)
+
+HISTORY_CACHE_REQUESTS = Counter(
+    "history_page_cache_requests_total",
+    "Páginas del historial servidas desde la caché (hit) o consultadas (miss)",
+    ["result"],
+    registry=registry,
+)
+
+PROJECTION_CACHE_REQUESTS = Counter(
+    "portfolio_projection_cache_requests_total",
+    "Proyecciones servidas desde la caché o en curso (hit) o simuladas (miss)",
+    ["result"],
+    registry=registry,
+)
+
+
+class DatabasePoolCollector:
+    """Expone el estado del pool de conexiones en el momento del scrape"""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def collect(self):
+        pool = self.engine.pool
+
+        checked_out = GaugeMetricFamily(
+            "db_pool_checked_out_connections",
+            "Conexiones del pool actualmente en uso",
+        )
+        overflow = GaugeMetricFamily(
+            "db_pool_overflow_connections",
+            "Conexiones abiertas por encima del tamaño del pool",
+        )
+
+        # No todos los pools (p. ej. SingletonThreadPool de SQLite) exponen contadores
+        if hasattr(pool, "checkedout"):
+            checked_out.add_metric([], pool.checkedout())
+        if hasattr(pool, "overflow"):
+            # QueuePool reporta valores negativos mientras no se llena el pool
+            overflow.add_metric([], max(pool.overflow(), 0))
+
+        yield checked_out
+        yield overflow
+
+
+def register_pool_collector(engine) -> None:
+    """Registrar el colector del pool de conexiones del engine"""
+    registry.register(DatabasePoolCollector(engine))
+
+
+def render_metrics():
+    """Serializar las métricas en formato de exposición de Prometheus"""
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def track_notification(channel: str):
+    """Decorador que mide la latencia y los fallos de un envío de notificación"""
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            sent = False
+            try:
+                sent = await func(*args, **kwargs)
+                return sent
+            finally:
+                NOTIFICATION_LATENCY.labels(channel).observe(time.perf_counter() - started)
+                if not sent:
+                    NOTIFICATION_FAILURES.labels(channel).inc()
+
+        return wrapper
+
+    return decorator
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que registra latencia por ruta y peticiones en curso"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # Usar la plantilla de la ruta para mantener acotada la cardinalidad
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code),
+            ).observe(time.perf_counter() - started)
@@ -0,0 +1,219 @@
+"""
+Perfilado de peticiones bajo demanda
+
+Una petición se perfila si trae la cabecera `X-Profile-Token` con el valor de
+`PROFILING_TOKEN`, o por muestreo con probabilidad `PROFILING_SAMPLE_RATE`. Se
+captura un perfil de CPU con cProfile y las sentencias SQL emitidas, y el
+resultado se guarda en un anillo acotado de archivos en `PROFILING_DIR`:
+
+- `<id>.json`: datos de la petición, funciones con más tiempo acumulado y SQL
+- `<id>.prof`: volcado de pstats para `python -m pstats` o snakeviz
+
+cProfile mide el hilo del event loop: si otras peticiones avanzan mientras
+tanto, su trabajo también aparece en el perfil, y lo que corre en el pool de
+hilos (p. ej. los lotes del group commit) no aparece. Por eso solo se perfila
+una petición a la vez en cada proceso. Las respuestas en streaming
+(`text/event-stream`) no se perfilan: durarían lo que la conexión y
+bloquearían el perfilado del resto de peticiones.
+"""
+
+import asyncio
+import cProfile
+import hmac
+import json
+import logging
+import pstats
+import random
+import re
+import secrets
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from core.config import settings
+from database.instrumentation import current_query_stats, track_queries
+
+
+logger = logging.getLogger("fpv.profiling")
+
+PROFILE_HEADER = "x-profile-token"
+TOP_FUNCTIONS = 40
+# Consultar los perfiles no debe generar perfiles nuevos que desplacen a los útiles,
+# y el stream de eventos dura lo que la conexión del cliente
+EXCLUDED_PATHS = ("/api/v1/profiles", "/metrics", "/api/v1/events")
+STREAMING_CONTENT_TYPE = b"text/event-stream"
+
+_PROFILE_ID = re.compile(r"^\d{8}T\d{12}-[0-9a-f]{8}$")
+
+
+def is_authorized(token: Optional[str]) -> bool:
+    """Comparar en tiempo constante el token recibido con PROFILING_TOKEN"""
+    if not settings.profiling_token or not token:
+        return False
+    return hmac.compare_digest(token.encode(), settings.profiling_token.encode())
+
+
+def top_functions(profiler: cProfile.Profile, limit: int = TOP_FUNCTIONS) -> List[dict]:
+    """Funciones con más tiempo acumulado del perfil"""
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            "function": f"{filename}:{line}({name})",
+            "calls": calls,
+            "total_ms": round(total * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        }
+        for (filename, line, name), (_, calls, total, cumulative, _) in rows
+    ]
+
+
+class ProfileStore:
+    """Anillo de perfiles en disco: al superar `max_files` se borran los más antiguos"""
+
+    def __init__(self, directory: str = None, max_files: int = None):
+        self.directory = Path(directory or settings.profiling_dir)
+        self.max_files = max_files or settings.profiling_max_files
+
+    @staticmethod
+    def new_id() -> str:
+        # Ordenable por nombre: la marca de tiempo va primero
+        return f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{secrets.token_hex(4)}"
+
+    def save(self, profile_id: str, report: dict, profiler: cProfile.Profile) -> None:
+        """Escribir el perfil y recortar el anillo"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        report["functions"] = top_functions(profiler)
+        profiler.dump_stats(self.directory / f"{profile_id}.prof")
+        # El JSON se escribe al final: su presencia marca el perfil como completo
+        (self.directory / f"{profile_id}.json").write_text(json.dumps(report, indent=2))
+        self.prune()
+
+    def prune(self) -> None:
+        for report in self._reports()[:-self.max_files]:
+            report.with_suffix(".prof").unlink(missing_ok=True)
+            report.unlink(missing_ok=True)
+
+    def list(self) -> List[dict]:
+        """Resumen de los perfiles guardados, del más reciente al más antiguo"""
+        summaries = []
+        for report in reversed(self._reports()):
+            try:
+                data = json.loads(report.read_text())
+            except (OSError, ValueError):
+                # Borrado por otro worker al recortar el anillo
+                continue
+            summaries.append({key: value for key, value in data.items() if key not in ("functions", "sql")})
+        return summaries
+
+    def path(self, profile_id: str, suffix: str) -> Optional[Path]:
+        """Ruta de un archivo del perfil, o None si el id no es válido o no existe"""
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}{suffix}"
+        return path if path.is_file() else None
+
+    def _reports(self) -> List[Path]:
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob("*.json"))
+
+
+profile_store = ProfileStore()
+
+
+class ProfilingMiddleware:
+    """Middleware ASGI que perfila las peticiones autorizadas o muestreadas
+
+    Debe quedar por dentro de QueryTrackingMiddleware para reutilizar sus
+    estadísticas SQL (y no dejar a cero la cabecera Server-Timing).
+    """
+
+    _active = False
+
+    def __init__(self, app, store: ProfileStore = None):
+        self.app = app
+        self.store = store or profile_store
+
+    def _should_profile(self, scope) -> bool:
+        if ProfilingMiddleware._active or scope["path"].startswith(EXCLUDED_PATHS):
+            return False
+        for name, value in scope.get("headers", []):
+            if name == PROFILE_HEADER.encode():
+                return is_authorized(value.decode("latin-1"))
+        return settings.profiling_sample_rate > 0 and random.random() < settings.profiling_sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        ProfilingMiddleware._active = True
+        profile_id = self.store.new_id()
+        status_code = 500
+        detached = False
+
+        def detach() -> None:
+            """Dejar de perfilar y liberar el perfilado para otras peticiones"""
+            nonlocal detached
+            profiler.disable()
+            detached = True
+            ProfilingMiddleware._active = False
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start" and not detached:
+                headers = list(message.get("headers", []))
+                content_type = next((value for name, value in headers if name.lower() == b"content-type"), b"")
+                if content_type.startswith(STREAMING_CONTENT_TYPE):
+                    # Un stream sin ruta excluida: se descarta el perfil en vez de
+                    # medir el event loop durante toda la conexión
+                    detach()
+                else:
+                    status_code = message["status"]
+                    headers.append((b"x-profile-id", profile_id.encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        # Reutilizar las estadísticas de QueryTrackingMiddleware si está activo
+        stats = current_query_stats()
+        with nullcontext(stats) if stats is not None else track_queries(detect_repeats=False) as stats:
+            stats.capture_statements(settings.profiling_max_statements)
+            profiler = cProfile.Profile()
+            started_at = datetime.utcnow()
+            started = time.perf_counter()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                elapsed = time.perf_counter() - started
+                statements, stats.statements = stats.statements, None
+                if not detached:
+                    profiler.disable()
+                    ProfilingMiddleware._active = False
+
+        if detached:
+            return
+
+        route = scope.get("route")
+        report = {
+            "id": profile_id,
+            "timestamp": started_at.isoformat(),
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": getattr(route, "path", None),
+            "status": status_code,
+            "duration_ms": round(elapsed * 1000, 2),
+            "queries": stats.count,
+            "db_ms": round(stats.duration * 1000, 2),
+            "sql": statements,
+        }
+        try:
+            # pstats y la escritura en disco no bloquean el event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.store.save, profile_id, report, profiler
+            )
+        except Exception:
+            logger.exception("No se pudo guardar el perfil %s", profile_id)
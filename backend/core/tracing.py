@@ -0,0 +1,231 @@
+"""
+Trazas distribuidas con OpenTelemetry
+
+Spans de cada petición HTTP (continuando el contexto W3C `traceparent` de la
+cabecera entrante), de cada sentencia SQL y de cada commit de sesión mediante
+eventos de SQLAlchemy, de los envíos de notificaciones y de los lotes del
+group commit. Mientras no se configure un exportador, la API de OpenTelemetry
+usa un tracer no-op y los spans no tienen coste apreciable.
+
+El exportador se elige con TRACING_EXPORTER (`console`, `otlp` o `memory`), o
+se conecta cualquier SpanExporter con `configure_tracing(exporter)`; en
+pruebas, `configure_tracing(InMemorySpanExporter())` permite inspeccionar los
+spans con `get_finished_spans()`.
+
+Al cargar el módulo solo se importa la API de trazas; el SDK, los
+exportadores y los propagadores se importan al configurar las trazas o al
+crear el middleware, así que con TRACING_ENABLED=false (por defecto) no
+suman al arranque de los workers.
+"""
+
+from __future__ import annotations
+
+from functools import wraps
+from typing import TYPE_CHECKING, Optional
+
+from opentelemetry import context as otel_context, trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from core.config import settings
+
+if TYPE_CHECKING:
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SpanExporter
+
+
+tracer = trace.get_tracer("fpv")
+
+_provider: Optional[TracerProvider] = None
+
+
+def build_exporter(name: str) -> SpanExporter:
+    """Exportador configurado por nombre"""
+    if name == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+        return ConsoleSpanExporter()
+    if name == "memory":
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+        return InMemorySpanExporter()
+    if name == "otlp":
+        # Destino y cabeceras según OTEL_EXPORTER_OTLP_* estándar
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    raise ValueError(f"Exportador de trazas desconocido: {name}")
+
+
+def configure_tracing(exporter: SpanExporter, batch: Optional[bool] = None) -> TracerProvider:
+    """Enviar los spans a `exporter`; el envío es por lotes salvo para el exportador en memoria"""
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+    global _provider
+    if batch is None:
+        batch = not isinstance(exporter, InMemorySpanExporter)
+
+    if _provider is None:
+        _provider = TracerProvider(resource=Resource.create({"service.name": settings.app_name}))
+        trace.set_tracer_provider(_provider)
+
+    processor = BatchSpanProcessor(exporter) if batch else SimpleSpanProcessor(exporter)
+    _provider.add_span_processor(processor)
+    return _provider
+
+
+def shutdown_tracing() -> None:
+    """Vaciar los spans pendientes de los exportadores"""
+    if _provider is not None:
+        _provider.shutdown()
+
+
+def setup_tracing(engine) -> None:
+    """Configurar el exportador de TRACING_EXPORTER y los eventos SQL del engine"""
+    if not settings.tracing_enabled:
+        return
+    configure_tracing(build_exporter(settings.tracing_exporter))
+    install_sql_tracing(engine)
+
+
+def _statement_operation(statement: str) -> str:
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    operation = _statement_operation(statement)
+    span = tracer.start_span(
+        f"db {operation}",
+        kind=SpanKind.CLIENT,
+        attributes={
+            "db.system": conn.dialect.name,
+            "db.operation": operation,
+            # Sin parámetros: pueden contener datos personales
+            "db.statement": statement,
+        },
+    )
+    conn.info.setdefault("trace_spans", []).append(span)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans:
+        spans.pop().end()
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    spans = conn.info.get("trace_spans") if conn is not None else None
+    if spans:
+        span = spans.pop()
+        span.record_exception(exception_context.original_exception)
+        span.set_status(Status(StatusCode.ERROR))
+        span.end()
+
+
+def _before_commit(session):
+    # Span activo durante el commit para que las sentencias del flush cuelguen de él
+    span = tracer.start_span("db commit")
+    token = otel_context.attach(trace.set_span_in_context(span))
+    session.info["trace_commit_span"] = (span, token)
+
+
+def _end_commit_span(session, error: bool = False):
+    entry = session.info.pop("trace_commit_span", None)
+    if entry is not None:
+        span, token = entry
+        otel_context.detach(token)
+        if error:
+            span.set_status(Status(StatusCode.ERROR, "rollback"))
+        span.end()
+
+
+def _after_commit(session):
+    _end_commit_span(session)
+
+
+def _after_rollback(session):
+    _end_commit_span(session, error=True)
+
+
+def install_sql_tracing(engine) -> None:
+    """Spans por sentencia SQL (engine) y por commit de sesión (flush incluido)"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    event.listen(Session, "before_commit", _before_commit)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
+
+
+def traced(name: str, attributes: Optional[dict] = None):
+    """Decorador que envuelve una corrutina en un span"""
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with tracer.start_as_current_span(name, attributes=attributes):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class TracingMiddleware:
+    """Middleware ASGI con un span SERVER por petición
+
+    Continúa la traza de las cabeceras `traceparent`/`tracestate` entrantes y
+    devuelve `traceparent` en la respuesta para correlacionar con el cliente.
+    """
+
+    def __init__(self, app):
+        # Los propagadores se cargan por entry points: solo si hay middleware
+        from opentelemetry import propagate
+
+        self.app = app
+        self.propagate = propagate
+
+    async def __call__(self, scope, receive, send):
+        propagate = self.propagate
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+        parent = propagate.extract(carrier)
+        status_code = 500
+
+        with tracer.start_as_current_span(
+            f"{scope['method']} {scope['path']}",
+            context=parent,
+            kind=SpanKind.SERVER,
+            attributes={"http.method": scope["method"], "http.target": scope["path"]},
+        ) as span:
+            async def send_wrapper(message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    outgoing = {}
+                    propagate.inject(outgoing)
+                    headers = list(message.get("headers", []))
+                    headers.extend(
+                        (name.encode("latin-1"), value.encode("latin-1")) for name, value in outgoing.items()
+                    )
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # La plantilla de la ruta solo se conoce tras el enrutado
+                route = scope.get("route")
+                if route is not None:
+                    span.update_name(f"{scope['method']} {route.path}")
+                    span.set_attribute("http.route", route.path)
+                span.set_attribute("http.status_code", status_code)
+                if status_code >= 500:
+                    span.set_status(Status(StatusCode.ERROR))
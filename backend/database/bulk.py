@@ -0,0 +1,116 @@
+"""
+Escritura masiva: por DBAPI para cargas y snapshots de millones de filas, y
+UPDATE por clave primaria en executemany para los procesos por lotes
+"""
+
+import csv
+import io
+import uuid
+from datetime import date, datetime
+from typing import List
+
+from sqlalchemy import bindparam
+
+
+def update_by_id(db, model, rows: List[dict]) -> None:
+    """UPDATE por clave primaria de varias filas en un solo executemany
+
+    Cada fila trae `row_id` (el ID) y las mismas columnas a fijar. Usa la
+    tabla de Core: sin el coste por fila del UPDATE masivo del ORM.
+    """
+    if not rows:
+        return
+    table = model.__table__
+    columns = [key for key in rows[0] if key != "row_id"]
+    db.execute(
+        table.update().where(table.c.id == bindparam("row_id")).values(
+            {column: bindparam(column) for column in columns}
+        ),
+        rows
+    )
+
+
+class BulkWriter:
+    """Escritura por lotes sobre una conexión DBAPI: COPY en PostgreSQL, executemany en el resto"""
+
+    def __init__(self, engine, relaxed_durability: bool = False):
+        self.dialect = engine.dialect.name
+        self.raw = engine.raw_connection()
+        self.cursor = self.raw.cursor()
+        self.placeholder = "?" if engine.dialect.paramstyle == "qmark" else "%s"
+        # Valor previo de PRAGMA synchronous; la conexión vuelve al pool compartido
+        self._synchronous = None
+
+        if relaxed_durability and self.dialect == "sqlite":
+            # Carga masiva: se prioriza velocidad sobre durabilidad de cada lote
+            self._synchronous = self.cursor.execute("PRAGMA synchronous").fetchone()[0]
+            self.cursor.execute("PRAGMA synchronous = OFF")
+
+    def _format(self, value):
+        if isinstance(value, datetime) and self.dialect == "sqlite":
+            return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+        if isinstance(value, date) and self.dialect == "sqlite":
+            return value.isoformat()
+        if isinstance(value, uuid.UUID):
+            # Mismo formato de almacenamiento que database.types.UUIDString
+            return str(value) if self.dialect == "postgresql" else value.bytes
+        return value
+
+    def write(self, table: str, columns, rows) -> None:
+        if not rows:
+            return
+
+        if self.dialect == "postgresql":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                writer.writerow(["\\N" if value is None else value for value in row])
+            buffer.seek(0)
+            self.cursor.copy_expert(
+                f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buffer,
+            )
+            return
+
+        placeholders = ", ".join([self.placeholder] * len(columns))
+        self.cursor.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+            [tuple(self._format(value) for value in row) for row in rows],
+        )
+
+    def execute(self, statement: str, params=()) -> None:
+        """Ejecutar una sentencia en la misma transacción; `{p}` marca cada parámetro"""
+        self.cursor.execute(
+            statement.format(p=self.placeholder),
+            tuple(self._format(value) for value in params),
+        )
+
+    def commit(self) -> None:
+        self.raw.commit()
+
+    def reset_sequences(self, tables) -> None:
+        """Sincronizar las secuencias de PostgreSQL tras insertar IDs explícitos"""
+        if self.dialect != "postgresql":
+            return
+        for table in tables:
+            self.cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+            )
+        self.raw.commit()
+
+    def rollback(self) -> None:
+        self.raw.rollback()
+
+    def close(self) -> None:
+        """Devolver la conexión al pool con la durabilidad que tenía"""
+        try:
+            if self._synchronous is not None:
+                self.cursor.execute(f"PRAGMA synchronous = {int(self._synchronous)}")
+            self.cursor.close()
+        except Exception:
+            # Sin poder restaurarla, la conexión no se reutiliza
+            self.raw.invalidate()
+            raise
+        finally:
+            self.raw.close()
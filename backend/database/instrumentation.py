@@ -0,0 +1,196 @@
+"""
+Instrumentación SQL por petición y detector de consultas N+1
+"""
+
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine.interfaces import ExecuteStyle
+
+from core.config import settings
+
+
+logger = logging.getLogger("fpv.sql")
+
+# Colapsa listas de parámetros (IN (?, ?, ?)) para que el tamaño no cambie la forma
+_PARAM_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|%s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|%s|:\w+))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class NPlusOneError(Exception):
+    """Se repitió la misma consulta más veces de las permitidas en una petición"""
+
+
+def statement_shape(statement: str) -> str:
+    """Normalizar una sentencia SQL para comparar su forma"""
+    return _PARAM_LIST.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryStats:
+    """Conteo de sentencias y tiempo de base de datos de una unidad de trabajo"""
+
+    __slots__ = ("count", "duration", "shapes", "detect_repeats", "statements", "max_statements")
+
+    def __init__(self, detect_repeats: bool = False):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self.detect_repeats = detect_repeats
+        self.statements = None
+        self.max_statements = 0
+
+    def capture_statements(self, limit: int) -> None:
+        """Guardar también el texto y la duración de las próximas `limit` sentencias"""
+        self.statements = []
+        self.max_statements = limit
+
+    def record(self, statement: str, elapsed: float, batched: bool = False) -> None:
+        """Registrar una sentencia ejecutada; las de un lote no cuentan como N+1"""
+        self.count += 1
+        self.duration += elapsed
+
+        if self.statements is not None and len(self.statements) < self.max_statements:
+            self.statements.append({
+                "statement": _WHITESPACE.sub(" ", statement).strip(),
+                "duration_ms": round(elapsed * 1000, 3),
+            })
+
+        if not self.detect_repeats or batched:
+            return
+
+        shape = statement_shape(statement)
+        self.shapes[shape] += 1
+        if self.shapes[shape] == settings.sql_n_plus_one_threshold:
+            logger.warning(json.dumps({
+                "event": "sql_n_plus_one",
+                "repetitions": settings.sql_n_plus_one_threshold,
+                "statement": shape,
+            }))
+            if settings.sql_n_plus_one_raise:
+                raise NPlusOneError(
+                    f"Consulta repetida {settings.sql_n_plus_one_threshold} veces: {shape}"
+                )
+
+    def repeated_statements(self):
+        """Formas de sentencia que alcanzaron el umbral del detector"""
+        return {
+            shape: count for shape, count in self.shapes.items()
+            if count >= settings.sql_n_plus_one_threshold
+        }
+
+    def server_timing(self) -> str:
+        """Valor para la cabecera Server-Timing"""
+        return f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries"'
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Estadísticas de la petición en curso, si hay alguna"""
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        # executemany y las páginas de un INSERT de varias filas son un solo lote
+        batched = executemany or (context is not None and context.execute_style is not ExecuteStyle.EXECUTE)
+        stats.record(statement, time.perf_counter() - started, batched)
+
+
+def install_query_hooks(engine) -> None:
+    """Registrar los eventos de SQLAlchemy que alimentan las estadísticas"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def track_queries(detect_repeats: Optional[bool] = None):
+    """Contar las consultas ejecutadas dentro del bloque
+
+    Pensado también para pruebas: ``with track_queries() as stats`` seguido de
+    ``assert stats.count <= 3`` detecta regresiones de consultas en CI.
+    """
+    if detect_repeats is None:
+        detect_repeats = settings.debug
+    stats = QueryStats(detect_repeats=detect_repeats)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def allow_repeated_queries():
+    """Desactivar el detector de N+1 en un bloque que repite consultas a propósito
+
+    Para procesos por lotes dentro de una petición (p. ej. cargas masivas),
+    donde cada lote ejecuta las mismas sentencias. El conteo y el tiempo se
+    siguen registrando.
+    """
+    stats = _current_stats.get()
+    if stats is None or not stats.detect_repeats:
+        yield
+        return
+    stats.detect_repeats = False
+    try:
+        yield
+    finally:
+        stats.detect_repeats = True
+
+
+class QueryTrackingMiddleware:
+    """Middleware ASGI que expone las estadísticas SQL de cada petición"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        with track_queries() as stats:
+            async def send_wrapper(message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", stats.server_timing().encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                record = {
+                    "event": "request_sql",
+                    "method": scope["method"],
+                    "route": getattr(route, "path", scope["path"]),
+                    "status": status_code,
+                    "queries": stats.count,
+                    "db_ms": round(stats.duration * 1000, 2),
+                }
+                repeated = stats.repeated_statements()
+                if repeated:
+                    record["repeated_statements"] = repeated
+                logger.info(json.dumps(record))
@@ -0,0 +1,72 @@
+"""
+Control de versión del esquema y aplicación de migraciones
+"""
+
+from pathlib import Path
+
+from sqlalchemy import inspect, text
+
+
+# Revisión que espera el código. Debe coincidir con la última migración en
+# migrations/versions; se valida al migrar para no importar Alembic en el arranque.
+SCHEMA_REVISION = "0009"
+
+# Revisión equivalente a una base creada antes con Base.metadata.create_all
+BASELINE_REVISION = "0001"
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+class SchemaVersionError(RuntimeError):
+    """La base de datos no está en la revisión que espera la aplicación"""
+
+
+def current_revision(connection):
+    """Revisión aplicada en la base de datos, o None si no hay control de versiones"""
+    if not inspect(connection).has_table("alembic_version"):
+        return None
+    return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def check_schema_version(engine) -> None:
+    """Verificar con una lectura de alembic_version que el esquema está al día"""
+    with engine.connect() as connection:
+        revision = current_revision(connection)
+
+    if revision != SCHEMA_REVISION:
+        raise SchemaVersionError(
+            f"El esquema de la base de datos está en la revisión {revision!r} y la aplicación "
+            f"requiere {SCHEMA_REVISION!r}. Ejecute: python -m commands.migrate"
+        )
+
+
+def _alembic_config(connection):
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "migrations"))
+    config.attributes["connection"] = connection
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def upgrade_to_head(engine) -> str:
+    """Aplicar las migraciones pendientes y devolver la revisión resultante"""
+    from alembic import command
+    from alembic.script import ScriptDirectory
+
+    with engine.begin() as connection:
+        config = _alembic_config(connection)
+
+        head = ScriptDirectory.from_config(config).get_current_head()
+        if head != SCHEMA_REVISION:
+            raise SchemaVersionError(
+                f"SCHEMA_REVISION ({SCHEMA_REVISION!r}) no coincide con la última migración ({head!r})"
+            )
+
+        # Bases creadas con create_all: adoptar la revisión base sin recrear tablas
+        if current_revision(connection) is None and inspect(connection).has_table("funds"):
+            command.stamp(config, BASELINE_REVISION)
+
+        command.upgrade(config, "head")
+        return current_revision(connection)
@@ -0,0 +1,106 @@
+"""
+Datos iniciales del sistema: fondos y usuario por defecto
+"""
+
+from sqlalchemy import insert, select, text
+
+from core.config import settings
+from models.fund import Fund
+from models.user import User
+
+
+DEFAULT_FUNDS = [
+    {
+        "id": 1,
+        "name": "FPV_EL CLIENTE_RECAUDADORA",
+        "minimum_amount": 75000.0,
+        "category": "FPV"
+    },
+    {
+        "id": 2,
+        "name": "FPV_EL CLIENTE_ECOPETROL",
+        "minimum_amount": 125000.0,
+        "category": "FPV"
+    },
+    {
+        "id": 3,
+        "name": "DEUDAPRIVADA",
+        "minimum_amount": 50000.0,
+        "category": "FIC"
+    },
+    {
+        "id": 4,
+        "name": "FDO-ACCIONES",
+        "minimum_amount": 250000.0,
+        "category": "FIC"
+    },
+    {
+        "id": 5,
+        "name": "FPV_EL CLIENTE_DINAMICA",
+        "minimum_amount": 100000.0,
+        "category": "FPV"
+    }
+]
+
+DEFAULT_USER = {
+    "name": "Usuario FPV",
+    "email": "user@fpv.com",
+    "phone": "+573001234567",
+    "notification_preference": "email",
+}
+
+
+def _insert_ignore(connection, model, rows, conflict_column):
+    """INSERT ... ON CONFLICT DO NOTHING en una sola sentencia, seguro entre workers"""
+    dialect = connection.dialect.name
+
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        dialect_insert = None
+
+    if dialect_insert is not None:
+        connection.execute(
+            dialect_insert(model).on_conflict_do_nothing(index_elements=[conflict_column]),
+            rows
+        )
+        return
+
+    # Otros motores: insertar solo las filas que falten
+    column = getattr(model, conflict_column)
+    existing = set(connection.execute(
+        select(column).where(column.in_([row[conflict_column] for row in rows]))
+    ).scalars())
+    missing = [row for row in rows if row[conflict_column] not in existing]
+    if missing:
+        connection.execute(insert(model), missing)
+
+
+def seed_defaults(engine) -> None:
+    """Crear fondos y usuario por defecto si no existen (idempotente)"""
+    defaults = {"is_active": True}
+
+    with engine.begin() as connection:
+        _insert_ignore(
+            connection, Fund,
+            [{**defaults, **fund} for fund in DEFAULT_FUNDS],
+            "id"
+        )
+        _insert_ignore(
+            connection, User,
+            [{**defaults, **DEFAULT_USER, "balance": settings.initial_balance}],
+            "email"
+        )
+
+        # Los workers en ejecución deben recargar el listado de fondos
+        from services.cache_service import FUNDS_KEY, bump_versions
+        bump_versions(connection, [FUNDS_KEY])
+        
+        # Los fondos usan IDs explícitos: mantener la secuencia de PostgreSQL al día
+        if connection.dialect.name == "postgresql":
+            connection.execute(text(
+                "SELECT setval(pg_get_serial_sequence('funds', 'id'), "
+                "GREATEST((SELECT MAX(id) FROM funds), 1))"
+            ))
@@ -0,0 +1,41 @@
+"""
+Tipos de columna personalizados
+"""
+
+import uuid
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import BINARY, LargeBinary, TypeDecorator
+
+
+class UUIDString(TypeDecorator):
+    """UUID almacenado en formato nativo y expuesto como str
+
+    PostgreSQL usa el tipo `uuid`, MySQL `BINARY(16)` y el resto un BLOB de 16
+    bytes. Acepta str o uuid.UUID al escribir y siempre devuelve la forma
+    canónica con guiones, de modo que el API mantiene su formato.
+    """
+
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        if dialect.name in ("mysql", "mariadb"):
+            return dialect.type_descriptor(BINARY(16))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value if dialect.name == "postgresql" else value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(bytes=bytes(value)))
@@ -3,13 +3,20 @@ Sistema de Gestión de Fondos Voluntarios de Pensión (FPV) y Fondos de Inversi
 Desarrollado con FastAPI siguiendo principios de Clean Code
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from database.connection import init_db
-from routers import funds, transactions, users
+from database.connection import engine, init_db
+from routers import funds, transactions, users, analytics, events, profiles, contributions
 from core.config import settings
+from core.metrics import MetricsMiddleware, register_pool_collector, render_metrics
+from core.profiling import ProfilingMiddleware
+from core.tracing import TracingMiddleware, setup_tracing, shutdown_tracing
+from database.instrumentation import QueryTrackingMiddleware
+from services.cache_service import version_tracker
+from services.group_commit_service import group_committer
+from services.projection_service import shutdown_projection_pool
 
 
 @asynccontextmanager
@@ -17,9 +24,15 @@ async def lifespan(app: FastAPI):
     """Gestión del ciclo de vida de la aplicación"""
     # Startup
     await init_db()
+    version_tracker.start(engine)
+    if settings.group_commit_enabled:
+        group_committer.start()
     yield
     # Shutdown
-    pass
+    await group_committer.stop()
+    version_tracker.stop()
+    shutdown_projection_pool()
+    shutdown_tracing()
 
 
 app = FastAPI(
@@ -38,10 +51,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Perfilado bajo demanda; por dentro del conteo de consultas para compartir sus estadísticas
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
+
+# Conteo de consultas SQL por petición (cabecera Server-Timing)
+if settings.sql_instrumentation_enabled:
+    app.add_middleware(QueryTrackingMiddleware)
+
+# Métricas de latencia y peticiones en curso
+if settings.metrics_enabled:
+    register_pool_collector(engine)
+    app.add_middleware(MetricsMiddleware)
+
+# Trazas: span por petición, por sentencia SQL y por commit
+if settings.tracing_enabled:
+    setup_tracing(engine)
+    app.add_middleware(TracingMiddleware)
+
 # Incluir routers
 app.include_router(funds.router, prefix="/api/v1", tags=["funds"])
 app.include_router(transactions.router, prefix="/api/v1", tags=["transactions"])
 app.include_router(users.router, prefix="/api/v1", tags=["users"])
+app.include_router(analytics.router, prefix="/api/v1", tags=["analytics"])
+app.include_router(events.router, prefix="/api/v1", tags=["events"])
+app.include_router(profiles.router, prefix="/api/v1", tags=["profiles"])
+app.include_router(contributions.router, prefix="/api/v1", tags=["contributions"])
 
 
 @app.get("/")
@@ -60,6 +95,13 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Endpoint de métricas en formato Prometheus"""
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""
+Entorno de Alembic para las migraciones del esquema
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+
+from core.config import settings
+from database.connection import Base, engine
+import models  # noqa: F401  Registrar todos los modelos en Base.metadata
+
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    """Generar el SQL de las migraciones sin conectarse a la base de datos"""
+    context.configure(
+        url=settings.database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=settings.database_url.startswith("sqlite"),
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Aplicar las migraciones sobre la conexión recibida o sobre el engine de la aplicación"""
+    connection = config.attributes.get("connection")
+
+    if connection is None:
+        with engine.connect() as connection:
+            _run(connection)
+    else:
+        _run(connection)
+
+
+def _run(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
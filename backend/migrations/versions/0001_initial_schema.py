@@ -0,0 +1,80 @@
+"""
+Esquema inicial: usuarios, fondos, suscripciones y transacciones
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("email", sa.String(100), nullable=False),
+        sa.Column("phone", sa.String(20), nullable=False),
+        sa.Column("balance", sa.Float(), nullable=False),
+        sa.Column("notification_preference", sa.String(10)),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "funds",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False, unique=True),
+        sa.Column("minimum_amount", sa.Float(), nullable=False),
+        sa.Column("category", sa.String(10), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_funds_id", "funds", ["id"])
+
+    op.create_table(
+        "subscriptions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("fund_id", sa.Integer(), sa.ForeignKey("funds.id"), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("subscribed_at", sa.DateTime()),
+        sa.Column("unsubscribed_at", sa.DateTime()),
+    )
+    op.create_index("ix_subscriptions_id", "subscriptions", ["id"])
+
+    op.create_table(
+        "transactions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("transaction_id", sa.String(36)),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("fund_id", sa.Integer(), sa.ForeignKey("funds.id"), nullable=False),
+        sa.Column("transaction_type", sa.String(20), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("status", sa.String(20)),
+        sa.Column("description", sa.Text()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_transactions_id", "transactions", ["id"])
+    op.create_index("ix_transactions_transaction_id", "transactions", ["transaction_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table("transactions")
+    op.drop_table("subscriptions")
+    op.drop_table("funds")
+    op.drop_table("users")
@@ -0,0 +1,40 @@
+"""
+Agregados diarios y mensuales de transacciones por fondo y tipo
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "transaction_rollups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("granularity", sa.String(5), nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("fund_id", sa.Integer(), sa.ForeignKey("funds.id"), nullable=False),
+        sa.Column("transaction_type", sa.String(20), nullable=False),
+        sa.Column("total_amount", sa.Float(), nullable=False),
+        sa.Column("transaction_count", sa.Integer(), nullable=False),
+        sa.UniqueConstraint(
+            "granularity", "period_start", "fund_id", "transaction_type",
+            name="uq_transaction_rollups_bucket"
+        ),
+    )
+    op.create_index(
+        "ix_transaction_rollups_period", "transaction_rollups", ["granularity", "period_start"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("transaction_rollups")
@@ -0,0 +1,44 @@
+"""
+Archivo frío de transacciones, particionado por mes en PostgreSQL
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Las particiones mensuales las crea el archivador a medida que las necesita
+    op.create_table(
+        "transactions_archive",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("created_at", sa.DateTime(), primary_key=True),
+        sa.Column("transaction_id", sa.String(36), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("fund_id", sa.Integer(), nullable=False),
+        sa.Column("transaction_type", sa.String(20), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("status", sa.String(20)),
+        sa.Column("description", sa.Text()),
+        sa.Column("archived_at", sa.DateTime()),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_index(
+        "ix_transactions_archive_user_created", "transactions_archive", ["user_id", "created_at"]
+    )
+    op.create_index(
+        "ix_transactions_archive_transaction_id", "transactions_archive", ["transaction_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("transactions_archive")
@@ -0,0 +1,35 @@
+"""
+Índices compuestos para el historial filtrado de transacciones
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Cada filtro del historial es un prefijo de igualdad más un rango sobre
+    # created_at, y el orden (created_at, id) sale directamente del índice
+    op.create_index(
+        "ix_transactions_user_created", "transactions", ["user_id", "created_at", "id"]
+    )
+    op.create_index(
+        "ix_transactions_user_type_created", "transactions", ["user_id", "transaction_type", "created_at"]
+    )
+    op.create_index(
+        "ix_transactions_user_fund_created", "transactions", ["user_id", "fund_id", "created_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transactions_user_fund_created", table_name="transactions")
+    op.drop_index("ix_transactions_user_type_created", table_name="transactions")
+    op.drop_index("ix_transactions_user_created", table_name="transactions")
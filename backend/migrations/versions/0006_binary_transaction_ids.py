@@ -0,0 +1,76 @@
+"""
+transaction_id en formato UUID nativo (uuid en PostgreSQL, 16 bytes en el resto)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+# (tabla, índice sobre transaction_id, único)
+TABLES = (
+    ("transactions", "ix_transactions_transaction_id", True),
+    ("transactions_archive", "ix_transactions_archive_transaction_id", False),
+)
+
+CHUNK_SIZE = 10000
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        for table, _, _ in TABLES:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN transaction_id TYPE uuid USING transaction_id::uuid")
+        return
+
+    binary = sa.BINARY(16) if bind.dialect.name in ("mysql", "mariadb") else sa.LargeBinary(16)
+    for table, index, unique in TABLES:
+        _convert_column(bind, table, index, unique, binary, lambda value: uuid.UUID(value).bytes)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        for table, _, _ in TABLES:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN transaction_id TYPE varchar(36) USING transaction_id::text")
+        return
+
+    for table, index, unique in TABLES:
+        _convert_column(bind, table, index, unique, sa.String(36), lambda value: str(uuid.UUID(bytes=bytes(value))))
+
+
+def _convert_column(bind, table: str, index: str, unique: bool, new_type, convert) -> None:
+    """Reescribir transaction_id con `new_type` convirtiendo las filas por lotes de id"""
+    op.add_column(table, sa.Column("transaction_id_new", new_type, nullable=True))
+
+    last_id = None
+    while True:
+        query = f"SELECT id, transaction_id FROM {table}"
+        if last_id is not None:
+            query += " WHERE id > :last_id"
+        rows = bind.execute(
+            sa.text(query + " ORDER BY id LIMIT :limit"), {"last_id": last_id, "limit": CHUNK_SIZE}
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            sa.text(f"UPDATE {table} SET transaction_id_new = :value WHERE id = :id"),
+            [{"id": row.id, "value": convert(row.transaction_id)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    op.drop_index(index, table_name=table)
+    with op.batch_alter_table(table) as batch:
+        batch.drop_column("transaction_id")
+        batch.alter_column("transaction_id_new", new_column_name="transaction_id", nullable=False)
+    op.create_index(index, table, ["transaction_id"], unique=unique)
@@ -0,0 +1,40 @@
+"""
+Rentabilidades diarias de los fondos y valoraciones de las suscripciones
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "fund_returns",
+        sa.Column("fund_id", sa.Integer(), sa.ForeignKey("funds.id"), primary_key=True),
+        sa.Column("date", sa.Date(), primary_key=True),
+        sa.Column("daily_return", sa.Float(), nullable=False),
+    )
+    op.create_table(
+        "subscription_valuations",
+        sa.Column("valuation_date", sa.Date(), primary_key=True),
+        sa.Column("subscription_id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("fund_id", sa.Integer(), nullable=False),
+        sa.Column("principal", sa.Float(), nullable=False),
+        sa.Column("market_value", sa.Float(), nullable=False),
+        sa.Column("accrued_return", sa.Float(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("subscription_valuations")
+    op.drop_table("fund_returns")
@@ -0,0 +1,48 @@
+"""
+Aportes periódicos programados e índice de suscripciones por usuario y fondo
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "recurring_contributions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("fund_id", sa.Integer(), sa.ForeignKey("funds.id"), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("day_of_month", sa.Integer(), nullable=False),
+        sa.Column("next_run_on", sa.Date(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("last_run_at", sa.DateTime(), nullable=True),
+        sa.Column("last_status", sa.String(30), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_recurring_contributions_id", "recurring_contributions", ["id"])
+    op.create_index("ix_recurring_contributions_user_due", "recurring_contributions", ["user_id", "next_run_on"])
+    op.create_index(
+        "uq_recurring_contributions_active", "recurring_contributions", ["user_id", "fund_id"],
+        unique=True,
+        sqlite_where=sa.text("is_active"),
+        postgresql_where=sa.text("is_active"),
+    )
+    # Suscripción activa de un usuario a un fondo: la buscan el ejecutor de
+    # aportes, la validación de suscripciones y la cancelación
+    op.create_index("ix_subscriptions_user_fund", "subscriptions", ["user_id", "fund_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_subscriptions_user_fund", table_name="subscriptions")
+    op.drop_table("recurring_contributions")
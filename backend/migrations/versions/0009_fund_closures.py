@@ -0,0 +1,35 @@
+"""
+Progreso del cierre de fondos
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "fund_closures",
+        sa.Column("fund_id", sa.Integer(), sa.ForeignKey("funds.id"), primary_key=True),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("total_subscriptions", sa.Integer(), nullable=False),
+        sa.Column("refunded_subscriptions", sa.Integer(), nullable=False),
+        sa.Column("refunded_amount", sa.Float(), nullable=False),
+        sa.Column("last_subscription_id", sa.Integer(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("fund_closures")
@@ -6,5 +6,16 @@ from .user import User
 from .fund import Fund
 from .transaction import Transaction
 from .subscription import Subscription
+from .cache_version import CacheVersion
+from .transaction_rollup import TransactionRollup
+from .transaction_archive import TransactionArchive
+from .fund_return import FundReturn
+from .subscription_valuation import SubscriptionValuation
+from .recurring_contribution import RecurringContribution
+from .fund_closure import FundClosure
 
-__all__ = ["User", "Fund", "Transaction", "Subscription"]
\ No newline at end of file
+__all__ = [
+    "User", "Fund", "Transaction", "Subscription",
+    "CacheVersion", "TransactionRollup", "TransactionArchive",
+    "FundReturn", "SubscriptionValuation", "RecurringContribution", "FundClosure"
+]
\ No newline at end of file
@@ -0,0 +1,21 @@
+"""
+Modelo de sellos de versión para coherencia de caché entre workers
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+
+from database.connection import Base
+
+
+class CacheVersion(Base):
+    """Versión por entidad; se incrementa en la misma transacción que la escritura"""
+    
+    __tablename__ = "cache_versions"
+    
+    key = Column(String(100), primary_key=True)  # "funds", "user:<id>"
+    version = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<CacheVersion(key='{self.key}', version={self.version})>"
@@ -0,0 +1,35 @@
+"""
+Modelo del progreso del cierre de un fondo
+"""
+
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, String
+from datetime import datetime
+
+from database.connection import Base
+
+
+class FundClosure(Base):
+    """Cierre de un fondo: devolución y cancelación de todas sus suscripciones activas
+
+    Cada lote confirma junto con sus cancelaciones el avance del cierre
+    (`last_subscription_id`, contadores), así que el cierre se puede
+    retomar donde quedó y su progreso se consulta mientras corre.
+    """
+
+    __tablename__ = "fund_closures"
+
+    fund_id = Column(Integer, ForeignKey("funds.id"), primary_key=True)
+    status = Column(String(20), nullable=False, default="in_progress")  # "in_progress", "completed"
+    total_subscriptions = Column(Integer, nullable=False, default=0)
+    refunded_subscriptions = Column(Integer, nullable=False, default=0)
+    refunded_amount = Column(Float, nullable=False, default=0.0)
+    last_subscription_id = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return (
+            f"<FundClosure(fund_id={self.fund_id}, status='{self.status}', "
+            f"refunded={self.refunded_subscriptions}/{self.total_subscriptions})>"
+        )
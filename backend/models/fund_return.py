@@ -0,0 +1,20 @@
+"""
+Modelo de la serie de rentabilidades diarias de cada fondo
+"""
+
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey
+
+from database.connection import Base
+
+
+class FundReturn(Base):
+    """Rentabilidad de un fondo en un día (0.001 = 0,1 %)"""
+    
+    __tablename__ = "fund_returns"
+    
+    fund_id = Column(Integer, ForeignKey("funds.id"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    daily_return = Column(Float, nullable=False)
+    
+    def __repr__(self):
+        return f"<FundReturn(fund_id={self.fund_id}, date={self.date}, daily_return={self.daily_return})>"
@@ -0,0 +1,51 @@
+"""
+Modelo de aportes periódicos programados
+"""
+
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey, Boolean, String, Index, text
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+from database.connection import Base
+
+
+class RecurringContribution(Base):
+    """Aporte mensual programado de un usuario a un fondo en el que está suscrito
+
+    `next_run_on` es la próxima fecha en que corresponde cobrar. El ejecutor la
+    avanza en la misma transacción en que cobra el aporte, así que una
+    ejecución interrumpida se puede repetir sin cobrar dos veces.
+    """
+
+    __tablename__ = "recurring_contributions"
+    __table_args__ = (
+        # Programaciones vencidas recorridas en orden de usuario (el ejecutor avanza por user_id)
+        Index("ix_recurring_contributions_user_due", "user_id", "next_run_on"),
+        # Un solo aporte programado vigente por usuario y fondo
+        Index(
+            "uq_recurring_contributions_active", "user_id", "fund_id",
+            unique=True,
+            sqlite_where=text("is_active"),
+            postgresql_where=text("is_active"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    fund_id = Column(Integer, ForeignKey("funds.id"), nullable=False)
+    amount = Column(Float, nullable=False)
+    day_of_month = Column(Integer, nullable=False)
+    next_run_on = Column(Date, nullable=False)
+    is_active = Column(Boolean, default=True, nullable=False)
+    last_run_at = Column(DateTime, nullable=True)
+    last_status = Column(String(30), nullable=True)  # "completed", "insufficient_funds", "subscription_inactive"
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relaciones
+    fund = relationship("Fund")
+
+    def __repr__(self):
+        return (
+            f"<RecurringContribution(id={self.id}, user_id={self.user_id}, fund_id={self.fund_id}, "
+            f"amount={self.amount}, next_run_on={self.next_run_on})>"
+        )
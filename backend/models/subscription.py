@@ -2,7 +2,7 @@
 Modelo de suscripción de usuario a fondos
 """
 
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -13,6 +13,9 @@ class Subscription(Base):
     """Modelo de suscripción de usuario a un fondo"""
     
     __tablename__ = "subscriptions"
+    __table_args__ = (
+        Index("ix_subscriptions_user_fund", "user_id", "fund_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,32 @@
+"""
+Modelo de las valoraciones diarias (snapshots) de las suscripciones activas
+"""
+
+from sqlalchemy import Column, Integer, Float, Date
+
+from database.connection import Base
+
+
+class SubscriptionValuation(Base):
+    """Valor de mercado de una suscripción al cierre de `valuation_date`
+    
+    Sin claves foráneas ni índices secundarios: cada snapshot se escribe en
+    bloque para millones de posiciones y solo se consulta por fecha y
+    suscripción (la clave primaria).
+    """
+    
+    __tablename__ = "subscription_valuations"
+    
+    valuation_date = Column(Date, primary_key=True)
+    subscription_id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    fund_id = Column(Integer, nullable=False)
+    principal = Column(Float, nullable=False)
+    market_value = Column(Float, nullable=False)
+    accrued_return = Column(Float, nullable=False)
+    
+    def __repr__(self):
+        return (
+            f"<SubscriptionValuation(date={self.valuation_date}, subscription_id={self.subscription_id}, "
+            f"market_value={self.market_value})>"
+        )
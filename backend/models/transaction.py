@@ -2,24 +2,32 @@
 Modelo de transacciones del sistema
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
-import uuid
 
+from core.ids import uuid7
 from database.connection import Base
+from database.types import UUIDString
 
 
 class Transaction(Base):
-    """Modelo de transacciones (aperturas y cancelaciones)"""
+    """Modelo de transacciones (aperturas, cancelaciones y aportes programados)"""
     
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Historial por usuario: filtros de igualdad seguidos de rango por fecha
+        Index("ix_transactions_user_created", "user_id", "created_at", "id"),
+        Index("ix_transactions_user_type_created", "user_id", "transaction_type", "created_at"),
+        Index("ix_transactions_user_fund_created", "user_id", "fund_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    transaction_id = Column(String(36), unique=True, index=True, default=lambda: str(uuid.uuid4()))
+    # UUIDv7: creciente en el tiempo, las inserciones se añaden al final del índice
+    transaction_id = Column(UUIDString, unique=True, index=True, default=lambda: str(uuid7()))
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     fund_id = Column(Integer, ForeignKey("funds.id"), nullable=False)
-    transaction_type = Column(String(20), nullable=False)  # "subscription" or "cancellation"
+    transaction_type = Column(String(20), nullable=False)  # "subscription", "cancellation" or "contribution"
     amount = Column(Float, nullable=False)
     status = Column(String(20), default="completed")  # "completed", "pending", "failed"
     description = Column(Text, nullable=True)
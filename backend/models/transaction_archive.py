@@ -0,0 +1,38 @@
+"""
+Modelo del archivo histórico (frío) de transacciones
+"""
+
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Index
+from datetime import datetime
+
+from database.connection import Base
+from database.types import UUIDString
+
+
+class TransactionArchive(Base):
+    """Transacciones movidas fuera de la tabla caliente por antigüedad
+    
+    En PostgreSQL la tabla está particionada por mes sobre created_at; por eso
+    la clave primaria incluye created_at y transaction_id no puede ser único.
+    """
+    
+    __tablename__ = "transactions_archive"
+    __table_args__ = (
+        Index("ix_transactions_archive_user_created", "user_id", "created_at"),
+        Index("ix_transactions_archive_transaction_id", "transaction_id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    created_at = Column(DateTime, primary_key=True)
+    transaction_id = Column(UUIDString, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    fund_id = Column(Integer, nullable=False)
+    transaction_type = Column(String(20), nullable=False)
+    amount = Column(Float, nullable=False)
+    status = Column(String(20))
+    description = Column(Text, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<TransactionArchive(id={self.id}, type='{self.transaction_type}', amount={self.amount})>"
@@ -0,0 +1,34 @@
+"""
+Modelo de agregados de transacciones por periodo
+"""
+
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, UniqueConstraint, Index
+
+from database.connection import Base
+
+
+class TransactionRollup(Base):
+    """Suma y conteo de transacciones por periodo (día o mes), fondo y tipo"""
+    
+    __tablename__ = "transaction_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "granularity", "period_start", "fund_id", "transaction_type",
+            name="uq_transaction_rollups_bucket"
+        ),
+        Index("ix_transaction_rollups_period", "granularity", "period_start"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    granularity = Column(String(5), nullable=False)  # "day" or "month"
+    period_start = Column(Date, nullable=False)
+    fund_id = Column(Integer, ForeignKey("funds.id"), nullable=False)
+    transaction_type = Column(String(20), nullable=False)
+    total_amount = Column(Float, nullable=False, default=0.0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return (
+            f"<TransactionRollup(granularity='{self.granularity}', period_start={self.period_start}, "
+            f"fund_id={self.fund_id}, type='{self.transaction_type}')>"
+        )
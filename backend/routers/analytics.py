@@ -0,0 +1,34 @@
+"""
+Router de analítica de transacciones
+"""
+
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from database.connection import get_db
+from services.analytics_service import AnalyticsService
+from schemas.analytics import FlowBucket
+
+router = APIRouter()
+
+
+@router.get("/analytics/flows", response_model=List[FlowBucket])
+async def get_flows(
+    start: date = Query(..., alias="from", description="Fecha inicial (inclusive)"),
+    end: date = Query(..., alias="to", description="Fecha final (inclusive)"),
+    granularity: str = Query("month", pattern="^(day|month)$"),
+    fund_id: Optional[int] = None,
+    transaction_type: Optional[str] = Query(None, pattern="^(subscription|cancellation|contribution)$"),
+    db: Session = Depends(get_db)
+):
+    """Obtener flujos agregados por periodo, fondo y tipo de transacción"""
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha inicial debe ser anterior o igual a la final"
+        )
+    
+    analytics_service = AnalyticsService(db)
+    return analytics_service.get_flows(start, end, granularity, fund_id, transaction_type)
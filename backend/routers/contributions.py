@@ -0,0 +1,39 @@
+"""
+Router de aportes periódicos programados
+"""
+
+from typing import List
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from database.connection import get_db
+from services.recurring_contribution_service import RecurringContributionService
+from services.user_service import UserService
+from schemas.recurring_contribution import RecurringContributionCreate, RecurringContributionWithDetails
+
+router = APIRouter()
+
+
+@router.get("/user/recurring-contributions", response_model=List[RecurringContributionWithDetails])
+async def list_recurring_contributions(db: Session = Depends(get_db)):
+    """Aportes programados vigentes del usuario"""
+    user_service = UserService(db)
+    return RecurringContributionService(db).list_schedules(user_service.get_default_user_id())
+
+
+@router.post("/user/recurring-contributions", response_model=RecurringContributionWithDetails)
+async def schedule_recurring_contribution(
+    contribution_data: RecurringContributionCreate,
+    db: Session = Depends(get_db)
+):
+    """Programar el aporte mensual a un fondo suscrito; reemplaza el vigente de ese fondo"""
+    user = UserService(db).get_default_user()
+    return RecurringContributionService(db).schedule(user, contribution_data)
+
+
+@router.delete("/user/recurring-contributions/{schedule_id}", response_model=RecurringContributionWithDetails)
+async def cancel_recurring_contribution(schedule_id: int, db: Session = Depends(get_db)):
+    """Desactivar un aporte programado"""
+    user_service = UserService(db)
+    return RecurringContributionService(db).cancel(user_service.get_default_user_id(), schedule_id)
@@ -0,0 +1,51 @@
+"""
+Router del stream de eventos (Server-Sent Events)
+"""
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from database.connection import get_db
+from services.event_service import event_broker
+from services.user_service import UserService
+
+router = APIRouter()
+
+
+@router.get("/events")
+async def stream_events(request: Request, db: Session = Depends(get_db)):
+    """Stream SSE con los cambios de saldo, transacciones y suscripciones del usuario
+
+    Eventos: `balance`, `transaction`, `subscription` y `resync` (el cliente
+    perdió eventos y debe volver a cargar sus datos una vez).
+    """
+    user_id = UserService(db).get_default_user_id()
+    # La conexión dura lo que el cliente: no retener la sesión de base de datos
+    db.close()
+
+    stream = event_broker.subscribe(user_id)
+    reconnected = request.headers.get("last-event-id") is not None
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            if reconnected:
+                # Los eventos emitidos mientras estaba desconectado no se conservan
+                yield "event: resync\ndata: {\"reason\": \"reconnect\"}\n\n"
+
+            while True:
+                event = await stream.next(settings.events_keepalive_seconds)
+                if event is None:
+                    yield ": keepalive\n\n"
+                else:
+                    yield event.encode()
+        finally:
+            event_broker.unsubscribe(stream)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
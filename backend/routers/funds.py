@@ -2,14 +2,15 @@
 Router para gestión de fondos
 """
 
-from typing import List
+from typing import Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from database.connection import get_db
+from services.fund_closure_service import FundClosureService
 from services.fund_service import FundService
 from services.user_service import UserService
-from schemas.fund import FundSummary, FundResponse
+from schemas.fund import FundSummary, FundResponse, FundEligibility, FundClosureResponse
 from schemas.subscription import SubscriptionResponse, SubscriptionWithDetails
 
 router = APIRouter()
@@ -19,7 +20,39 @@ router = APIRouter()
 async def get_all_funds(db: Session = Depends(get_db)):
     """Obtener todos los fondos disponibles"""
     fund_service = FundService(db)
-    return fund_service.get_all_funds()
+    return await fund_service.get_all_funds_coalesced()
+
+
+def parse_fund_amounts(amounts: Optional[str]) -> Dict[int, float]:
+    """Convertir "1:75000,3:50000" en {1: 75000.0, 3: 50000.0}"""
+    if not amounts:
+        return {}
+    
+    try:
+        pairs = (item.split(":") for item in amounts.split(",") if item.strip())
+        return {int(fund_id): float(amount) for fund_id, amount in pairs}
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Formato de montos inválido. Use fondo:monto separados por comas, p. ej. 1:75000,3:50000"
+        )
+
+
+# Declarada antes de /funds/{fund_id} para que "eligibility" no se tome como ID
+@router.get("/funds/eligibility", response_model=List[FundEligibility])
+async def check_eligibility_for_all_funds(
+    amount: Optional[float] = None,
+    amounts: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Verificar elegibilidad en todos los fondos activos en una sola petición"""
+    user_service = UserService(db)
+    fund_service = FundService(db)
+    
+    fund_amounts = parse_fund_amounts(amounts)
+    user = user_service.get_default_user()
+    
+    return fund_service.check_eligibility_for_all_funds(user, amount, fund_amounts)
 
 
 @router.get("/funds/{fund_id}", response_model=FundResponse)
@@ -37,6 +70,12 @@ async def get_fund_by_id(fund_id: int, db: Session = Depends(get_db)):
     return FundResponse.from_orm(fund)
 
 
+@router.get("/funds/{fund_id}/closure", response_model=FundClosureResponse)
+async def get_fund_closure(fund_id: int, db: Session = Depends(get_db)):
+    """Progreso del cierre de un fondo (ver commands.close_fund)"""
+    return FundClosureResponse.from_orm(FundClosureService(db).get_closure(fund_id))
+
+
 @router.get("/user/subscriptions", response_model=List[SubscriptionWithDetails])
 async def get_user_subscriptions(db: Session = Depends(get_db)):
     """Obtener suscripciones activas del usuario por defecto"""
@@ -46,28 +85,8 @@ async def get_user_subscriptions(db: Session = Depends(get_db)):
     # Obtener usuario por defecto
     user = user_service.get_default_user()
     
-    # Obtener suscripciones
-    subscriptions = fund_service.get_user_subscriptions(user.id)
-    
-    # Convertir a schema con detalles
-    subscriptions_with_details = []
-    for subscription in subscriptions:
-        fund = fund_service.get_fund_by_id(subscription.fund_id)
-        subscription_detail = SubscriptionWithDetails(
-            id=subscription.id,
-            user_id=subscription.user_id,
-            fund_id=subscription.fund_id,
-            amount=subscription.amount,
-            is_active=subscription.is_active,
-            subscribed_at=subscription.subscribed_at,
-            unsubscribed_at=subscription.unsubscribed_at,
-            fund_name=fund.name if fund else "Fondo no encontrado",
-            fund_category=fund.category if fund else "",
-            fund_minimum_amount=fund.minimum_amount if fund else 0
-        )
-        subscriptions_with_details.append(subscription_detail)
-    
-    return subscriptions_with_details
+    # Obtener suscripciones con los datos del fondo en una sola consulta
+    return fund_service.get_user_subscriptions_with_details(user.id)
 
 
 @router.get("/funds/{fund_id}/eligibility")
@@ -0,0 +1,54 @@
+"""
+Router de consulta de los perfiles de peticiones
+"""
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import FileResponse
+
+from core.config import settings
+from core.profiling import is_authorized, profile_store
+
+router = APIRouter()
+
+
+def require_profiling_token(x_profile_token: Optional[str] = Header(None)) -> None:
+    """Exigir la misma cabecera X-Profile-Token que activa el perfilado"""
+    if not settings.profiling_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="El perfilado de peticiones no está habilitado"
+        )
+    if not is_authorized(x_profile_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Token de perfilado inválido"
+        )
+
+
+@router.get("/profiles", response_model=List[dict], dependencies=[Depends(require_profiling_token)])
+async def list_profiles():
+    """Listar los perfiles guardados, del más reciente al más antiguo"""
+    return profile_store.list()
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_profiling_token)])
+async def download_profile(profile_id: str, format: str = "json"):
+    """Descargar un perfil: `json` (resumen, funciones y SQL) o `pstats` (volcado de cProfile)"""
+    if format not in ("json", "pstats"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Formato no soportado: use json o pstats"
+        )
+
+    suffix = ".json" if format == "json" else ".prof"
+    path = profile_store.path(profile_id, suffix)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Perfil no encontrado"
+        )
+
+    media_type = "application/json" if format == "json" else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=path.name)
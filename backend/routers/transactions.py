@@ -2,16 +2,20 @@
 Router para gestión de transacciones
 """
 
+from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Body
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from database.connection import get_db
-from services.transaction_service import TransactionService
+from services.transaction_service import TransactionService, decode_cursor
 from services.user_service import UserService
 from services.fund_service import FundService
-from schemas.transaction import TransactionResponse, TransactionWithDetails
-from schemas.subscription import SubscriptionCreate, SubscriptionCancellation
+from schemas.transaction import (
+    TransactionResponse, TransactionWithDetails, TransactionHistoryFilter, BulkCancellationResponse
+)
+from schemas.subscription import SubscriptionCreate, SubscriptionCancellation, BulkCancellationRequest
 
 router = APIRouter()
 
@@ -39,6 +43,8 @@ async def subscribe_to_fund(
         
         return TransactionResponse.from_orm(transaction)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -67,6 +73,37 @@ async def cancel_subscription(
         
         return TransactionResponse.from_orm(transaction)
         
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.post("/subscriptions/cancel-all", response_model=BulkCancellationResponse)
+async def cancel_all_subscriptions(
+    cancellation_data: Optional[BulkCancellationRequest] = None,
+    db: Session = Depends(get_db)
+):
+    """Liquidar todas las suscripciones activas, opcionalmente filtradas por fondos o categoría"""
+    user_service = UserService(db)
+    transaction_service = TransactionService(db)
+    cancellation_data = cancellation_data or BulkCancellationRequest()
+    
+    # Obtener usuario por defecto
+    user = user_service.get_default_user()
+    
+    try:
+        return await transaction_service.cancel_all_subscriptions(
+            user=user,
+            fund_ids=cancellation_data.fund_ids,
+            category=cancellation_data.category
+        )
+        
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -79,36 +116,70 @@ async def get_transaction_history(
     limit: int = 50,
     offset: int = 0,
     transaction_type: Optional[str] = None,
+    fund_id: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    include_archived: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Obtener historial de transacciones del usuario"""
+    """Obtener historial de transacciones del usuario
+    
+    Si la página está completa, la cabecera X-Next-Cursor permite pedir la
+    siguiente con `cursor` sin el coste de OFFSET en páginas profundas. Las
+    páginas se sirven ya serializadas desde caché hasta que el usuario escribe.
+    """
     user_service = UserService(db)
     transaction_service = TransactionService(db)
     
     # Obtener usuario por defecto
-    user = user_service.get_default_user()
+    user_id = user_service.get_default_user_id()
     
     # Validar transaction_type si se proporciona
-    if transaction_type and transaction_type not in ["subscription", "cancellation"]:
+    if transaction_type and transaction_type not in ["subscription", "cancellation", "contribution"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Tipo de transacción inválido. Use 'subscription', 'cancellation' o 'contribution'"
+        )
+    
+    try:
+        filters = TransactionHistoryFilter(
+            transaction_type=transaction_type,
+            fund_id=fund_id,
+            start_date=start_date,
+            end_date=end_date,
+            limit=max(min(limit, 100), 1),  # Máximo 100 transacciones
+            offset=offset,
+            cursor=cursor
+        )
+        if cursor:
+            decode_cursor(cursor)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="; ".join(f"{error['loc'][0]}: {error['msg']}" for error in e.errors())
+        )
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Tipo de transacción inválido. Use 'subscription' o 'cancellation'"
+            detail=str(e)
         )
     
-    # Obtener transacciones
-    transactions = transaction_service.get_user_transactions(
-        user_id=user.id,
-        limit=min(limit, 100),  # Máximo 100 transacciones
-        offset=offset,
-        transaction_type=transaction_type
+    # Obtener la página ya serializada
+    page = transaction_service.get_transaction_history_page(
+        user_id=user_id,
+        filters=filters,
+        include_archived=include_archived
     )
     
-    return transactions
+    headers = {"X-Next-Cursor": page.next_cursor} if page.next_cursor else None
+    return Response(content=page.body, media_type="application/json", headers=headers)
 
 
 @router.get("/transactions/{transaction_id}", response_model=TransactionResponse)
 async def get_transaction_by_id(
     transaction_id: str,
+    include_archived: bool = False,
     db: Session = Depends(get_db)
 ):
     """Obtener detalles de una transacción específica"""
@@ -119,7 +190,9 @@ async def get_transaction_by_id(
     user = user_service.get_default_user()
     
     # Obtener transacción
-    transaction = transaction_service.get_transaction_by_id(transaction_id, user.id)
+    transaction = transaction_service.get_transaction_by_id(
+        transaction_id, user.id, include_archived=include_archived
+    )
     
     if not transaction:
         raise HTTPException(
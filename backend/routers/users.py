@@ -2,12 +2,20 @@
 Router para gestión de usuarios
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from tempfile import SpooledTemporaryFile
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from database.connection import get_db
+from core.config import settings
+from database.connection import SessionLocal, get_db
+from services.projection_service import ProjectionService
 from services.user_service import UserService
-from schemas.user import UserResponse, NotificationPreferenceUpdate
+from schemas.projection import PortfolioProjection
+from schemas.user import BulkUserResult, UserResponse, NotificationPreferenceUpdate
 
 router = APIRouter()
 
@@ -16,9 +24,8 @@ router = APIRouter()
 async def get_user_profile(db: Session = Depends(get_db)):
     """Obtener perfil del usuario por defecto"""
     user_service = UserService(db)
-    user = user_service.get_default_user()
     
-    return UserResponse.from_orm(user)
+    return await user_service.get_user_profile_coalesced(user_service.get_default_user_id())
 
 
 @router.put("/user/notification-preference", response_model=UserResponse)
@@ -42,10 +49,102 @@ async def update_notification_preference(
 async def get_user_balance(db: Session = Depends(get_db)):
     """Obtener saldo actual del usuario"""
     user_service = UserService(db)
-    user = user_service.get_default_user()
+    user = await user_service.get_user_profile_coalesced(user_service.get_default_user_id())
     
     return {
         "balance": user.balance,
         "formatted_balance": f"COP ${user.balance:,.0f}",
         "currency": "COP"
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/user/portfolio/projection", response_model=PortfolioProjection)
+async def get_portfolio_projection(
+    years: int = Query(10, ge=1, description="Horizonte en años"),
+    paths: int = Query(10000, ge=100, description="Trayectorias simuladas"),
+    seed: int = Query(0, ge=0, description="Semilla; la misma semilla reproduce la proyección"),
+    db: Session = Depends(get_db)
+):
+    """Proyección Monte Carlo del valor de las suscripciones activas por categoría"""
+    if years > settings.projection_max_years or paths > settings.projection_max_paths:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo {settings.projection_max_years} años y {settings.projection_max_paths} trayectorias"
+        )
+    
+    user_service = UserService(db)
+    projection_service = ProjectionService(db)
+    return await projection_service.project(user_service.get_default_user_id(), years, paths, seed)
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+@router.post(
+    "/users/bulk",
+    response_model=BulkUserResult,
+    openapi_extra={"requestBody": {"content": {
+        "application/json": {"schema": {"type": "array", "items": {"$ref": "#/components/schemas/UserCreate"}}},
+        NDJSON_MEDIA_TYPE: {"schema": {"type": "string", "description": "Un UserCreate en JSON por línea"}},
+    }}}
+)
+async def bulk_create_users(request: Request, db: Session = Depends(get_db)):
+    """Crear usuarios en lote
+    
+    Con `application/json` recibe un arreglo (hasta BULK_USERS_MAX_JSON_ITEMS)
+    y responde con el resumen y los errores por posición. Con
+    `application/x-ndjson` recibe un usuario por línea sin límite de tamaño y
+    responde en NDJSON con una línea de progreso por lote confirmado y una
+    línea final con los totales.
+    """
+    if request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE):
+        # Se guarda el cuerpo completo antes de responder: mientras se transmite
+        # la respuesta ya no se puede seguir leyendo la petición
+        body = SpooledTemporaryFile(max_size=settings.bulk_users_spool_bytes)
+        async for part in request.stream():
+            body.write(part)
+        body.seek(0)
+        db.close()
+        return StreamingResponse(_bulk_progress(body), media_type=NDJSON_MEDIA_TYPE)
+    
+    try:
+        users = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="JSON inválido")
+    if not isinstance(users, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Se esperaba un arreglo de usuarios")
+    if len(users) > settings.bulk_users_max_json_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo {settings.bulk_users_max_json_items} usuarios por petición JSON; use {NDJSON_MEDIA_TYPE}"
+        )
+    
+    def create():
+        total = BulkUserResult(processed=len(users), created=0, duplicates=0, invalid=0, created_ids=[], errors=[])
+        for chunk in UserService(db).import_users(users, settings.bulk_users_chunk_size):
+            total.created += chunk.created
+            total.duplicates += chunk.duplicates
+            total.invalid += chunk.invalid
+            total.created_ids.extend(chunk.created_ids)
+            total.errors.extend(chunk.errors)
+        return total
+    
+    return await run_in_threadpool(create)
+
+
+def _bulk_progress(body):
+    """Líneas NDJSON de progreso; StreamingResponse lo itera en el pool de hilos"""
+    db = SessionLocal()
+    totals = {"processed": 0, "created": 0, "duplicates": 0, "invalid": 0}
+    try:
+        lines = (line for line in body if line.strip())
+        for chunk in UserService(db).import_users(lines, settings.bulk_users_chunk_size):
+            totals["processed"] += chunk.created + chunk.duplicates + chunk.invalid
+            totals["created"] += chunk.created
+            totals["duplicates"] += chunk.duplicates
+            totals["invalid"] += chunk.invalid
+            yield json.dumps({**totals, **chunk.model_dump(include={"created_ids", "errors"})}) + "\n"
+        yield json.dumps({**totals, "done": True}) + "\n"
+    finally:
+        db.close()
+        body.close()
@@ -0,0 +1,18 @@
+"""
+Schemas de analítica de transacciones
+"""
+
+from pydantic import BaseModel
+from datetime import date
+
+
+class FlowBucket(BaseModel):
+    """Flujo agregado de un periodo para un fondo y tipo de transacción"""
+    period_start: date
+    fund_id: int
+    transaction_type: str
+    total_amount: float
+    transaction_count: int
+    
+    class Config:
+        from_attributes = True
@@ -27,6 +27,17 @@ class FundResponse(FundBase):
         from_attributes = True
 
 
+class FundEligibility(BaseModel):
+    """Schema de elegibilidad de suscripción a un fondo"""
+    fund_id: int
+    fund_name: str
+    eligible: bool
+    message: str
+    user_balance: float
+    required_amount: float
+    fund_minimum: float
+
+
 class FundSummary(BaseModel):
     """Schema resumido de fondo para listados"""
     id: int
@@ -37,4 +48,18 @@ class FundSummary(BaseModel):
     is_active: bool
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class FundClosureResponse(BaseModel):
+    """Schema de progreso del cierre de un fondo"""
+    fund_id: int
+    status: str = Field(..., description="in_progress o completed")
+    total_subscriptions: int = Field(..., description="Suscripciones activas al iniciar el cierre")
+    refunded_subscriptions: int
+    refunded_amount: float
+    started_at: datetime
+    updated_at: datetime
+    completed_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,47 @@
+"""
+Schemas de la proyección Monte Carlo del portafolio
+"""
+
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class ProjectionPoint(BaseModel):
+    """Distribución del valor simulado al final de un año"""
+    year: int
+    mean: float
+    p5: float
+    p25: float
+    p50: float
+    p75: float
+    p95: float
+
+
+class ProjectionSeries(BaseModel):
+    """Proyección de una categoría de fondos (FPV, FIC) o del total"""
+    category: str
+    current_value: float
+    points: List[ProjectionPoint]
+    probability_of_loss: float = Field(..., description="Fracción de trayectorias que terminan por debajo del valor actual")
+
+
+class FundAssumption(BaseModel):
+    """Parámetros con los que se simuló un fondo"""
+    fund_id: int
+    fund_name: str
+    category: str
+    current_value: float
+    annual_return: float = Field(..., description="Rentabilidad anual esperada (media logarítmica)")
+    annual_volatility: float
+    source: str = Field(..., description="history si se estimó con fund_returns, default si se usó el supuesto de la categoría")
+
+
+class PortfolioProjection(BaseModel):
+    """Proyección del valor del portafolio del usuario"""
+    years: int
+    paths: int
+    seed: int
+    cached: bool
+    series: List[ProjectionSeries]
+    funds: List[FundAssumption]
+    estimated_until: Optional[str] = Field(default=None, description="Última fecha de rentabilidad usada en la estimación")
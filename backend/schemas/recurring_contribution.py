@@ -0,0 +1,39 @@
+"""
+Schemas de aportes periódicos programados
+"""
+
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import date, datetime
+
+
+class RecurringContributionCreate(BaseModel):
+    """Schema para programar (o reprogramar) el aporte mensual a un fondo"""
+    fund_id: int = Field(..., gt=0, description="ID del fondo; debe tener una suscripción activa")
+    amount: float = Field(..., gt=0, description="Monto de cada aporte")
+    day_of_month: int = Field(..., ge=1, le=28, description="Día del mes en que se cobra el aporte")
+
+
+class RecurringContributionResponse(BaseModel):
+    """Schema de respuesta para un aporte programado"""
+    id: int
+    user_id: int
+    fund_id: int
+    amount: float
+    day_of_month: int
+    next_run_on: date
+    is_active: bool
+    last_run_at: Optional[datetime] = None
+    last_status: Optional[str] = Field(
+        default=None, description="completed, insufficient_funds, subscription_inactive o fund_closed"
+    )
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class RecurringContributionWithDetails(RecurringContributionResponse):
+    """Schema de aporte programado con detalles del fondo"""
+    fund_name: str
+    fund_category: str
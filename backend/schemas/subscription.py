@@ -3,8 +3,8 @@ Schemas de suscripciones para validación de API
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime
 
 
 class SubscriptionBase(BaseModel):
@@ -35,6 +35,9 @@ class SubscriptionWithDetails(SubscriptionResponse):
     fund_name: str
     fund_category: str
     fund_minimum_amount: float
+    market_value: Optional[float] = Field(default=None, description="Valor de mercado en la última valoración")
+    accrued_return: Optional[float] = Field(default=None, description="Rentabilidad acumulada en la última valoración")
+    valued_at: Optional[date] = Field(default=None, description="Fecha de la última valoración")
     
     class Config:
         from_attributes = True
@@ -42,4 +45,10 @@ class SubscriptionWithDetails(SubscriptionResponse):
 
 class SubscriptionCancellation(BaseModel):
     """Schema para cancelación de suscripción"""
-    subscription_id: int = Field(..., gt=0, description="ID de la suscripción a cancelar")
\ No newline at end of file
+    subscription_id: int = Field(..., gt=0, description="ID de la suscripción a cancelar")
+
+
+class BulkCancellationRequest(BaseModel):
+    """Schema para liquidación de varias suscripciones en una sola operación"""
+    fund_ids: Optional[List[int]] = Field(default=None, description="Fondos a liquidar (todos si se omite)")
+    category: Optional[str] = Field(default=None, pattern="^(FPV|FIC)$", description="Categoría de fondos a liquidar")
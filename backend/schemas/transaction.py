@@ -3,7 +3,7 @@ Schemas de transacciones para validación de API
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -11,14 +11,14 @@ class TransactionBase(BaseModel):
     """Schema base para transacción"""
     fund_id: int = Field(..., gt=0, description="ID del fondo")
     amount: float = Field(..., gt=0, description="Monto de la transacción")
-    transaction_type: str = Field(..., pattern="^(subscription|cancellation)$")
+    transaction_type: str = Field(..., pattern="^(subscription|cancellation|contribution)$")
     description: Optional[str] = Field(None, max_length=500)
 
 
 class TransactionCreate(BaseModel):
     """Schema para creación de transacción"""
     fund_id: int = Field(..., gt=0, description="ID del fondo")
-    transaction_type: str = Field(..., pattern="^(subscription|cancellation)$")
+    transaction_type: str = Field(..., pattern="^(subscription|cancellation|contribution)$")
     amount: float = Field(..., gt=0, description="Monto de la transacción")
     description: Optional[str] = None
 
@@ -46,11 +46,20 @@ class TransactionWithDetails(TransactionResponse):
         from_attributes = True
 
 
+class BulkCancellationResponse(BaseModel):
+    """Schema de respuesta de la liquidación de varias suscripciones"""
+    cancelled_count: int
+    total_refunded: float
+    balance: float
+    transactions: List[TransactionResponse]
+
+
 class TransactionHistoryFilter(BaseModel):
     """Schema para filtros de historial de transacciones"""
-    transaction_type: Optional[str] = Field(None, pattern="^(subscription|cancellation)$")
+    transaction_type: Optional[str] = Field(None, pattern="^(subscription|cancellation|contribution)$")
     fund_id: Optional[int] = Field(None, gt=0)
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
     limit: int = Field(default=50, ge=1, le=100)
-    offset: int = Field(default=0, ge=0)
\ No newline at end of file
+    offset: int = Field(default=0, ge=0)
+    cursor: Optional[str] = Field(None, description="Cursor de la página anterior (X-Next-Cursor)")
\ No newline at end of file
@@ -41,4 +41,30 @@ class UserBalanceUpdate(BaseModel):
 
 class NotificationPreferenceUpdate(BaseModel):
     """Schema para actualización de preferencia de notificación"""
-    notification_preference: str = Field(..., pattern="^(email|sms)$")
\ No newline at end of file
+    notification_preference: str = Field(..., pattern="^(email|sms)$")
+
+class BulkUserError(BaseModel):
+    """Usuario de una carga masiva que no se creó"""
+    index: int = Field(..., description="Posición del usuario en la carga (desde 0)")
+    email: Optional[str] = None
+    status: str = Field(..., description="duplicate (email ya registrado o repetido) o invalid")
+    error: str
+
+
+class BulkUserChunkResult(BaseModel):
+    """Resultado de un lote de la carga masiva"""
+    created: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    created_ids: List[int] = Field(default_factory=list, description="IDs creados, en el orden de la carga")
+    errors: List[BulkUserError] = Field(default_factory=list)
+
+
+class BulkUserResult(BaseModel):
+    """Resultado total de la carga masiva"""
+    processed: int
+    created: int
+    duplicates: int
+    invalid: int
+    created_ids: List[int]
+    errors: List[BulkUserError]
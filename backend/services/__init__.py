@@ -2,9 +2,10 @@
 Services module containing business logic
 """
 
+from .analytics_service import AnalyticsService
 from .fund_service import FundService
 from .notification_service import NotificationService
 from .transaction_service import TransactionService
 from .user_service import UserService
 
-__all__ = ["FundService", "NotificationService", "TransactionService", "UserService"]
\ No newline at end of file
+__all__ = ["AnalyticsService", "FundService", "NotificationService", "TransactionService", "UserService"]
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""
+Servicio de analítica de transacciones basado en agregados por periodo
+"""
+
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from models.transaction_rollup import TransactionRollup
+from schemas.analytics import FlowBucket
+
+
+GRANULARITIES = ("day", "month")
+
+# (día, fund_id, transaction_type) -> [monto total, cantidad]
+RollupDeltas = Dict[Tuple[date, int, str], List[float]]
+
+
+def period_start(day: date, granularity: str) -> date:
+    """Inicio del periodo al que pertenece el día"""
+    return day.replace(day=1) if granularity == "month" else day
+
+
+def daily_deltas(transactions: Iterable[Tuple[int, str, float, datetime]]) -> RollupDeltas:
+    """Agrupar (fund_id, tipo, monto, created_at) por día"""
+    deltas: RollupDeltas = defaultdict(lambda: [0.0, 0])
+    for fund_id, transaction_type, amount, created_at in transactions:
+        bucket = deltas[(created_at.date(), fund_id, transaction_type)]
+        bucket[0] += amount
+        bucket[1] += 1
+    return deltas
+
+
+def apply_rollup_deltas(db, deltas: RollupDeltas) -> None:
+    """Sumar los deltas diarios a los agregados por día y por mes
+
+    Acepta una sesión o una conexión y se ejecuta en su transacción, de modo
+    que los agregados confirman junto con las transacciones que los originan.
+    """
+    if not deltas:
+        return
+
+    buckets: Dict[Tuple[str, date, int, str], List[float]] = defaultdict(lambda: [0.0, 0])
+    for (day, fund_id, transaction_type), (amount, count) in deltas.items():
+        for granularity in GRANULARITIES:
+            bucket = buckets[(granularity, period_start(day, granularity), fund_id, transaction_type)]
+            bucket[0] += amount
+            bucket[1] += count
+
+    # Orden fijo de las filas: dos escritores que tocan los mismos agregados
+    # los bloquean en el mismo orden y no pueden caer en un deadlock
+    rows = [
+        {
+            "granularity": granularity,
+            "period_start": start,
+            "fund_id": fund_id,
+            "transaction_type": transaction_type,
+            "total_amount": amount,
+            "transaction_count": count,
+        }
+        for (granularity, start, fund_id, transaction_type), (amount, count) in sorted(buckets.items())
+    ]
+
+    dialect = db.get_bind().dialect.name if isinstance(db, Session) else db.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        statement = dialect_insert(TransactionRollup)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["granularity", "period_start", "fund_id", "transaction_type"],
+                set_={
+                    "total_amount": TransactionRollup.total_amount + statement.excluded.total_amount,
+                    "transaction_count": TransactionRollup.transaction_count + statement.excluded.transaction_count,
+                },
+            ),
+            rows,
+        )
+        return
+
+    for row in rows:
+        result = db.execute(
+            update(TransactionRollup).where(
+                TransactionRollup.granularity == row["granularity"],
+                TransactionRollup.period_start == row["period_start"],
+                TransactionRollup.fund_id == row["fund_id"],
+                TransactionRollup.transaction_type == row["transaction_type"],
+            ).values(
+                total_amount=TransactionRollup.total_amount + row["total_amount"],
+                transaction_count=TransactionRollup.transaction_count + row["transaction_count"],
+            )
+        )
+        if result.rowcount == 0:
+            db.execute(TransactionRollup.__table__.insert(), row)
+
+
+def apply_to_rollups(db, transactions: Iterable[Tuple[int, str, float, datetime]]) -> None:
+    """Registrar transacciones nuevas (fund_id, tipo, monto, created_at) en los agregados"""
+    apply_rollup_deltas(db, daily_deltas(transactions))
+
+
+class AnalyticsService:
+    """Servicio de consultas analíticas sobre los agregados"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_flows(
+        self,
+        start: date,
+        end: date,
+        granularity: str = "month",
+        fund_id: Optional[int] = None,
+        transaction_type: Optional[str] = None
+    ) -> List[FlowBucket]:
+        """Flujos por periodo, fondo y tipo entre dos fechas (inclusive)"""
+        query = self.db.query(TransactionRollup).filter(
+            TransactionRollup.granularity == granularity,
+            TransactionRollup.period_start >= period_start(start, granularity),
+            TransactionRollup.period_start <= end
+        )
+        
+        if fund_id:
+            query = query.filter(TransactionRollup.fund_id == fund_id)
+        if transaction_type:
+            query = query.filter(TransactionRollup.transaction_type == transaction_type)
+        
+        rollups = query.order_by(
+            TransactionRollup.period_start,
+            TransactionRollup.fund_id,
+            TransactionRollup.transaction_type
+        ).all()
+        
+        return [FlowBucket.from_orm(rollup) for rollup in rollups]
@@ -0,0 +1,142 @@
+"""
+Servicio de archivo de transacciones antiguas (datos fríos)
+"""
+
+import gzip
+import json
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterable, List
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from models.transaction import Transaction
+from models.transaction_archive import TransactionArchive
+from services.cache_service import bump_versions, user_key
+
+
+ARCHIVE_COLUMNS = (
+    "id", "created_at", "transaction_id", "user_id", "fund_id",
+    "transaction_type", "amount", "status", "description",
+)
+
+
+def month_start(value: datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def next_month(value: date) -> date:
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"transactions_archive_y{month.year}m{month.month:02d}"
+
+
+def partition_statements(first: datetime, last: datetime) -> List[str]:
+    """DDL de las particiones mensuales que cubren [first, last]
+
+    `first` y `last` son los `created_at` extremos del lote (datetime): se
+    comparan por su mes, nunca un date contra un datetime.
+    """
+    statements = []
+    month, last_month = month_start(first), month_start(last)
+    while month <= last_month:
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(month)} "
+            f"PARTITION OF transactions_archive "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+        )
+        month = next_month(month)
+    return statements
+
+
+class ArchiveService:
+    """Mueve transacciones fuera de la tabla caliente por lotes"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def ensure_partitions(self, first: datetime, last: datetime) -> None:
+        """Crear en PostgreSQL las particiones mensuales que cubren [first, last]
+
+        Las sentencias se arman en todos los dialectos, de modo que el cálculo
+        de los meses también se ejercita con SQLite; solo se ejecutan en
+        PostgreSQL.
+        """
+        statements = partition_statements(first, last)
+        if self.db.get_bind().dialect.name != "postgresql":
+            return
+
+        for statement in statements:
+            self.db.execute(text(statement))
+
+    def archive_chunk(self, cutoff: datetime, chunk_size: int, target: str = "table", output_dir: str = None) -> int:
+        """Archivar el siguiente lote de transacciones anteriores a `cutoff`
+
+        Devuelve cuántas filas se movieron; 0 cuando no quedan pendientes.
+        """
+        # El lote es un rango de IDs, así el INSERT y el DELETE no dependen de listas IN
+        ids = self.db.execute(
+            select(Transaction.id).where(
+                Transaction.created_at < cutoff
+            ).order_by(Transaction.id).limit(chunk_size)
+        ).scalars().all()
+
+        if not ids:
+            return 0
+
+        chunk = (Transaction.id <= ids[-1], Transaction.created_at < cutoff)
+
+        if target == "table":
+            oldest, newest = self.db.execute(
+                select(func.min(Transaction.created_at), func.max(Transaction.created_at)).where(*chunk)
+            ).one()
+            self.ensure_partitions(oldest, newest)
+
+            columns = [getattr(Transaction, column) for column in ARCHIVE_COLUMNS]
+            self.db.execute(
+                insert(TransactionArchive).from_select(
+                    list(ARCHIVE_COLUMNS), select(*columns).where(*chunk)
+                )
+            )
+        else:
+            rows = self.db.execute(
+                select(*[getattr(Transaction, column) for column in ARCHIVE_COLUMNS]).where(*chunk)
+            ).mappings().all()
+            self._write_ndjson(rows, output_dir)
+
+        # El historial de estos usuarios cambia: invalidar sus páginas en caché
+        user_ids = self.db.execute(select(Transaction.user_id).where(*chunk).distinct()).scalars().all()
+        bump_versions(self.db, [user_key(user_id) for user_id in user_ids])
+
+        self.db.execute(delete(Transaction).where(*chunk))
+        self.db.commit()
+        return len(ids)
+
+    def _write_ndjson(self, rows: Iterable[dict], output_dir: str) -> None:
+        """Añadir las filas a archivos NDJSON comprimidos, uno por mes
+
+        Se sincronizan a disco antes de borrar las filas de la base de datos. Si
+        el proceso se interrumpe entre ambos pasos, al reintentar el lote puede
+        quedar repetido en el archivo; transaction_id permite deduplicarlo.
+        """
+        directory = Path(output_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(month_start(row["created_at"]), []).append(row)
+
+        for month, month_rows in by_month.items():
+            path = directory / f"transactions-{month:%Y-%m}.ndjson.gz"
+            # Cada apertura en modo "ab" añade un miembro gzip válido al archivo
+            with open(path, "ab") as raw:
+                with gzip.GzipFile(fileobj=raw, mode="ab") as handle:
+                    for row in month_rows:
+                        record = {**row, "created_at": row["created_at"].isoformat()}
+                        handle.write((json.dumps(record) + "\n").encode("utf-8"))
+                raw.flush()
+                os.fsync(raw.fileno())
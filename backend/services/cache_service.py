@@ -0,0 +1,291 @@
+"""
+Servicio de coherencia de caché entre workers basado en sellos de versión
+
+Cada escritura incrementa la versión de las entidades afectadas dentro de su
+propia transacción. Los workers guardan en memoria el valor junto con la
+versión con la que se leyó, y antes de servirlo comprueban la versión actual:
+una lectura por clave primaria, o ninguna si hay un listener LISTEN/NOTIFY de
+PostgreSQL activo que avisa de los cambios.
+"""
+
+import logging
+import select
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Hashable, Iterable, Set, Tuple
+
+from sqlalchemy import event, text, update
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.cache_version import CacheVersion
+
+
+logger = logging.getLogger("fpv.cache")
+
+NOTIFY_CHANNEL = "cache_versions"
+FUNDS_KEY = "funds"
+
+
+def user_key(user_id: int) -> str:
+    """Clave de versión de los datos de un usuario (saldo, perfil, suscripciones)"""
+    return f"user:{user_id}"
+
+
+def bump_versions(db, keys: Iterable[str]) -> None:
+    """Incrementar la versión de las claves en la transacción en curso de `db`
+
+    Acepta una sesión o una conexión. La notificación de PostgreSQL es
+    transaccional: solo se entrega si la transacción confirma.
+    """
+    keys = sorted(set(keys))
+    if not keys:
+        return
+
+    dialect = db.get_bind().dialect.name if isinstance(db, Session) else db.dialect.name
+    now = datetime.utcnow()
+    rows = [{"key": key, "version": 1, "updated_at": now} for key in keys]
+
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        statement = dialect_insert(CacheVersion)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[CacheVersion.key],
+                set_={"version": CacheVersion.version + 1, "updated_at": statement.excluded.updated_at},
+            ),
+            rows,
+        )
+    else:
+        for row in rows:
+            result = db.execute(
+                update(CacheVersion).where(CacheVersion.key == row["key"]).values(
+                    version=CacheVersion.version + 1, updated_at=now
+                )
+            )
+            if result.rowcount == 0:
+                db.execute(CacheVersion.__table__.insert(), row)
+
+    if dialect == "postgresql":
+        for key in keys:
+            db.execute(text("SELECT pg_notify(:channel, :key)"), {"channel": NOTIFY_CHANNEL, "key": key})
+
+    if isinstance(db, Session):
+        db.info.setdefault("bumped_cache_keys", set()).update(keys)
+
+
+class VersionTracker:
+    """Lectura barata de versiones, con LISTEN/NOTIFY cuando el motor lo permite"""
+
+    def __init__(self):
+        self._known: Dict[str, int] = {}
+        self._epoch = 0
+        self.listening = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def current(self, db, key: str) -> int:
+        """Versión actual de la clave (0 si nunca se ha escrito)"""
+        if self.listening:
+            known = self._known.get(key)
+            if known is not None:
+                return known
+
+        epoch = self._epoch
+        version = db.execute(
+            text("SELECT version FROM cache_versions WHERE key = :key"), {"key": key}
+        ).scalar() or 0
+
+        # Solo recordar la versión si ningún aviso llegó mientras se leía
+        if self.listening and epoch == self._epoch:
+            self._known[key] = version
+        return version
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        """Olvidar las versiones conocidas de las claves"""
+        self._epoch += 1
+        for key in keys:
+            self._known.pop(key, None)
+
+    def start(self, engine) -> None:
+        """Iniciar el listener de PostgreSQL en un hilo en segundo plano"""
+        if engine.dialect.name != "postgresql" or not settings.cache_listen_notify:
+            return
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._listen, args=(engine,), name="cache-version-listener", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _listen(self, engine) -> None:
+        from sqlalchemy import create_engine
+        from sqlalchemy.pool import NullPool
+
+        # Conexión dedicada fuera del pool de la aplicación
+        listener_engine = create_engine(engine.url, poolclass=NullPool)
+
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = listener_engine.raw_connection()
+                dbapi_connection = connection.dbapi_connection
+                dbapi_connection.autocommit = True
+                dbapi_connection.cursor().execute(f"LISTEN {NOTIFY_CHANNEL}")
+
+                self._known.clear()
+                self.listening = True
+
+                while not self._stop.is_set():
+                    if select.select([dbapi_connection], [], [], 1.0) == ([], [], []):
+                        continue
+                    dbapi_connection.poll()
+                    keys = []
+                    while dbapi_connection.notifies:
+                        keys.append(dbapi_connection.notifies.pop(0).payload)
+                    self.invalidate(keys)
+            except Exception as e:
+                logger.warning("Listener de versiones de caché desconectado: %s", e)
+                self._stop.wait(1.0)
+            finally:
+                # Sin listener cada lectura vuelve a consultar la versión
+                self.listening = False
+                self._known.clear()
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+        listener_engine.dispose()
+
+
+version_tracker = VersionTracker()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_keys(session) -> None:
+    """El worker que escribe no espera a su propio NOTIFY para ver el cambio"""
+    keys = session.info.pop("bumped_cache_keys", None)
+    if keys:
+        version_tracker.invalidate(keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_keys(session) -> None:
+    session.info.pop("bumped_cache_keys", None)
+
+
+class VersionedCache:
+    """Caché en memoria cuyas entradas se validan contra un sello de versión"""
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Tuple[int, object]] = {}
+
+    def get_or_load(self, db, key: Hashable, version_key: str, loader: Callable):
+        """Devolver el valor en caché si su versión sigue vigente, o cargarlo"""
+        if not settings.cache_enabled:
+            return loader()
+
+        # Leer la versión antes que el valor: una escritura intermedia solo
+        # provoca una recarga adicional, nunca un valor desactualizado
+        version = version_tracker.current(db, version_key)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        value = loader()
+        self._entries[key] = (version, value)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class BoundedVersionedCache:
+    """Caché LRU con presupuesto de memoria cuyas entradas se validan contra un sello de versión
+
+    Cada entrada pertenece a una clave de versión (p. ej. `user:1`), lo que
+    permite descartar de una vez todas las de una entidad con `invalidate`.
+    Al superar `max_bytes` se expulsan las entradas usadas hace más tiempo.
+    """
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[object], int]):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.size = 0
+        self._entries: "OrderedDict[Hashable, Tuple[str, int, object, int]]" = OrderedDict()
+        self._by_version_key: Dict[str, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(self, db, key: Hashable, version_key: str, loader: Callable):
+        """Devolver el valor en caché si su versión sigue vigente, o cargarlo y guardarlo
+
+        Devuelve (valor, True si vino de la caché).
+        """
+        if not settings.cache_enabled:
+            return loader(), False
+
+        version = version_tracker.current(db, version_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == version:
+                self._entries.move_to_end(key)
+                return entry[2], True
+
+        value = loader()
+        self._store(key, version_key, version, value)
+        return value, False
+
+    def invalidate(self, version_key: str) -> None:
+        """Descartar todas las entradas de la clave de versión"""
+        with self._lock:
+            for key in self._by_version_key.pop(version_key, ()):
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_version_key.clear()
+            self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, key: Hashable, version_key: str, version: int, value) -> None:
+        cost = self.sizeof(value)
+        if cost > self.max_bytes:
+            return
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (version_key, version, value, cost)
+            self._by_version_key.setdefault(version_key, set()).add(key)
+            self.size += cost
+
+            while self.size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        version_key, _, _, cost = entry
+        self.size -= cost
+        keys = self._by_version_key.get(version_key)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_version_key[version_key]
@@ -0,0 +1,93 @@
+"""
+Broker en proceso de eventos para el stream SSE /events
+
+Los servicios publican tras confirmar cada escritura y el broker reparte el
+evento a las conexiones abiertas del usuario. Cada conexión tiene una cola
+acotada: si el cliente no consume a tiempo, sus eventos pendientes se
+descartan y se sustituyen por un único `resync`, de modo que un cliente lento
+nunca frena al que publica ni acumula memoria sin límite.
+"""
+
+import asyncio
+import itertools
+import json
+from dataclasses import dataclass
+from typing import Dict, Optional, Set
+
+from core.config import settings
+from core.metrics import EVENT_STREAMS, EVENT_OVERFLOWS
+
+
+@dataclass
+class Event:
+    """Evento SSE con identificador creciente dentro del proceso"""
+    id: int
+    type: str
+    data: dict
+
+    def encode(self) -> str:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data, default=str)}\n\n"
+
+
+class EventStream:
+    """Cola de eventos de una conexión"""
+
+    def __init__(self, user_id: int, max_queue: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+
+    def offer(self, event: Event) -> bool:
+        """Encolar sin bloquear; False si la cola se desbordó y se pidió resync"""
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(Event(event.id, "resync", {"reason": "overflow"}))
+            return False
+
+    async def next(self, timeout: float) -> Optional[Event]:
+        """Siguiente evento, o None si no llega ninguno en `timeout` segundos"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+    """Reparto de eventos por usuario; debe usarse desde el event loop"""
+
+    def __init__(self):
+        self._streams: Dict[int, Set[EventStream]] = {}
+        self._ids = itertools.count(1)
+
+    def subscribe(self, user_id: int, max_queue: int = None) -> EventStream:
+        stream = EventStream(user_id, max_queue or settings.events_queue_size)
+        self._streams.setdefault(user_id, set()).add(stream)
+        EVENT_STREAMS.inc()
+        return stream
+
+    def unsubscribe(self, stream: EventStream) -> None:
+        streams = self._streams.get(stream.user_id)
+        if streams and stream in streams:
+            streams.discard(stream)
+            EVENT_STREAMS.dec()
+            if not streams:
+                del self._streams[stream.user_id]
+
+    def publish(self, user_id: int, event_type: str, data: dict) -> None:
+        """Enviar un evento a todas las conexiones del usuario"""
+        streams = self._streams.get(user_id)
+        if not streams:
+            return
+        event = Event(next(self._ids), event_type, data)
+        for stream in streams:
+            if not stream.offer(event):
+                EVENT_OVERFLOWS.inc()
+
+    def connections(self, user_id: int) -> int:
+        return len(self._streams.get(user_id, ()))
+
+
+event_broker = EventBroker()
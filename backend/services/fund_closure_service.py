@@ -0,0 +1,239 @@
+"""
+Servicio de cierre de fondos
+
+Cerrar un fondo desactiva el fondo (deja de aceptar suscripciones) y devuelve
+el monto de todas sus suscripciones activas. Con cientos de miles de
+suscriptores eso no cabe en una transacción, así que el cierre avanza por
+lotes de suscripciones en orden de ID, y cada lote es una sola transacción:
+
+  1. bloquea a los usuarios del lote (como las cancelaciones del API) y
+     relee cuáles de sus suscripciones siguen activas;
+  2. cancela las suscripciones con un UPDATE masivo, devuelve los saldos e
+     inserta las transacciones de cancelación con executemany;
+  3. desactiva los aportes programados de esos usuarios al fondo;
+  4. avanza el cursor y los contadores de `fund_closures`.
+
+Como el avance se confirma junto con las devoluciones, un cierre
+interrumpido se retoma donde quedó sin devolver dos veces, y el progreso se
+consulta mientras corre. Las notificaciones se envían después del commit.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.ids import uuid7
+from database.bulk import update_by_id
+from models.fund import Fund
+from models.fund_closure import FundClosure
+from models.recurring_contribution import RecurringContribution
+from models.subscription import Subscription
+from models.transaction import Transaction
+from models.user import User
+from services.analytics_service import apply_to_rollups
+from services.cache_service import FUNDS_KEY, bump_versions, user_key
+from services.notification_service import FundClosureNotice
+from services.user_service import lock_users
+
+
+@dataclass
+class FundClosureChunkResult:
+    """Resultado de un lote ya confirmado"""
+    subscriptions: int
+    refunded: int = 0
+    amount: float = 0.0
+    notifications: List[FundClosureNotice] = field(default_factory=list)
+
+
+class FundClosureService:
+    """Servicio de cierre de fondos"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_closure(self, fund_id: int) -> FundClosure:
+        """Progreso del cierre de un fondo"""
+        closure = self.db.get(FundClosure, fund_id)
+        if not closure:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="El fondo no tiene un cierre registrado"
+            )
+        return closure
+
+    def start(self, fund_id: int) -> FundClosure:
+        """Desactivar el fondo y registrar su cierre, o retomar el ya registrado"""
+        closure = self.db.get(FundClosure, fund_id)
+        if closure:
+            return closure
+
+        fund = self.db.get(Fund, fund_id)
+        if not fund:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Fondo no encontrado"
+            )
+
+        # Desde aquí ni el API ni el group commit aceptan suscripciones nuevas
+        fund.is_active = False
+        total = self.db.scalar(
+            select(func.count(Subscription.id)).where(
+                Subscription.fund_id == fund_id,
+                Subscription.is_active == True
+            )
+        )
+        closure = FundClosure(fund_id=fund_id, status="in_progress", total_subscriptions=total)
+        self.db.add(closure)
+        # El listado de fondos cacheado en todos los workers deja de mostrarlo
+        bump_versions(self.db, [FUNDS_KEY])
+
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Otro proceso registró el mismo cierre: se retoma el suyo
+            self.db.rollback()
+            return self.db.get(FundClosure, fund_id)
+        return closure
+
+    def pending_subscriptions(self, fund_id: int, after_id: int, limit: int):
+        """Siguiente lote de suscripciones activas del fondo, por ID ascendente"""
+        return self.db.execute(
+            select(Subscription.id, Subscription.user_id).where(
+                Subscription.fund_id == fund_id,
+                Subscription.is_active == True,
+                Subscription.id > after_id
+            ).order_by(Subscription.id).limit(limit)
+        ).all()
+
+    def run(self, fund_id: int, chunk_size: Optional[int] = None) -> Iterator[FundClosureChunkResult]:
+        """Devolver y cancelar todas las suscripciones activas del fondo, un lote confirmado a la vez
+
+        Parte del cursor guardado, así que volver a ejecutarlo retoma un
+        cierre interrumpido (o recoge lo que quedara de uno terminado).
+        """
+        chunk_size = chunk_size or settings.fund_closure_chunk_size
+        closure = self.start(fund_id)
+        fund_name = self.db.get(Fund, fund_id).name
+        last_id = closure.last_subscription_id
+
+        while True:
+            rows = self.pending_subscriptions(fund_id, last_id, chunk_size)
+            # Fin de la transacción de lectura: el lote parte del último estado confirmado
+            self.db.rollback()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            yield self.run_chunk(fund_id, fund_name, rows)
+
+        self.db.execute(
+            update(FundClosure).where(FundClosure.fund_id == fund_id).values(
+                status="completed", completed_at=datetime.utcnow(), updated_at=datetime.utcnow()
+            )
+        )
+        self.db.commit()
+
+    def run_chunk(self, fund_id: int, fund_name: str, pending) -> FundClosureChunkResult:
+        """Devolver y cancelar en una transacción estas suscripciones del fondo
+
+        `pending` son pares (id, user_id) ordenados por ID; el último es el
+        nuevo cursor del cierre aunque alguna ya se hubiera cancelado.
+        """
+        result = FundClosureChunkResult(subscriptions=len(pending))
+        subscription_ids = [row.id for row in pending]
+        user_ids = sorted({row.user_id for row in pending})
+        try:
+            # Serializa con las cancelaciones del API: tras el bloqueo se leen
+            # las suscripciones que siguen activas y los saldos vigentes
+            lock_users(self.db, user_ids)
+            rows = self.db.execute(
+                select(
+                    Subscription.id,
+                    Subscription.user_id,
+                    Subscription.amount,
+                    User.balance,
+                    User.name.label("user_name"),
+                    User.email.label("user_email"),
+                    User.phone.label("user_phone"),
+                    User.notification_preference,
+                ).join(
+                    User, User.id == Subscription.user_id
+                ).where(
+                    Subscription.id.in_(subscription_ids),
+                    Subscription.is_active == True
+                ).order_by(Subscription.id)
+            ).all()
+
+            now = datetime.utcnow()
+            transactions, balances = [], {}
+            for row in rows:
+                result.refunded += 1
+                result.amount += row.amount
+                balances[row.user_id] = balances.get(row.user_id, row.balance) + row.amount
+                transactions.append({
+                    "transaction_id": str(uuid7()),
+                    "user_id": row.user_id,
+                    "fund_id": fund_id,
+                    "transaction_type": "cancellation",
+                    "amount": row.amount,
+                    "status": "completed",
+                    "description": f"Cancelación de suscripción a {fund_name} por cierre del fondo",
+                    "created_at": now,
+                })
+                result.notifications.append(FundClosureNotice(
+                    user_name=row.user_name,
+                    user_email=row.user_email,
+                    user_phone=row.user_phone,
+                    notification_type=row.notification_preference,
+                    fund_name=fund_name,
+                    amount=row.amount,
+                ))
+
+            if rows:
+                # Sentencias de Core en executemany: sin el coste por fila del ORM
+                self.db.execute(
+                    update(Subscription).where(
+                        Subscription.id.in_([row.id for row in rows])
+                    ).values(is_active=False, unsubscribed_at=now),
+                    execution_options={"synchronize_session": False}
+                )
+                # Saldos leídos con el usuario bloqueado: se escriben los valores finales
+                update_by_id(self.db, User, [
+                    {"row_id": user_id, "balance": balance} for user_id, balance in balances.items()
+                ])
+                self.db.execute(Transaction.__table__.insert(), transactions)
+                # Los aportes programados al fondo dejan de aplicar
+                self.db.execute(
+                    update(RecurringContribution).where(
+                        RecurringContribution.fund_id == fund_id,
+                        RecurringContribution.user_id.in_(list(balances)),
+                        RecurringContribution.is_active == True
+                    ).values(is_active=False, last_run_at=now, last_status="fund_closed"),
+                    execution_options={"synchronize_session": False}
+                )
+                apply_to_rollups(self.db, [
+                    (fund_id, "cancellation", row["amount"], now) for row in transactions
+                ])
+                bump_versions(self.db, [user_key(user_id) for user_id in balances])
+
+            # El avance se confirma con las devoluciones: un lote nunca se aplica dos veces
+            self.db.execute(
+                update(FundClosure).where(FundClosure.fund_id == fund_id).values(
+                    refunded_subscriptions=FundClosure.refunded_subscriptions + result.refunded,
+                    refunded_amount=FundClosure.refunded_amount + result.amount,
+                    last_subscription_id=subscription_ids[-1],
+                    updated_at=now,
+                )
+            )
+            self.db.commit()
+
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return result
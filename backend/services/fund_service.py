@@ -2,15 +2,25 @@
 Servicio para gestión de fondos de inversión
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
+from sqlalchemy import and_, func, select
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
 from models.fund import Fund
 from models.subscription import Subscription
+from models.subscription_valuation import SubscriptionValuation
 from models.user import User
-from schemas.fund import FundResponse, FundSummary
-from schemas.subscription import SubscriptionCreate, SubscriptionResponse
+from schemas.fund import FundResponse, FundSummary, FundEligibility
+from schemas.subscription import SubscriptionCreate, SubscriptionResponse, SubscriptionWithDetails
+from core.config import settings
+from services.cache_service import FUNDS_KEY, VersionedCache
+from services.single_flight_service import SingleFlight
+
+
+# Listado de fondos compartido entre peticiones, validado con el sello "funds"
+_funds_cache = VersionedCache()
+_funds_flight = SingleFlight("funds")
 
 
 class FundService:
@@ -21,15 +31,24 @@ class FundService:
     
     def get_all_funds(self) -> List[FundSummary]:
         """Obtener todos los fondos disponibles"""
+        return _funds_cache.get_or_load(self.db, "active", FUNDS_KEY, self._load_active_funds)
+    
+    async def get_all_funds_coalesced(self) -> List[FundSummary]:
+        """Como get_all_funds, compartiendo la lectura entre peticiones simultáneas"""
+        if not settings.single_flight_enabled:
+            return self.get_all_funds()
+        return await _funds_flight.do("active", lambda db: FundService(db).get_all_funds())
+    
+    def _load_active_funds(self) -> List[FundSummary]:
         funds = self.db.query(Fund).filter(Fund.is_active == True).all()
         return [FundSummary.from_orm(fund) for fund in funds]
     
-    def get_fund_by_id(self, fund_id: int) -> Optional[Fund]:
-        """Obtener fondo por ID"""
-        return self.db.query(Fund).filter(
-            Fund.id == fund_id, 
-            Fund.is_active == True
-        ).first()
+    def get_fund_by_id(self, fund_id: int, include_inactive: bool = False) -> Optional[Fund]:
+        """Obtener fondo por ID; con `include_inactive` también los cerrados"""
+        query = self.db.query(Fund).filter(Fund.id == fund_id)
+        if not include_inactive:
+            query = query.filter(Fund.is_active == True)
+        return query.first()
     
     def validate_subscription_eligibility(self, user: User, fund: Fund, amount: float) -> None:
         """Validar si el usuario puede suscribirse al fondo"""
@@ -41,18 +60,12 @@ class FundService:
                 detail="Fondo no encontrado"
             )
         
-        # Verificar monto mínimo
-        if amount < fund.minimum_amount:
+        # Verificar monto mínimo y saldo suficiente
+        amount_error = self._amount_error(user, fund, amount)
+        if amount_error:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"El monto mínimo para {fund.name} es COP ${fund.minimum_amount:,.0f}"
-            )
-        
-        # Verificar saldo suficiente
-        if not user.has_sufficient_balance(amount):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"No tiene saldo disponible para vincularse al fondo {fund.name}"
+                detail=amount_error
             )
         
         # Verificar si ya está suscrito al fondo
@@ -68,6 +81,58 @@ class FundService:
                 detail=f"Ya está suscrito al fondo {fund.name}"
             )
     
+    @staticmethod
+    def _amount_error(user: User, fund, amount: float) -> Optional[str]:
+        """Mensaje de error por monto mínimo o saldo insuficiente, o None si es válido"""
+        if amount < fund.minimum_amount:
+            return f"El monto mínimo para {fund.name} es COP ${fund.minimum_amount:,.0f}"
+        
+        if not user.has_sufficient_balance(amount):
+            return f"No tiene saldo disponible para vincularse al fondo {fund.name}"
+        
+        return None
+    
+    def check_eligibility_for_all_funds(
+        self,
+        user: User,
+        amount: Optional[float] = None,
+        fund_amounts: Optional[Dict[int, float]] = None
+    ) -> List[FundEligibility]:
+        """Verificar elegibilidad en todos los fondos activos con una consulta de suscripciones
+        
+        Cada fondo se evalúa con su monto en `fund_amounts`, o con `amount`, o
+        con su monto mínimo si no se indica ninguno.
+        """
+        fund_amounts = fund_amounts or {}
+        
+        subscribed_fund_ids = {
+            fund_id for (fund_id,) in self.db.query(Subscription.fund_id).filter(
+                Subscription.user_id == user.id,
+                Subscription.is_active == True
+            )
+        }
+        
+        results = []
+        for fund in self.get_all_funds():
+            required_amount = fund_amounts.get(fund.id, amount if amount is not None else fund.minimum_amount)
+            
+            if fund.id in subscribed_fund_ids:
+                message = f"Ya está suscrito al fondo {fund.name}"
+            else:
+                message = self._amount_error(user, fund, required_amount)
+            
+            results.append(FundEligibility(
+                fund_id=fund.id,
+                fund_name=fund.name,
+                eligible=message is None,
+                message=message or f"Puede suscribirse al fondo {fund.name}",
+                user_balance=user.balance,
+                required_amount=required_amount,
+                fund_minimum=fund.minimum_amount
+            ))
+        
+        return results
+    
     def get_user_subscriptions(self, user_id: int) -> List[Subscription]:
         """Obtener suscripciones activas del usuario"""
         return self.db.query(Subscription).filter(
@@ -75,6 +140,44 @@ class FundService:
             Subscription.is_active == True
         ).all()
     
+    def get_user_subscriptions_with_details(self, user_id: int) -> List[SubscriptionWithDetails]:
+        """Obtener suscripciones activas del usuario junto con los datos del fondo
+        
+        Incluye el valor de mercado del snapshot de valoración más reciente;
+        las suscripciones posteriores a ese snapshot aún no tienen valor.
+        """
+        latest_valuation = select(func.max(SubscriptionValuation.valuation_date)).scalar_subquery()
+        rows = self.db.query(Subscription, Fund, SubscriptionValuation).outerjoin(
+            Fund, Fund.id == Subscription.fund_id
+        ).outerjoin(
+            SubscriptionValuation, and_(
+                SubscriptionValuation.valuation_date == latest_valuation,
+                SubscriptionValuation.subscription_id == Subscription.id
+            )
+        ).filter(
+            Subscription.user_id == user_id,
+            Subscription.is_active == True
+        ).all()
+        
+        return [
+            SubscriptionWithDetails(
+                id=subscription.id,
+                user_id=subscription.user_id,
+                fund_id=subscription.fund_id,
+                amount=subscription.amount,
+                is_active=subscription.is_active,
+                subscribed_at=subscription.subscribed_at,
+                unsubscribed_at=subscription.unsubscribed_at,
+                fund_name=fund.name if fund else "Fondo no encontrado",
+                fund_category=fund.category if fund else "",
+                fund_minimum_amount=fund.minimum_amount if fund else 0,
+                market_value=valuation.market_value if valuation else None,
+                accrued_return=valuation.accrued_return if valuation else None,
+                valued_at=valuation.valuation_date if valuation else None
+            )
+            for subscription, fund, valuation in rows
+        ]
+    
     def get_subscription_by_id(self, subscription_id: int, user_id: int) -> Optional[Subscription]:
         """Obtener suscripción por ID y usuario"""
         return self.db.query(Subscription).filter(
@@ -0,0 +1,279 @@
+"""
+Confirmación agrupada (group commit) de suscripciones y cancelaciones
+
+Las escrituras concurrentes se encolan y un único flusher las aplica por lotes:
+cada lote se valida contra el estado en memoria de la sesión del lote (saldos y
+suscripciones activas ya modificados por las operaciones anteriores del mismo
+lote) y se confirma con un solo commit, de modo que el coste del fsync se
+reparte entre todas las operaciones del lote. Cada llamador recibe su propio
+resultado o error.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+from opentelemetry import trace
+
+from core.config import settings
+from core.metrics import SUBSCRIPTIONS_TOTAL, CANCELLATIONS_TOTAL
+from core.tracing import tracer
+from database.connection import SessionLocal
+from models.fund import Fund
+from models.subscription import Subscription
+from models.transaction import Transaction
+from models.user import User
+from services.analytics_service import apply_to_rollups
+from services.cache_service import bump_versions, user_key
+from services.fund_service import FundService
+from services.user_service import lock_users
+
+
+logger = logging.getLogger("fpv.group_commit")
+
+
+@dataclass
+class PendingWrite:
+    """Operación encolada: suscripción (fund_id, amount) o cancelación (subscription_id)"""
+    kind: str
+    user_id: int
+    fund_id: Optional[int] = None
+    amount: Optional[float] = None
+    subscription_id: Optional[int] = None
+    future: Optional[asyncio.Future] = field(default=None, repr=False)
+    span_context: Optional[trace.SpanContext] = field(default=None, repr=False)
+
+
+@dataclass
+class AppliedWrite:
+    """Resultado de una operación confirmada en un lote"""
+    transaction: Transaction
+    subscription: Subscription
+    fund: Fund
+    balance: float
+
+
+class GroupCommitter:
+    """Cola de escrituras confirmadas en lotes de hasta `max_batch` o cada `max_delay_ms`"""
+
+    def __init__(self, max_batch: int = None, max_delay_ms: float = None):
+        self.max_batch = max_batch or settings.group_commit_max_batch
+        self.max_delay = (max_delay_ms if max_delay_ms is not None else settings.group_commit_max_delay_ms) / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Iniciar el flusher en el event loop actual"""
+        if self._task and not self._task.done():
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Aplicar lo pendiente y detener el flusher"""
+        if not self._task:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, write: PendingWrite) -> AppliedWrite:
+        """Encolar una operación y esperar a que su lote se confirme
+
+        Devuelve el resultado de la operación, o lanza el error de validación
+        o de base de datos correspondiente a esta operación.
+        """
+        if not self._task or self._task.done():
+            self.start()
+        write.future = asyncio.get_running_loop().create_future()
+        # El lote se aplica en otro hilo: su span enlaza con el de cada petición
+        write.span_context = trace.get_current_span().get_span_context()
+        await self._queue.put(write)
+        return await write.future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+
+            batch = [first]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    write = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if write is None:
+                    stopping = True
+                    break
+                batch.append(write)
+
+            # La sesión es síncrona: el lote se aplica fuera del event loop
+            try:
+                results = await loop.run_in_executor(None, apply_batch, batch)
+            except Exception as e:
+                logger.exception("Error inesperado aplicando un lote de %d escrituras", len(batch))
+                results = [e] * len(batch)
+
+            for write, result in zip(batch, results):
+                if write.future.done():
+                    continue
+                if isinstance(result, Exception):
+                    write.future.set_exception(result)
+                else:
+                    write.future.set_result(result)
+
+
+def apply_batch(batch: List[PendingWrite]) -> list:
+    """Validar y aplicar un lote en una sola transacción
+
+    Devuelve, en el orden del lote, el AppliedWrite o la excepción de cada
+    operación. Un fallo al confirmar se propaga a todas las operaciones que
+    habían sido aceptadas.
+    """
+    links = [trace.Link(write.span_context) for write in batch if write.span_context and write.span_context.is_valid]
+    with tracer.start_as_current_span("group_commit batch", links=links, attributes={"batch.size": len(batch)}):
+        return _apply_batch(batch)
+
+
+def _apply_batch(batch: List[PendingWrite]) -> list:
+    db = SessionLocal(expire_on_commit=False)
+    try:
+        user_ids = {write.user_id for write in batch}
+        # Serializa los lotes de distintos workers que tocan los mismos usuarios
+        lock_users(db, user_ids)
+        users = {user.id: user for user in db.query(User).filter(User.id.in_(user_ids))}
+
+        subscription_ids = {write.subscription_id for write in batch if write.kind == "cancellation"}
+        subscriptions = {
+            subscription.id: subscription
+            for subscription in db.query(Subscription).filter(Subscription.id.in_(subscription_ids))
+        } if subscription_ids else {}
+
+        fund_ids = {write.fund_id for write in batch if write.kind == "subscription"}
+        fund_ids.update(subscription.fund_id for subscription in subscriptions.values())
+        funds = {fund.id: fund for fund in db.query(Fund).filter(Fund.id.in_(fund_ids))}
+
+        active_pairs = set(
+            db.query(Subscription.user_id, Subscription.fund_id).filter(
+                Subscription.user_id.in_(user_ids),
+                Subscription.is_active == True
+            )
+        )
+
+        fund_service = FundService(db)
+        results = []
+        accepted = []
+        for write in batch:
+            try:
+                if write.kind == "subscription":
+                    transaction, subscription, fund = _apply_subscription(db, write, users, funds, active_pairs)
+                else:
+                    transaction, subscription, fund = _apply_cancellation(
+                        db, fund_service, write, users, funds, subscriptions, active_pairs
+                    )
+                # Saldo tras esta operación, antes de las siguientes del lote
+                results.append(AppliedWrite(transaction, subscription, fund, users[write.user_id].balance))
+                accepted.append((write, transaction, fund))
+            except Exception as e:
+                results.append(e)
+
+        if not accepted:
+            db.rollback()
+            return results
+
+        try:
+            db.flush()
+            apply_to_rollups(db, [
+                (transaction.fund_id, transaction.transaction_type, transaction.amount, transaction.created_at)
+                for _, transaction, _ in accepted
+            ])
+            bump_versions(db, [user_key(write.user_id) for write, _, _ in accepted])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            return [e if not isinstance(result, Exception) else result for result in results]
+
+        for write, _, fund in accepted:
+            counter = SUBSCRIPTIONS_TOTAL if write.kind == "subscription" else CANCELLATIONS_TOTAL
+            counter.labels(str(fund.id)).inc()
+
+        return results
+    finally:
+        db.close()
+
+
+def _apply_subscription(db, write: PendingWrite, users, funds, active_pairs):
+    user = users.get(write.user_id)
+    fund = funds.get(write.fund_id)
+
+    # Mismas validaciones que FundService.validate_subscription_eligibility,
+    # contra el estado en memoria del lote
+    if not user or not fund or not fund.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Fondo no encontrado"
+        )
+
+    amount_error = FundService._amount_error(user, fund, write.amount)
+    if amount_error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=amount_error
+        )
+
+    if (user.id, fund.id) in active_pairs:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Ya está suscrito al fondo {fund.name}"
+        )
+
+    user.deduct_balance(write.amount)
+    active_pairs.add((user.id, fund.id))
+    subscription = Subscription(user_id=user.id, fund_id=fund.id, amount=write.amount, is_active=True)
+    db.add(subscription)
+
+    transaction = Transaction.create_subscription_transaction(
+        user_id=user.id,
+        fund_id=fund.id,
+        amount=write.amount,
+        description=f"Suscripción a {fund.name}"
+    )
+    db.add(transaction)
+    return transaction, subscription, fund
+
+
+def _apply_cancellation(db, fund_service, write: PendingWrite, users, funds, subscriptions, active_pairs):
+    user = users.get(write.user_id)
+    subscription = subscriptions.get(write.subscription_id)
+
+    # Igual que get_subscription_by_id: solo suscripciones activas del usuario
+    if not user or not subscription or subscription.user_id != user.id or not subscription.is_active:
+        subscription = None
+    fund_service.validate_cancellation_eligibility(subscription)
+
+    fund = funds[subscription.fund_id]
+    user.add_balance(subscription.amount)
+    subscription.unsubscribe()
+    active_pairs.discard((user.id, fund.id))
+
+    transaction = Transaction.create_cancellation_transaction(
+        user_id=user.id,
+        fund_id=subscription.fund_id,
+        amount=subscription.amount,
+        description=f"Cancelación de suscripción a {fund.name}"
+    )
+    db.add(transaction)
+    return transaction, subscription, fund
+
+
+group_committer = GroupCommitter()
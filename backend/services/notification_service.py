@@ -2,19 +2,42 @@
 Servicio para envío de notificaciones (email y SMS)
 """
 
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Optional
 import asyncio
-import aiosmtplib
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Iterable, List, Optional, Tuple
 
 from core.config import settings
+from core.metrics import track_notification
+from core.tracing import traced
+
+
+@dataclass
+class ContributionNotice:
+    """Resumen de los aportes programados de un usuario en una ejecución"""
+    user_name: str
+    user_email: str
+    user_phone: str
+    notification_type: str
+    contributions: List[Tuple[str, float]] = field(default_factory=list)
+    skipped: List[Tuple[str, float]] = field(default_factory=list)
+
+
+@dataclass
+class FundClosureNotice:
+    """Aviso al suscriptor de un fondo cerrado con el monto devuelto"""
+    user_name: str
+    user_email: str
+    user_phone: str
+    notification_type: str
+    fund_name: str
+    amount: float
 
 
 class NotificationService:
     """Servicio para envío de notificaciones"""
     
+    @traced("notification email", {"notification.channel": "email"})
+    @track_notification("email")
     async def send_email_notification(
         self, 
         to_email: str, 
@@ -28,6 +51,11 @@ class NotificationService:
                 print(f"Email notification (simulated): {subject} to {to_email}")
                 return True
             
+            # Importación diferida: solo se cargan si se envía un email real
+            import aiosmtplib
+            from email.mime.text import MIMEText
+            from email.mime.multipart import MIMEMultipart
+            
             # Crear mensaje
             msg = MIMEMultipart()
             msg['From'] = settings.smtp_username
@@ -62,6 +90,8 @@ class NotificationService:
             print(f"Error enviando email: {e}")
             return False
     
+    @traced("notification sms", {"notification.channel": "sms"})
+    @track_notification("sms")
     async def send_sms_notification(
         self, 
         to_phone: str, 
@@ -150,6 +180,143 @@ class NotificationService:
             return await self.send_sms_notification(user_phone, sms_message)
         
         return False
+    
+    async def send_bulk_cancellation_notification(
+        self,
+        user_name: str,
+        user_email: str,
+        user_phone: str,
+        cancellations: List[Tuple[str, float]],
+        total_amount: float,
+        notification_type: str = "email"
+    ) -> bool:
+        """Enviar una notificación resumen de la liquidación de varios fondos"""
+        
+        subject = "Liquidación de Fondos - FPV Management System"
+        details = "\n".join(
+            f"        - {fund_name}: COP ${amount:,.0f}" for fund_name, amount in cancellations
+        )
+        message = f"""
+        Sus suscripciones han sido canceladas exitosamente.
+        
+        Fondos liquidados:
+{details}
+        
+        Total devuelto: COP ${total_amount:,.0f}
+        Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
+        
+        El monto ha sido devuelto a su saldo disponible.
+        """
+        
+        if notification_type == "email":
+            return await self.send_email_notification(user_email, subject, message, user_name)
+        elif notification_type == "sms":
+            sms_message = (
+                f"Liquidación exitosa de {len(cancellations)} fondo(s). "
+                f"COP ${total_amount:,.0f} devuelto a su saldo. FPV System."
+            )
+            return await self.send_sms_notification(user_phone, sms_message)
+        
+        return False
+
+    
+    async def send_contribution_notification(self, notice: ContributionNotice) -> bool:
+        """Enviar el resumen de aportes programados cobrados y no cobrados"""
+        
+        subject = "Aportes Programados - FPV Management System"
+        lines = []
+        if notice.contributions:
+            lines.append("        Aportes realizados:")
+            lines.extend(f"        - {fund_name}: COP ${amount:,.0f}" for fund_name, amount in notice.contributions)
+        if notice.skipped:
+            lines.append("        Aportes no realizados por saldo insuficiente:")
+            lines.extend(f"        - {fund_name}: COP ${amount:,.0f}" for fund_name, amount in notice.skipped)
+        details = "\n".join(lines)
+        total = sum(amount for _, amount in notice.contributions)
+        message = f"""
+        Se procesaron sus aportes programados.
+        
+{details}
+        
+        Total aportado: COP ${total:,.0f}
+        Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
+        """
+        
+        if notice.notification_type == "email":
+            return await self.send_email_notification(notice.user_email, subject, message, notice.user_name)
+        elif notice.notification_type == "sms":
+            sms_message = f"Aportes programados: COP ${total:,.0f} en {len(notice.contributions)} fondo(s)."
+            if notice.skipped:
+                sms_message += f" {len(notice.skipped)} no realizado(s) por saldo insuficiente."
+            return await self.send_sms_notification(notice.user_phone, sms_message + " FPV System.")
+        
+        return False
+    
+    async def send_contribution_notifications(
+        self,
+        notices: Iterable[ContributionNotice],
+        concurrency: Optional[int] = None
+    ) -> int:
+        """Enviar los resúmenes de aportes de un lote; devuelve cuántos se enviaron"""
+        return await self._send_batch(notices, self.send_contribution_notification, "aportes", concurrency)
+    
+    async def send_fund_closure_notification(self, notice: FundClosureNotice) -> bool:
+        """Avisar del cierre de un fondo y de la devolución de la suscripción"""
+        
+        subject = "Cierre de Fondo - FPV Management System"
+        message = f"""
+        El fondo {notice.fund_name} ha sido cerrado y su suscripción fue cancelada.
+        
+        Detalles:
+        - Fondo: {notice.fund_name}
+        - Monto devuelto: COP ${notice.amount:,.0f}
+        - Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
+        
+        El monto ha sido devuelto a su saldo disponible.
+        """
+        
+        if notice.notification_type == "email":
+            return await self.send_email_notification(notice.user_email, subject, message, notice.user_name)
+        elif notice.notification_type == "sms":
+            sms_message = (
+                f"El fondo {notice.fund_name} fue cerrado. "
+                f"COP ${notice.amount:,.0f} devuelto a su saldo. FPV System."
+            )
+            return await self.send_sms_notification(notice.user_phone, sms_message)
+        
+        return False
+    
+    async def send_fund_closure_notifications(
+        self,
+        notices: Iterable[FundClosureNotice],
+        concurrency: Optional[int] = None
+    ) -> int:
+        """Enviar los avisos de cierre de un lote; devuelve cuántos se enviaron"""
+        return await self._send_batch(notices, self.send_fund_closure_notification, "cierre de fondo", concurrency)
+    
+    @staticmethod
+    async def _send_batch(
+        notices: Iterable,
+        send_one: Callable[..., Awaitable[bool]],
+        kind: str,
+        concurrency: Optional[int] = None
+    ) -> int:
+        """Enviar los avisos de un lote con envíos simultáneos acotados
+        
+        Devuelve cuántos se enviaron. Un fallo no detiene a los demás.
+        """
+        semaphore = asyncio.Semaphore(concurrency or settings.notification_batch_concurrency)
+        
+        async def send(notice) -> bool:
+            async with semaphore:
+                try:
+                    return await send_one(notice)
+                except Exception as e:
+                    print(f"Error enviando notificación de {kind}: {e}")
+                    return False
+        
+        results = await asyncio.gather(*(send(notice) for notice in notices))
+        return sum(results)
 
 
 # Importar datetime al final para evitar conflictos
@@ -0,0 +1,348 @@
+"""
+Proyección Monte Carlo del valor del portafolio
+
+Cada fondo sigue un movimiento browniano geométrico con parámetros estimados
+de su serie de rentabilidades diarias (`fund_returns`): media, volatilidad y
+correlación entre los fondos del portafolio. Los fondos sin historia
+suficiente usan el supuesto de su categoría y se simulan independientes.
+
+La simulación es vectorizada por lotes de trayectorias: cada lote sortea
+todos los choques anuales de todos los fondos de una vez. Con muchas
+trayectorias los lotes se reparten en un pool de procesos; cada lote tiene
+su propia semilla derivada de la de la petición, así que el resultado no
+depende del número de procesos. Los resultados se guardan en una caché LRU
+por composición del portafolio y parámetros, y las peticiones idénticas
+concurrentes comparten la misma simulación.
+
+NumPy se importa dentro de las funciones que lo usan: el router importa este
+módulo al cargar la aplicación y cada worker no debe pagar su importación
+hasta la primera proyección.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.metrics import PROJECTION_CACHE_REQUESTS
+from models.fund_return import FundReturn
+from schemas.projection import (
+    FundAssumption,
+    PortfolioProjection,
+    ProjectionPoint,
+    ProjectionSeries,
+)
+from services.fund_service import FundService
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# Las series de rentabilidad son por día calendario
+DAYS_PER_YEAR = 365
+# Observaciones mínimas para estimar un fondo (o su correlación) con su historia
+MIN_OBSERVATIONS = 60
+# (media, desviación) diaria por categoría para fondos sin historia suficiente
+CATEGORY_ASSUMPTIONS = {"FPV": (0.0002, 0.002), "FIC": (0.0003, 0.006)}
+PERCENTILES = (5, 25, 50, 75, 95)
+TOTAL = "total"
+
+
+@dataclass(frozen=True)
+class PortfolioModel:
+    """Posiciones por fondo y parámetros anuales de la simulación"""
+    fund_ids: Tuple[int, ...]
+    fund_names: Tuple[str, ...]
+    categories: Tuple[str, ...]
+    values: Tuple[float, ...]
+    drift: Tuple[float, ...]  # media anual del logaritmo del crecimiento
+    covariance: Tuple[Tuple[float, ...], ...]  # covarianza anual de los logaritmos
+    sources: Tuple[str, ...]
+    estimated_until: Optional[date]
+
+    def cache_key(self) -> tuple:
+        # Redondeado para que diferencias numéricas ínfimas no dupliquen entradas
+        return (
+            self.fund_ids,
+            self.categories,
+            tuple(round(value, 2) for value in self.values),
+            tuple(round(drift, 8) for drift in self.drift),
+            tuple(tuple(round(entry, 10) for entry in row) for row in self.covariance),
+        )
+
+
+def covariance_factor(covariance: np.ndarray) -> np.ndarray:
+    """Raíz de la covarianza (A @ A.T == covariance), tolerante a matrices semidefinidas"""
+    import numpy as np
+
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+    return eigenvectors * np.sqrt(np.clip(eigenvalues, 0.0, None))
+
+
+def simulate_batch(values: np.ndarray, drift: np.ndarray, factor: np.ndarray, groups: np.ndarray,
+                   group_count: int, years: int, paths: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """Valor por grupo al final de cada año: arreglo (años, grupos, trayectorias)
+
+    Función de módulo para poder ejecutarse en el pool de procesos.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    shocks = rng.standard_normal((years, len(values), paths))
+    log_growth = np.cumsum(drift[None, :, None] + np.matmul(factor, shocks), axis=0)
+    fund_values = values[None, :, None] * np.exp(log_growth)
+
+    totals = np.empty((years, group_count, paths), dtype=np.float32)
+    for group in range(group_count):
+        totals[:, group] = fund_values[:, groups == group].sum(axis=1)
+    return totals
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _process_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: el proceso del servidor tiene hilos (listener, pool de conexiones)
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.projection_workers or os.cpu_count() or 1,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_projection_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+# Clave -> tarea de simulación; guardar la tarea agrupa las peticiones concurrentes
+_projections: "OrderedDict[tuple, asyncio.Task]" = OrderedDict()
+
+
+class ProjectionService:
+    """Proyección del portafolio del usuario"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def build_model(self, user_id: int) -> PortfolioModel:
+        """Valor actual por fondo y parámetros estimados de la historia reciente"""
+        import numpy as np
+
+        positions: Dict[int, list] = {}
+        for subscription in FundService(self.db).get_user_subscriptions_with_details(user_id):
+            value = subscription.market_value if subscription.market_value is not None else subscription.amount
+            entry = positions.setdefault(
+                subscription.fund_id, [subscription.fund_name, subscription.fund_category, 0.0]
+            )
+            entry[2] += value
+
+        fund_ids = np.array(sorted(positions), dtype=np.int64)
+        means, deviations, correlation, sources, last_date = self._estimate(fund_ids, [
+            positions[fund_id][1] for fund_id in fund_ids.tolist()
+        ])
+
+        daily_covariance = np.outer(deviations, deviations) * correlation
+        # Media del logaritmo: la volatilidad resta rentabilidad compuesta
+        drift = DAYS_PER_YEAR * (np.log1p(means) - deviations ** 2 / 2)
+        covariance = DAYS_PER_YEAR * daily_covariance
+
+        return PortfolioModel(
+            fund_ids=tuple(fund_ids.tolist()),
+            fund_names=tuple(positions[fund_id][0] for fund_id in fund_ids.tolist()),
+            categories=tuple(positions[fund_id][1] for fund_id in fund_ids.tolist()),
+            values=tuple(positions[fund_id][2] for fund_id in fund_ids.tolist()),
+            drift=tuple(drift.tolist()),
+            covariance=tuple(tuple(row) for row in covariance.tolist()),
+            sources=tuple(sources),
+            estimated_until=last_date,
+        )
+
+    def _estimate(self, fund_ids: np.ndarray, categories: List[str]):
+        """Media, desviación y correlación diarias de los fondos"""
+        import numpy as np
+
+        count = len(fund_ids)
+        defaults = np.array([CATEGORY_ASSUMPTIONS.get(category, CATEGORY_ASSUMPTIONS["FIC"])
+                             for category in categories]).reshape(count, 2)
+        means, deviations = defaults[:, 0].copy(), defaults[:, 1].copy()
+        correlation = np.eye(count)
+        sources = ["default"] * count
+
+        last_date = self.db.execute(
+            select(func.max(FundReturn.date)).where(FundReturn.fund_id.in_(fund_ids.tolist()))
+        ).scalar() if count else None
+        if last_date is None:
+            return means, deviations, correlation, sources, None
+
+        first_date = last_date - timedelta(days=settings.projection_lookback_days - 1)
+        rows = self.db.execute(
+            select(FundReturn.fund_id, FundReturn.date, FundReturn.daily_return).where(
+                FundReturn.fund_id.in_(fund_ids.tolist()),
+                FundReturn.date >= first_date,
+                FundReturn.date <= last_date
+            )
+        ).all()
+
+        series = np.full((count, settings.projection_lookback_days), np.nan)
+        series_funds, series_dates, series_returns = zip(*rows)
+        day_columns = (
+            np.array(series_dates, dtype="datetime64[D]") - np.datetime64(first_date, "D")
+        ).astype(np.int64)
+        series[np.searchsorted(fund_ids, np.array(series_funds, dtype=np.int64)), day_columns] = series_returns
+
+        with_history = np.count_nonzero(~np.isnan(series), axis=1) >= MIN_OBSERVATIONS
+        if with_history.any():
+            means[with_history] = np.nanmean(series[with_history], axis=1)
+            deviations[with_history] = np.nanstd(series[with_history], axis=1, ddof=1)
+            for index in np.flatnonzero(with_history):
+                sources[index] = "history"
+
+            # Correlación con los días en que todos los fondos con historia tienen dato
+            rows_with_history = np.flatnonzero(with_history)
+            common = series[rows_with_history][:, ~np.isnan(series[rows_with_history]).any(axis=0)]
+            if len(rows_with_history) > 1 and common.shape[1] >= MIN_OBSERVATIONS:
+                estimated = np.nan_to_num(np.corrcoef(common))
+                np.fill_diagonal(estimated, 1.0)
+                correlation[np.ix_(rows_with_history, rows_with_history)] = estimated
+
+        return means, deviations, correlation, sources, last_date
+
+    async def project(self, user_id: int, years: int, paths: int, seed: int) -> PortfolioProjection:
+        """Proyección del portafolio actual del usuario, desde la caché si ya se simuló"""
+        model = self.build_model(user_id)
+        key = (model.cache_key(), years, paths, seed)
+
+        task = _projections.get(key)
+        cached = task is not None
+        if cached:
+            _projections.move_to_end(key)
+        else:
+            task = asyncio.ensure_future(self._simulate(model, years, paths, seed))
+            _projections[key] = task
+            while len(_projections) > settings.projection_cache_size:
+                _projections.popitem(last=False)
+        PROJECTION_CACHE_REQUESTS.labels("hit" if cached else "miss").inc()
+
+        try:
+            projection = await asyncio.shield(task)
+        except Exception:
+            # Un fallo no queda en la caché
+            if _projections.get(key) is task:
+                del _projections[key]
+            raise
+        return projection.model_copy(update={"cached": cached})
+
+    @staticmethod
+    async def _simulate(model: PortfolioModel, years: int, paths: int, seed: int) -> PortfolioProjection:
+        import numpy as np
+
+        group_names = sorted(set(model.categories))
+        funds = [
+            FundAssumption(
+                fund_id=fund_id,
+                fund_name=model.fund_names[index],
+                category=model.categories[index],
+                current_value=round(model.values[index], 2),
+                annual_return=round(math.expm1(model.drift[index]), 6),
+                annual_volatility=round(math.sqrt(model.covariance[index][index]), 6),
+                source=model.sources[index],
+            )
+            for index, fund_id in enumerate(model.fund_ids)
+        ]
+
+        if model.fund_ids:
+            values = np.array(model.values)
+            groups = np.array([group_names.index(category) for category in model.categories])
+            simulated = await simulate_paths(
+                values, np.array(model.drift), covariance_factor(np.array(model.covariance)),
+                groups, len(group_names), years, paths, seed
+            )
+            current = [float(values[groups == group].sum()) for group in range(len(group_names))]
+            series = [
+                summarize(name, current[group], simulated[:, group])
+                for group, name in enumerate(group_names)
+            ]
+            series.append(summarize(TOTAL, sum(current), simulated.sum(axis=1, dtype=np.float64)))
+        else:
+            series = [summarize(TOTAL, 0.0, np.zeros((years, 1)))]
+
+        return PortfolioProjection(
+            years=years,
+            paths=paths,
+            seed=seed,
+            cached=False,
+            series=series,
+            funds=funds,
+            estimated_until=model.estimated_until.isoformat() if model.estimated_until else None,
+        )
+
+
+async def simulate_paths(values: np.ndarray, drift: np.ndarray, factor: np.ndarray, groups: np.ndarray,
+                         group_count: int, years: int, paths: int, seed: int) -> np.ndarray:
+    """Simular `paths` trayectorias por lotes: en el pool de procesos si son muchas
+
+    Las semillas de los lotes derivan de `seed`, así que el resultado es el
+    mismo se ejecute en procesos o en hilos.
+    """
+    import numpy as np
+
+    batch_size = settings.projection_batch_paths
+    batches = math.ceil(paths / batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(batches)
+    executor = _process_pool() if paths >= settings.projection_parallel_min_paths else None
+
+    loop = asyncio.get_running_loop()
+    try:
+        parts = await asyncio.gather(*(
+            loop.run_in_executor(
+                executor, simulate_batch, values, drift, factor, groups, group_count, years,
+                min(batch_size, paths - index * batch_size), seeds[index]
+            )
+            for index in range(batches)
+        ))
+    except BrokenProcessPool:
+        # Un proceso murió (p. ej. por memoria): la siguiente petición crea un pool nuevo
+        shutdown_projection_pool()
+        raise
+    return np.concatenate(parts, axis=2)
+
+
+def summarize(category: str, current_value: float, simulated: np.ndarray) -> ProjectionSeries:
+    """Media y percentiles por año de un arreglo (años, trayectorias)"""
+    import numpy as np
+
+    percentiles = np.percentile(simulated, PERCENTILES, axis=1)
+    means = simulated.mean(axis=1, dtype=np.float64)
+    points = [
+        ProjectionPoint(
+            year=year + 1,
+            mean=round(float(means[year]), 2),
+            **{f"p{percentile}": round(float(percentiles[index, year]), 2)
+               for index, percentile in enumerate(PERCENTILES)}
+        )
+        for year in range(simulated.shape[0])
+    ]
+    loss = float(np.mean(simulated[-1] < current_value)) if current_value > 0 else 0.0
+    return ProjectionSeries(
+        category=category,
+        current_value=round(current_value, 2),
+        points=points,
+        probability_of_loss=round(loss, 4),
+    )
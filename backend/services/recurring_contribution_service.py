@@ -0,0 +1,329 @@
+"""
+Servicio de aportes periódicos programados
+
+Cada usuario puede programar un aporte mensual a los fondos en los que está
+suscrito. El ejecutor (commands.run_recurring_contributions) procesa las
+programaciones vencidas por lotes de usuarios, y cada lote es una sola
+transacción:
+
+  1. bloquea a los usuarios del lote (como las suscripciones del API);
+  2. lee en una consulta las programaciones vencidas con el saldo y la
+     suscripción activa, y decide en memoria qué aportes caben en el saldo
+     que le va quedando a cada usuario;
+  3. inserta todas las transacciones y actualiza saldos, suscripciones y
+     programaciones con sentencias masivas (executemany);
+  4. avanza `next_run_on` de todas las programaciones del lote.
+
+Como el cobro y el avance de la fecha se confirman juntos, un lote
+interrumpido no deja rastro y repetir la ejecución no cobra dos veces. Las
+notificaciones se envían después del commit, una por usuario con el resumen
+de sus aportes.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Iterator, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.ids import uuid7
+from database.bulk import update_by_id
+from models.fund import Fund
+from models.recurring_contribution import RecurringContribution
+from models.subscription import Subscription
+from models.transaction import Transaction
+from models.user import User
+from schemas.recurring_contribution import RecurringContributionCreate, RecurringContributionWithDetails
+from services.analytics_service import apply_to_rollups
+from services.cache_service import bump_versions, user_key
+from services.notification_service import ContributionNotice
+from services.user_service import lock_users
+
+
+def next_run_date(after: date, day_of_month: int, inclusive: bool = False) -> date:
+    """Primera fecha posterior a `after` (o igual, con `inclusive`) que cae en `day_of_month`
+
+    `day_of_month` va de 1 a 28, así que existe en todos los meses.
+    """
+    candidate = after.replace(day=day_of_month)
+    if candidate > after or (inclusive and candidate == after):
+        return candidate
+    first_of_next = (after.replace(day=1) + timedelta(days=32)).replace(day=1)
+    return first_of_next.replace(day=day_of_month)
+
+
+@dataclass
+class ContributionChunkResult:
+    """Resultado de un lote ya confirmado"""
+    users: int
+    schedules: int = 0
+    charged: int = 0
+    insufficient_funds: int = 0
+    deactivated: int = 0
+    amount: float = 0.0
+    notifications: List[ContributionNotice] = field(default_factory=list)
+
+
+class RecurringContributionService:
+    """Servicio de aportes periódicos programados"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def list_schedules(self, user_id: int) -> List[RecurringContributionWithDetails]:
+        """Aportes programados vigentes del usuario con los datos del fondo"""
+        rows = self.db.query(RecurringContribution, Fund).join(
+            Fund, Fund.id == RecurringContribution.fund_id
+        ).filter(
+            RecurringContribution.user_id == user_id,
+            RecurringContribution.is_active == True
+        ).order_by(RecurringContribution.next_run_on, RecurringContribution.id).all()
+
+        return [self._with_details(schedule, fund) for schedule, fund in rows]
+
+    def schedule(self, user: User, data: RecurringContributionCreate,
+                 today: Optional[date] = None) -> RecurringContributionWithDetails:
+        """Programar el aporte mensual a un fondo, o reprogramar el vigente"""
+        today = today or date.today()
+
+        fund = self.db.query(Fund).filter(Fund.id == data.fund_id, Fund.is_active == True).first()
+        if not fund:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Fondo no encontrado"
+            )
+
+        subscribed = self.db.query(Subscription.id).filter(
+            Subscription.user_id == user.id,
+            Subscription.fund_id == fund.id,
+            Subscription.is_active == True
+        ).first()
+        if not subscribed:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Debe estar suscrito al fondo {fund.name} para programar aportes"
+            )
+
+        schedule = self.db.query(RecurringContribution).filter(
+            RecurringContribution.user_id == user.id,
+            RecurringContribution.fund_id == fund.id,
+            RecurringContribution.is_active == True
+        ).first()
+        if schedule is None:
+            schedule = RecurringContribution(user_id=user.id, fund_id=fund.id, is_active=True)
+            self.db.add(schedule)
+
+        schedule.amount = data.amount
+        schedule.day_of_month = data.day_of_month
+        schedule.next_run_on = next_run_date(today, data.day_of_month, inclusive=True)
+
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Otra petición programó el mismo fondo (índice único parcial)
+            self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="El aporte programado cambió durante la operación, intente de nuevo"
+            )
+        self.db.refresh(schedule)
+        return self._with_details(schedule, fund)
+
+    def cancel(self, user_id: int, schedule_id: int) -> RecurringContributionWithDetails:
+        """Desactivar un aporte programado del usuario"""
+        row = self.db.query(RecurringContribution, Fund).join(
+            Fund, Fund.id == RecurringContribution.fund_id
+        ).filter(
+            RecurringContribution.id == schedule_id,
+            RecurringContribution.user_id == user_id,
+            RecurringContribution.is_active == True
+        ).first()
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Aporte programado no encontrado"
+            )
+
+        schedule, fund = row
+        schedule.is_active = False
+        self.db.commit()
+        self.db.refresh(schedule)
+        return self._with_details(schedule, fund)
+
+    def due_user_ids(self, as_of: date, after_user_id: int, limit: int) -> List[int]:
+        """Siguiente lote de usuarios con aportes vencidos, por ID ascendente"""
+        return self.db.scalars(
+            select(RecurringContribution.user_id).where(
+                RecurringContribution.is_active == True,
+                RecurringContribution.next_run_on <= as_of,
+                RecurringContribution.user_id > after_user_id
+            ).group_by(RecurringContribution.user_id).order_by(RecurringContribution.user_id).limit(limit)
+        ).all()
+
+    def run_due(self, as_of: date, chunk_size: Optional[int] = None) -> Iterator[ContributionChunkResult]:
+        """Procesar todos los aportes vencidos a `as_of`, un lote confirmado a la vez
+
+        Todas las programaciones de un usuario caen en el mismo lote, así que
+        su saldo se valida de una vez contra la suma de sus aportes.
+        """
+        chunk_size = chunk_size or settings.recurring_contributions_chunk_size
+        last_user_id = 0
+        while True:
+            user_ids = self.due_user_ids(as_of, last_user_id, chunk_size)
+            # Fin de la transacción de lectura: el lote parte del último estado confirmado
+            self.db.rollback()
+            if not user_ids:
+                return
+            last_user_id = user_ids[-1]
+            yield self.run_chunk(user_ids, as_of)
+
+    def run_chunk(self, user_ids: List[int], as_of: date) -> ContributionChunkResult:
+        """Cobrar en una transacción los aportes vencidos de estos usuarios"""
+        result = ContributionChunkResult(users=len(user_ids))
+        try:
+            # Serializa con las suscripciones y cancelaciones del API y con
+            # otro ejecutor: tras el bloqueo se leen las programaciones vigentes
+            lock_users(self.db, user_ids)
+            rows = self.db.execute(self._due_query(user_ids, as_of)).all()
+            if not rows:
+                self.db.rollback()
+                return result
+
+            now = datetime.utcnow()
+            transactions, balances, subscriptions, schedules = [], {}, {}, []
+            notices = {}
+            for row in rows:
+                result.schedules += 1
+                next_run_on = next_run_date(as_of, row.day_of_month)
+
+                if not row.fund_active or row.subscription_id is None:
+                    # El fondo se cerró (su cierre aún puede estar devolviendo
+                    # suscripciones) o se canceló la suscripción: deja de aplicar
+                    result.deactivated += 1
+                    schedules.append({
+                        "row_id": row.id, "next_run_on": next_run_on, "is_active": False,
+                        "last_run_at": now,
+                        "last_status": "fund_closed" if not row.fund_active else "subscription_inactive",
+                    })
+                    continue
+
+                notice = notices.get(row.user_id)
+                if notice is None:
+                    notice = notices[row.user_id] = ContributionNotice(
+                        user_name=row.user_name,
+                        user_email=row.user_email,
+                        user_phone=row.user_phone,
+                        notification_type=row.notification_preference,
+                    )
+
+                # Saldo que le queda al usuario tras los aportes ya cobrados en el lote;
+                # uno que no cabe no impide cobrar los siguientes que sí
+                remaining = balances.get(row.user_id, row.balance)
+                if row.amount > remaining:
+                    result.insufficient_funds += 1
+                    notice.skipped.append((row.fund_name, row.amount))
+                    schedules.append({
+                        "row_id": row.id, "next_run_on": next_run_on, "is_active": True,
+                        "last_run_at": now, "last_status": "insufficient_funds",
+                    })
+                    continue
+
+                result.charged += 1
+                result.amount += row.amount
+                notice.contributions.append((row.fund_name, row.amount))
+                balances[row.user_id] = remaining - row.amount
+                subscriptions[row.subscription_id] = row.subscription_amount + row.amount
+                transactions.append({
+                    "transaction_id": str(uuid7()),
+                    "user_id": row.user_id,
+                    "fund_id": row.fund_id,
+                    "transaction_type": "contribution",
+                    "amount": row.amount,
+                    "status": "completed",
+                    "description": f"Aporte programado a {row.fund_name}",
+                    "created_at": now,
+                })
+                schedules.append({
+                    "row_id": row.id, "next_run_on": next_run_on, "is_active": True,
+                    "last_run_at": now, "last_status": "completed",
+                })
+
+            # Sentencias de Core en executemany: sin el coste por fila del ORM
+            if transactions:
+                self.db.execute(Transaction.__table__.insert(), transactions)
+                # Saldos leídos con el usuario bloqueado: se escriben los valores finales
+                update_by_id(self.db, User, [
+                    {"row_id": user_id, "balance": balance} for user_id, balance in balances.items()
+                ])
+                update_by_id(self.db, Subscription, [
+                    {"row_id": subscription_id, "amount": amount} for subscription_id, amount in subscriptions.items()
+                ])
+                apply_to_rollups(self.db, [
+                    (row["fund_id"], "contribution", row["amount"], now) for row in transactions
+                ])
+                bump_versions(self.db, [user_key(user_id) for user_id in balances])
+            update_by_id(self.db, RecurringContribution, schedules)
+            self.db.commit()
+
+        except Exception:
+            self.db.rollback()
+            raise
+
+        result.notifications = [notice for notice in notices.values() if notice.contributions or notice.skipped]
+        return result
+
+    @staticmethod
+    def _due_query(user_ids: List[int], as_of: date):
+        """Programaciones vencidas de los usuarios con saldo y suscripción, en orden de creación"""
+        schedule = RecurringContribution
+        return select(
+            schedule.id,
+            schedule.user_id,
+            schedule.fund_id,
+            schedule.amount,
+            schedule.day_of_month,
+            User.balance,
+            User.name.label("user_name"),
+            User.email.label("user_email"),
+            User.phone.label("user_phone"),
+            User.notification_preference,
+            Fund.name.label("fund_name"),
+            Fund.is_active.label("fund_active"),
+            Subscription.id.label("subscription_id"),
+            Subscription.amount.label("subscription_amount"),
+        ).join(
+            User, User.id == schedule.user_id
+        ).join(
+            Fund, Fund.id == schedule.fund_id
+        ).outerjoin(
+            Subscription, and_(
+                Subscription.user_id == schedule.user_id,
+                Subscription.fund_id == schedule.fund_id,
+                Subscription.is_active == True
+            )
+        ).where(
+            schedule.user_id.in_(user_ids),
+            schedule.is_active == True,
+            schedule.next_run_on <= as_of
+        ).order_by(schedule.user_id, schedule.id)
+
+    @staticmethod
+    def _with_details(schedule: RecurringContribution, fund: Fund) -> RecurringContributionWithDetails:
+        return RecurringContributionWithDetails(
+            id=schedule.id,
+            user_id=schedule.user_id,
+            fund_id=schedule.fund_id,
+            amount=schedule.amount,
+            day_of_month=schedule.day_of_month,
+            next_run_on=schedule.next_run_on,
+            is_active=schedule.is_active,
+            last_run_at=schedule.last_run_at,
+            last_status=schedule.last_status,
+            created_at=schedule.created_at,
+            fund_name=fund.name,
+            fund_category=fund.category,
+        )
@@ -0,0 +1,67 @@
+"""
+Agrupación (single-flight) de lecturas concurrentes idénticas
+
+Cuando llegan a la vez muchas peticiones iguales (p. ej. el dashboard abierto
+en varias pestañas), solo la primera ejecuta la lectura; las demás esperan esa
+misma ejecución y reciben su resultado. No hay caché: en cuanto la llamada
+termina, la siguiente petición vuelve a leer, así que ningún resultado es más
+antiguo que la llamada en curso.
+
+La llamada compartida corre en el pool de hilos con su propia sesión, de modo
+que no depende de la petición que la inició: si esa petición se cancela, las
+demás siguen recibiendo el resultado. El resultado se comparte entre
+peticiones y no debe modificarse.
+"""
+
+import asyncio
+import contextvars
+from typing import Callable, Dict, Hashable, TypeVar
+
+from sqlalchemy.orm import Session
+
+from core.metrics import SINGLE_FLIGHT_SHARED
+from database.connection import SessionLocal
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Llamadas en curso por clave; debe usarse desde el event loop"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, load: Callable[[Session], T]) -> T:
+        """Ejecutar `load(db)` o unirse a la ejecución en curso de la misma clave"""
+        future = self._calls.get(key)
+        if future is None:
+            # Copiar el contexto conserva las estadísticas SQL y la traza de quien la inicia
+            call_context = contextvars.copy_context()
+            future = asyncio.get_running_loop().run_in_executor(None, call_context.run, self._run, load)
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            SINGLE_FLIGHT_SHARED.labels(self.name).inc()
+
+        # shield: cancelar una petición no cancela la llamada que esperan las demás
+        return await asyncio.shield(future)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    @staticmethod
+    def _run(load: Callable[[Session], T]) -> T:
+        db = SessionLocal()
+        try:
+            return load(db)
+        finally:
+            db.close()
+
+    def _forget(self, key: Hashable, done: asyncio.Future) -> None:
+        if self._calls.get(key) is done:
+            del self._calls[key]
+        # Evita el aviso de excepción no recuperada si nadie seguía esperando
+        if not done.cancelled():
+            done.exception()
@@ -2,18 +2,69 @@
 Servicio para gestión de transacciones
 """
 
+from dataclasses import dataclass
 from typing import List, Optional
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import and_, desc, func, insert, or_, update
 from datetime import datetime
+from fastapi import HTTPException, status
+import base64
+import uuid
 
 from models.transaction import Transaction
+from models.transaction_archive import TransactionArchive
 from models.user import User
 from models.fund import Fund
 from models.subscription import Subscription
-from schemas.transaction import TransactionCreate, TransactionResponse, TransactionWithDetails
+from schemas.transaction import (
+    TransactionCreate, TransactionResponse, TransactionWithDetails, TransactionHistoryFilter,
+    BulkCancellationResponse
+)
+from schemas.subscription import SubscriptionResponse, SubscriptionWithDetails
+from core.config import settings
+from core.ids import uuid7
+from core.metrics import SUBSCRIPTIONS_TOTAL, CANCELLATIONS_TOTAL, HISTORY_CACHE_REQUESTS
+from services.cache_service import BoundedVersionedCache, bump_versions, user_key
+from services.analytics_service import apply_to_rollups
 from services.fund_service import FundService
+from services.group_commit_service import PendingWrite, group_committer
+from services.event_service import event_broker
 from services.notification_service import NotificationService
+from services.user_service import lock_users
+
+
+def encode_cursor(created_at: datetime, transaction_pk: int) -> str:
+    """Cursor opaco de paginación a partir de la última fila de una página"""
+    raw = f"{created_at.isoformat()}|{transaction_pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str):
+    """Inverso de encode_cursor; ValueError si el cursor no es válido"""
+    try:
+        created_at, transaction_pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(transaction_pk)
+    except Exception:
+        raise ValueError("Cursor de paginación inválido")
+
+
+@dataclass
+class HistoryPage:
+    """Página del historial ya serializada a JSON"""
+    body: bytes
+    next_cursor: Optional[str]
+
+
+# Coste aproximado de la clave y la entrada, además del cuerpo
+_PAGE_OVERHEAD = 512
+
+# Páginas de historial por usuario, filtros, cursor y límite; válidas mientras no cambie `user:<id>`
+_history_pages = BoundedVersionedCache(
+    settings.history_cache_max_bytes,
+    lambda page: len(page.body) + len(page.next_cursor or "") + _PAGE_OVERHEAD
+)
+_history_adapter = TypeAdapter(List[TransactionWithDetails])
 
 
 class TransactionService:
@@ -33,13 +84,39 @@ class TransactionService:
     ) -> Transaction:
         """Crear transacción de suscripción a fondo"""
         
+        if settings.group_commit_enabled:
+            # Devolver la conexión al pool mientras se espera el lote, que usa
+            # su propia sesión: con muchas peticiones en espera lo agotarían
+            user_id = user.id
+            self.db.rollback()
+            applied = await group_committer.submit(PendingWrite(
+                kind="subscription", user_id=user_id, fund_id=fund_id, amount=amount
+            ))
+            self.db.expire(user)
+            transaction = applied.transaction
+            self._invalidate_history(user.id)
+            self._publish_write(user, transaction, applied.subscription, applied.fund, applied.balance)
+            
+            await self.notification_service.send_subscription_notification(
+                user_name=user.name,
+                user_email=user.email,
+                user_phone=user.phone,
+                fund_name=applied.fund.name,
+                amount=amount,
+                notification_type=notification_type
+            )
+            return transaction
+        
         # Obtener fondo
         fund = self.fund_service.get_fund_by_id(fund_id)
         
-        # Validar elegibilidad
-        self.fund_service.validate_subscription_eligibility(user, fund, amount)
-        
         try:
+            # Validar elegibilidad con el saldo y las suscripciones vigentes,
+            # bloqueando al usuario hasta el commit
+            lock_users(self.db, [user.id])
+            self.db.refresh(user)
+            self.fund_service.validate_subscription_eligibility(user, fund, amount)
+            
             # Deducir saldo del usuario
             if not user.deduct_balance(amount):
                 raise Exception("Error al deducir saldo")
@@ -60,11 +137,26 @@ class TransactionService:
                 description=f"Suscripción a {fund.name}"
             )
             self.db.add(transaction)
+            self.db.flush()
+            
+            # Agregados por periodo en la misma transacción
+            apply_to_rollups(self.db, [(
+                transaction.fund_id,
+                transaction.transaction_type,
+                transaction.amount,
+                transaction.created_at
+            )])
+            
+            # Invalidar cachés del usuario en todos los workers
+            bump_versions(self.db, [user_key(user.id)])
             
             # Guardar cambios
             self.db.commit()
             self.db.refresh(transaction)
             self.db.refresh(user)
+            SUBSCRIPTIONS_TOTAL.labels(str(fund.id)).inc()
+            self._invalidate_history(user.id)
+            self._publish_write(user, transaction, subscription, fund, user.balance)
             
             # Enviar notificación
             await self.notification_service.send_subscription_notification(
@@ -89,15 +181,41 @@ class TransactionService:
     ) -> Transaction:
         """Crear transacción de cancelación de suscripción"""
         
-        # Obtener suscripción
-        subscription = self.fund_service.get_subscription_by_id(subscription_id, user.id)
-        
-        # Validar elegibilidad de cancelación
-        self.fund_service.validate_cancellation_eligibility(subscription)
+        if settings.group_commit_enabled:
+            # Devolver la conexión al pool mientras se espera el lote, que usa
+            # su propia sesión: con muchas peticiones en espera lo agotarían
+            user_id = user.id
+            self.db.rollback()
+            applied = await group_committer.submit(PendingWrite(
+                kind="cancellation", user_id=user_id, subscription_id=subscription_id
+            ))
+            self.db.expire(user)
+            transaction = applied.transaction
+            self._invalidate_history(user.id)
+            self._publish_write(user, transaction, applied.subscription, applied.fund, applied.balance)
+            
+            await self.notification_service.send_cancellation_notification(
+                user_name=user.name,
+                user_email=user.email,
+                user_phone=user.phone,
+                fund_name=applied.fund.name,
+                amount=transaction.amount,
+                notification_type=user.notification_preference
+            )
+            return transaction
         
         try:
-            # Obtener fondo
-            fund = self.fund_service.get_fund_by_id(subscription.fund_id)
+            # Leer la suscripción con el usuario bloqueado: dos cancelaciones
+            # simultáneas no pueden devolver el monto dos veces
+            lock_users(self.db, [user.id])
+            self.db.refresh(user)
+            subscription = self.fund_service.get_subscription_by_id(subscription_id, user.id)
+            
+            # Validar elegibilidad de cancelación
+            self.fund_service.validate_cancellation_eligibility(subscription)
+            
+            # Obtener fondo: la suscripción a un fondo en cierre también se puede cancelar
+            fund = self.fund_service.get_fund_by_id(subscription.fund_id, include_inactive=True)
             
             # Devolver saldo al usuario
             user.add_balance(subscription.amount)
@@ -113,11 +231,26 @@ class TransactionService:
                 description=f"Cancelación de suscripción a {fund.name}"
             )
             self.db.add(transaction)
+            self.db.flush()
+            
+            # Agregados por periodo en la misma transacción
+            apply_to_rollups(self.db, [(
+                transaction.fund_id,
+                transaction.transaction_type,
+                transaction.amount,
+                transaction.created_at
+            )])
+            
+            # Invalidar cachés del usuario en todos los workers
+            bump_versions(self.db, [user_key(user.id)])
             
             # Guardar cambios
             self.db.commit()
             self.db.refresh(transaction)
             self.db.refresh(user)
+            CANCELLATIONS_TOTAL.labels(str(fund.id)).inc()
+            self._invalidate_history(user.id)
+            self._publish_write(user, transaction, subscription, fund, user.balance)
             
             # Enviar notificación
             await self.notification_service.send_cancellation_notification(
@@ -135,28 +268,210 @@ class TransactionService:
             self.db.rollback()
             raise e
     
+    async def cancel_all_subscriptions(
+        self,
+        user: User,
+        fund_ids: Optional[List[int]] = None,
+        category: Optional[str] = None
+    ) -> BulkCancellationResponse:
+        """Liquidar las suscripciones activas del usuario, opcionalmente por fondos o categoría
+        
+        Las cancelaciones, las transacciones y la devolución del saldo se
+        aplican con sentencias masivas en una sola transacción, y se envía una
+        única notificación con el resumen.
+        """
+        
+        try:
+            # Bloquear al usuario antes de tocar sus suscripciones, en el mismo
+            # orden que las demás escrituras; después se lee el conjunto vigente
+            lock_users(self.db, [user.id])
+            self.db.refresh(user)
+            
+            # Suscripciones a liquidar junto con su fondo, en una sola consulta
+            query = self.db.query(Subscription, Fund).join(
+                Fund, Fund.id == Subscription.fund_id
+            ).filter(
+                Subscription.user_id == user.id,
+                Subscription.is_active == True
+            )
+            if fund_ids:
+                query = query.filter(Subscription.fund_id.in_(fund_ids))
+            if category:
+                query = query.filter(Fund.category == category)
+            rows = query.order_by(Subscription.id).all()
+            
+            if not rows:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="No hay suscripciones activas para cancelar"
+                )
+            
+            now = datetime.utcnow()
+            subscription_ids = [subscription.id for subscription, _ in rows]
+            # (fondo, nombre, monto) leídos ahora: el commit expira los objetos
+            liquidated = [(fund.id, fund.name, subscription.amount) for subscription, fund in rows]
+            total_refunded = sum(amount for _, _, amount in liquidated)
+            
+            # Con el usuario bloqueado no deberían cambiar; se verifica por si acaso
+            result = self.db.execute(
+                update(Subscription).where(
+                    Subscription.id.in_(subscription_ids),
+                    Subscription.is_active == True
+                ).values(is_active=False, unsubscribed_at=now),
+                execution_options={"synchronize_session": "evaluate"}
+            )
+            if result.rowcount != len(subscription_ids):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Alguna suscripción cambió durante la liquidación, intente de nuevo"
+                )
+            
+            # Crear todas las transacciones en una sentencia; RETURNING en el orden
+            # de los parámetros para emparejar cada transacción con su suscripción
+            transactions = self.db.scalars(
+                insert(Transaction).returning(Transaction, sort_by_parameter_order=True),
+                [
+                    {
+                        "transaction_id": str(uuid7()),
+                        "user_id": user.id,
+                        "fund_id": fund.id,
+                        "transaction_type": "cancellation",
+                        "amount": subscription.amount,
+                        "status": "completed",
+                        "description": f"Cancelación de suscripción a {fund.name}",
+                        "created_at": now
+                    }
+                    for subscription, fund in rows
+                ]
+            ).all()
+            
+            # Devolver el total con una sola actualización del saldo
+            self.db.execute(
+                update(User).where(User.id == user.id).values(balance=User.balance + total_refunded),
+                execution_options={"synchronize_session": False}
+            )
+            
+            # Agregados por periodo en la misma transacción
+            apply_to_rollups(self.db, [
+                (transaction.fund_id, transaction.transaction_type, transaction.amount, transaction.created_at)
+                for transaction in transactions
+            ])
+            
+            # Invalidar cachés del usuario en todos los workers
+            bump_versions(self.db, [user_key(user.id)])
+            
+            # Respuesta y eventos antes de que el commit expire los objetos
+            responses = [TransactionResponse.from_orm(transaction) for transaction in transactions]
+            payloads = [
+                payload
+                for transaction, (subscription, fund) in zip(transactions, rows)
+                for payload in self._event_payloads(user, transaction, subscription, fund)
+            ]
+            
+            # Guardar cambios
+            self.db.commit()
+            self.db.refresh(user)
+            
+        except Exception as e:
+            self.db.rollback()
+            raise e
+        
+        for fund_id, _, _ in liquidated:
+            CANCELLATIONS_TOTAL.labels(str(fund_id)).inc()
+        self._invalidate_history(user.id)
+        self._publish_events(user.id, user.balance, payloads)
+        
+        # Una sola notificación con el resumen
+        await self.notification_service.send_bulk_cancellation_notification(
+            user_name=user.name,
+            user_email=user.email,
+            user_phone=user.phone,
+            cancellations=[(fund_name, amount) for _, fund_name, amount in liquidated],
+            total_amount=total_refunded,
+            notification_type=user.notification_preference
+        )
+        
+        return BulkCancellationResponse(
+            cancelled_count=len(responses),
+            total_refunded=total_refunded,
+            balance=user.balance,
+            transactions=responses
+        )
+    
+    @staticmethod
+    def _invalidate_history(user_id: int) -> None:
+        """Descartar en este worker las páginas de historial del usuario que acaba de escribir
+
+        Los demás workers las descartan al ver la nueva versión de `user:<id>`.
+        """
+        _history_pages.invalidate(user_key(user_id))
+    
+    @classmethod
+    def _publish_write(cls, user: User, transaction: Transaction, subscription: Subscription, fund: Fund, balance: float) -> None:
+        """Publicar en /events el saldo, la transacción y la suscripción ya confirmados"""
+        cls._publish_events(user.id, balance, cls._event_payloads(user, transaction, subscription, fund))
+    
+    @staticmethod
+    def _event_payloads(user: User, transaction: Transaction, subscription: Subscription, fund: Fund) -> list:
+        """Eventos `transaction` y `subscription` de una escritura"""
+        return [
+            ("transaction", TransactionWithDetails(
+                **TransactionResponse.from_orm(transaction).model_dump(),
+                fund_name=fund.name,
+                fund_category=fund.category,
+                user_name=user.name,
+                user_email=user.email
+            ).model_dump(mode="json")),
+            ("subscription", SubscriptionWithDetails(
+                **SubscriptionResponse.from_orm(subscription).model_dump(),
+                fund_name=fund.name,
+                fund_category=fund.category,
+                fund_minimum_amount=fund.minimum_amount
+            ).model_dump(mode="json")),
+        ]
+    
+    @staticmethod
+    def _publish_events(user_id: int, balance: float, payloads: list) -> None:
+        event_broker.publish(user_id, "balance", {"user_id": user_id, "balance": balance})
+        for event_type, data in payloads:
+            event_broker.publish(user_id, event_type, data)
+    
     def get_user_transactions(
         self, 
         user_id: int, 
-        limit: int = 50, 
-        offset: int = 0,
-        transaction_type: Optional[str] = None
+        filters: Optional[TransactionHistoryFilter] = None,
+        include_archived: bool = False
     ) -> List[TransactionWithDetails]:
-        """Obtener historial de transacciones del usuario"""
+        """Obtener historial de transacciones del usuario
         
-        query = self.db.query(Transaction).filter(Transaction.user_id == user_id)
+        Todos los filtros se resuelven con rangos sobre los índices
+        (user_id, [tipo | fondo], created_at). Con `filters.cursor` la página se
+        obtiene por clave (created_at, id) en lugar de OFFSET. Con
+        `include_archived` la paginación continúa en el archivo frío cuando se
+        agotan las transacciones de la tabla caliente.
+        """
+        filters = filters or TransactionHistoryFilter()
+        limit = filters.limit
+        offset = 0 if filters.cursor else filters.offset
         
-        if transaction_type:
-            query = query.filter(Transaction.transaction_type == transaction_type)
+        rows = self._history_query(Transaction, user_id, filters).offset(offset).limit(limit).all()
         
-        transactions = query.order_by(desc(Transaction.created_at)).offset(offset).limit(limit).all()
+        if include_archived and len(rows) < limit:
+            # Desplazamiento restante dentro del archivo, descontando las filas calientes
+            archive_offset = 0
+            if offset > 0:
+                hot_count = self._history_filter(
+                    self.db.query(func.count(Transaction.id)), Transaction, user_id, filters
+                ).scalar()
+                archive_offset = max(offset - hot_count, 0)
+            
+            rows += self._history_query(
+                TransactionArchive, user_id, filters
+            ).offset(archive_offset).limit(limit - len(rows)).all()
         
         # Convertir a schema con detalles
         transactions_with_details = []
-        for transaction in transactions:
-            fund = self.fund_service.get_fund_by_id(transaction.fund_id)
-            user = self.db.query(User).filter(User.id == transaction.user_id).first()
-            
+        for transaction, fund_name, fund_category, user_name, user_email in rows:
             transaction_detail = TransactionWithDetails(
                 id=transaction.id,
                 transaction_id=transaction.transaction_id,
@@ -167,18 +482,111 @@ class TransactionService:
                 status=transaction.status,
                 description=transaction.description,
                 created_at=transaction.created_at,
-                fund_name=fund.name if fund else "Fondo no encontrado",
-                fund_category=fund.category if fund else "",
-                user_name=user.name if user else "Usuario no encontrado",
-                user_email=user.email if user else ""
+                fund_name=fund_name or "Fondo no encontrado",
+                fund_category=fund_category or "",
+                user_name=user_name or "Usuario no encontrado",
+                user_email=user_email or ""
             )
             transactions_with_details.append(transaction_detail)
         
         return transactions_with_details
     
-    def get_transaction_by_id(self, transaction_id: str, user_id: int) -> Optional[Transaction]:
-        """Obtener transacción por ID"""
-        return self.db.query(Transaction).filter(
+    def get_transaction_history_page(
+        self,
+        user_id: int,
+        filters: Optional[TransactionHistoryFilter] = None,
+        include_archived: bool = False
+    ) -> HistoryPage:
+        """Página del historial serializada, servida desde caché mientras el usuario no escriba
+        
+        Una página en caché no ejecuta la consulta del historial ni valida
+        modelos: solo se comprueba la versión del usuario (sin SQL si el
+        listener de PostgreSQL está activo).
+        """
+        filters = filters or TransactionHistoryFilter()
+        
+        def render() -> HistoryPage:
+            transactions = self.get_user_transactions(user_id, filters, include_archived)
+            next_cursor = None
+            if len(transactions) == filters.limit:
+                last = transactions[-1]
+                next_cursor = encode_cursor(last.created_at, last.id)
+            return HistoryPage(_history_adapter.dump_json(transactions), next_cursor)
+        
+        if not settings.history_cache_enabled:
+            return render()
+        
+        key = (user_id, include_archived, *filters.model_dump().values())
+        page, cached = _history_pages.get_or_load(self.db, key, user_key(user_id), render)
+        HISTORY_CACHE_REQUESTS.labels("hit" if cached else "miss").inc()
+        return page
+    
+    @staticmethod
+    def _history_filter(query, model, user_id: int, filters: TransactionHistoryFilter):
+        query = query.filter(model.user_id == user_id)
+        
+        if filters.transaction_type:
+            query = query.filter(model.transaction_type == filters.transaction_type)
+        if filters.fund_id:
+            query = query.filter(model.fund_id == filters.fund_id)
+        if filters.start_date:
+            query = query.filter(model.created_at >= filters.start_date)
+        if filters.end_date:
+            query = query.filter(model.created_at <= filters.end_date)
+        
+        if filters.cursor:
+            cursor_created_at, cursor_id = decode_cursor(filters.cursor)
+            # La cota `<=` redundante permite al planificador usar el índice como
+            # rango aunque la condición (created_at, id) vaya con parámetros
+            query = query.filter(
+                model.created_at <= cursor_created_at,
+                or_(
+                    model.created_at < cursor_created_at,
+                    and_(model.created_at == cursor_created_at, model.id < cursor_id)
+                )
+            )
+        
+        return query
+    
+    def _history_query(self, model, user_id: int, filters: TransactionHistoryFilter):
+        """Historial ordenado de `model` (tabla caliente o archivo) con fondo y usuario"""
+        # Un solo JOIN en lugar de consultar fondo y usuario por cada fila
+        query = self.db.query(
+            model,
+            Fund.name,
+            Fund.category,
+            User.name,
+            User.email
+        ).outerjoin(
+            Fund, Fund.id == model.fund_id
+        ).outerjoin(
+            User, User.id == model.user_id
+        )
+        
+        query = self._history_filter(query, model, user_id, filters)
+        return query.order_by(desc(model.created_at), desc(model.id))
+    
+    def get_transaction_by_id(
+        self,
+        transaction_id: str,
+        user_id: int,
+        include_archived: bool = False
+    ) -> Optional[Transaction]:
+        """Obtener transacción por ID, buscando en el archivo solo si se solicita"""
+        try:
+            uuid.UUID(transaction_id)
+        except ValueError:
+            return None
+        
+        transaction = self.db.query(Transaction).filter(
             Transaction.transaction_id == transaction_id,
             Transaction.user_id == user_id
-        ).first()
\ No newline at end of file
+        ).first()
+        
+        if transaction is None and include_archived:
+            transaction = self.db.query(TransactionArchive).filter(
+                TransactionArchive.transaction_id == transaction_id,
+                TransactionArchive.user_id == user_id
+            ).first()
+        
+        return transaction
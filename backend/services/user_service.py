@@ -2,18 +2,50 @@
 Servicio para gestión de usuarios
 """
 
-from typing import Optional
+from itertools import islice
+from typing import Iterable, Iterator, Optional, Sequence, Set, Tuple, Union
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
 from models.user import User
-from schemas.user import UserCreate, UserResponse
+from schemas.user import BulkUserChunkResult, BulkUserError, UserCreate, UserResponse
 from core.config import settings
+from database.instrumentation import allow_repeated_queries
+from services.cache_service import BoundedVersionedCache, bump_versions, user_key
+from services.single_flight_service import SingleFlight
+
+
+# Coste aproximado de un perfil en caché (clave, modelo y sus cadenas)
+_PROFILE_ENTRY_BYTES = 1024
+
+# Perfiles servidos desde memoria mientras su sello de versión no cambie; LRU
+# acotada para que no crezca con cada usuario que atiende el worker
+_profile_cache = BoundedVersionedCache(settings.profile_cache_max_bytes, lambda profile: _PROFILE_ENTRY_BYTES)
+_profile_flight = SingleFlight("user_profile")
+
+
+def lock_users(db: Session, user_ids: Iterable[int]) -> None:
+    """Serializar las escrituras sobre estos usuarios hasta el fin de la transacción
+    
+    Un UPDATE sin cambios toma el bloqueo de las filas en PostgreSQL y el de
+    escritura de la base en SQLite, que en WAL además exige partir del último
+    estado confirmado. Lo que se lea después en la misma transacción (saldo,
+    suscripciones activas) ya no puede quedar obsoleto por otra petición.
+    """
+    db.execute(
+        update(User).where(User.id.in_(list(user_ids))).values(balance=User.balance),
+        execution_options={"synchronize_session": False}
+    )
 
 
 class UserService:
     """Servicio para gestión de usuarios"""
     
+    _default_user_id: Optional[int] = None
+    
     def __init__(self, db: Session):
         self.db = db
     
@@ -36,6 +68,27 @@ class UserService:
         
         return user
     
+    def get_default_user_id(self) -> int:
+        """ID del usuario por defecto; se resuelve una vez por proceso"""
+        if UserService._default_user_id is None:
+            UserService._default_user_id = self.get_default_user().id
+        return UserService._default_user_id
+    
+    def get_user_profile(self, user_id: int) -> Optional[UserResponse]:
+        """Obtener el perfil del usuario, desde caché si sigue vigente"""
+        def load():
+            user = self.get_user_by_id(user_id)
+            return UserResponse.from_orm(user) if user else None
+        
+        profile, _ = _profile_cache.get_or_load(self.db, user_id, user_key(user_id), load)
+        return profile
+    
+    async def get_user_profile_coalesced(self, user_id: int) -> Optional[UserResponse]:
+        """Como get_user_profile, compartiendo la lectura entre peticiones simultáneas"""
+        if not settings.single_flight_enabled:
+            return self.get_user_profile(user_id)
+        return await _profile_flight.do(user_id, lambda db: UserService(db).get_user_profile(user_id))
+    
     def get_user_by_id(self, user_id: int) -> Optional[User]:
         """Obtener usuario por ID"""
         return self.db.query(User).filter(
@@ -76,6 +129,117 @@ class UserService:
         
         return user
     
+    def create_users_bulk(
+        self,
+        items: Sequence[Tuple[int, Union[dict, str, bytes]]],
+        seen_emails: Optional[Set[str]] = None
+    ) -> BulkUserChunkResult:
+        """Crear un lote de usuarios con una sola consulta de duplicados y un solo INSERT
+        
+        `items` son pares (posición en la carga, usuario); el usuario puede venir
+        como diccionario o como JSON sin parsear. Los inválidos y los duplicados
+        se reportan por posición sin detener el lote. `seen_emails` acumula los
+        emails de los lotes anteriores de la misma carga.
+        """
+        result = BulkUserChunkResult()
+        seen = seen_emails if seen_emails is not None else set()
+        
+        candidates = []
+        for index, data in items:
+            try:
+                if isinstance(data, (str, bytes)):
+                    user_data = UserCreate.model_validate_json(data)
+                else:
+                    user_data = UserCreate.model_validate(data)
+            except ValidationError as error:
+                result.invalid += 1
+                result.errors.append(BulkUserError(
+                    index=index,
+                    email=data.get("email") if isinstance(data, dict) else None,
+                    status="invalid",
+                    error="; ".join(
+                        f"{'.'.join(map(str, detail['loc'])) or 'usuario'}: {detail['msg']}"
+                        for detail in error.errors()
+                    )
+                ))
+                continue
+            
+            if user_data.email in seen:
+                result.duplicates += 1
+                result.errors.append(BulkUserError(
+                    index=index, email=user_data.email, status="duplicate", error="Email repetido en la carga"
+                ))
+                continue
+            seen.add(user_data.email)
+            candidates.append((index, user_data))
+        
+        # Una consulta por lote; sin filtrar por is_active porque el índice único tampoco lo hace
+        existing = set(self.db.execute(
+            select(User.email).where(User.email.in_([user_data.email for _, user_data in candidates]))
+        ).scalars()) if candidates else set()
+        
+        rows = []
+        for index, user_data in candidates:
+            if user_data.email in existing:
+                result.duplicates += 1
+                result.errors.append(BulkUserError(
+                    index=index, email=user_data.email, status="duplicate", error="El email ya está registrado"
+                ))
+            else:
+                rows.append((index, {
+                    "name": user_data.name,
+                    "email": user_data.email,
+                    "phone": user_data.phone,
+                    "balance": settings.initial_balance,
+                    "notification_preference": user_data.notification_preference,
+                }))
+        
+        if rows:
+            try:
+                # RETURNING sin orden garantizado (así no degrada a una fila por
+                # sentencia): los IDs se asocian por email
+                ids_by_email = dict(self.db.execute(
+                    insert(User).returning(User.email, User.id),
+                    [values for _, values in rows]
+                ).all())
+                self.db.commit()
+                result.created_ids = [ids_by_email[values["email"]] for _, values in rows]
+            except IntegrityError:
+                # Otro proceso registró alguno de los emails tras la consulta
+                self.db.rollback()
+                self._create_users_one_by_one(rows, result)
+            result.created = len(result.created_ids)
+        
+        result.errors.sort(key=lambda error: error.index)
+        return result
+    
+    def _create_users_one_by_one(self, rows: Sequence[Tuple[int, dict]], result: BulkUserChunkResult) -> None:
+        for index, values in rows:
+            try:
+                result.created_ids.append(
+                    self.db.execute(insert(User).returning(User.id), values).scalar_one()
+                )
+                self.db.commit()
+            except IntegrityError:
+                self.db.rollback()
+                result.duplicates += 1
+                result.errors.append(BulkUserError(
+                    index=index, email=values["email"], status="duplicate", error="El email ya está registrado"
+                ))
+    
+    def import_users(self, users: Iterable[Union[dict, str, bytes]], chunk_size: int) -> Iterator[BulkUserChunkResult]:
+        """Crear usuarios por lotes de `chunk_size`, confirmando y reportando cada lote"""
+        numbered = enumerate(users)
+        seen_emails: Set[str] = set()
+        while True:
+            chunk = list(islice(numbered, chunk_size))
+            if not chunk:
+                return
+            # Cada lote repite las mismas dos sentencias: no es un N+1
+            with allow_repeated_queries():
+                result = self.create_users_bulk(chunk, seen_emails)
+            yield result
+    
     def update_notification_preference(self, user_id: int, preference: str) -> User:
         """Actualizar preferencia de notificación del usuario"""
         user = self.get_user_by_id(user_id)
@@ -93,6 +257,7 @@ class UserService:
             )
         
         user.notification_preference = preference
+        bump_versions(self.db, [user_key(user.id)])
         self.db.commit()
         self.db.refresh(user)
         
@@ -113,6 +278,7 @@ class UserService:
         if phone:
             user.phone = phone
         
+        bump_versions(self.db, [user_key(user.id)])
         self.db.commit()
         self.db.refresh(user)
         
@@ -0,0 +1,298 @@
+"""
+Motor de valoración diaria (NAV) de las suscripciones activas
+
+Carga en arreglos de NumPy la serie de rentabilidades diarias de cada fondo y
+todas las suscripciones activas, y calcula el valor de mercado de todas las
+posiciones en una sola pasada vectorizada:
+
+    valor = monto * índice[fondo, día de valoración] / índice[fondo, día de suscripción]
+
+donde `índice[f, d]` es el producto acumulado de (1 + rentabilidad) del fondo
+hasta el día d. Una suscripción no gana la rentabilidad del día en que se
+hizo, y los días sin rentabilidad registrada cuentan como 0 %. Cada aporte
+programado es un lote aparte que empieza a rentar en su propia fecha, y el
+valor de la suscripción es la suma de sus lotes. El resultado se guarda como
+un snapshot por fecha en `subscription_valuations`.
+
+NumPy se importa dentro de las funciones que lo usan, como en el servicio de
+proyecciones, para que importar este módulo no lo cargue.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from itertools import islice, repeat
+from typing import TYPE_CHECKING
+
+from sqlalchemy import String, and_, func, select
+from sqlalchemy.orm import Session
+
+from database.bulk import BulkWriter
+from models.fund_return import FundReturn
+from models.subscription import Subscription
+from models.subscription_valuation import SubscriptionValuation
+from models.transaction import Transaction
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+SNAPSHOT_COLUMNS = (
+    "valuation_date", "subscription_id", "user_id", "fund_id",
+    "principal", "market_value", "accrued_return",
+)
+
+
+def growth_index(returns: np.ndarray) -> np.ndarray:
+    """Índice acumulado por fondo (filas) y día (columnas)"""
+    import numpy as np
+
+    return np.cumprod(1.0 + returns, axis=1)
+
+
+def value_positions(growth: np.ndarray, fund_rows: np.ndarray, start_days: np.ndarray,
+                    amounts: np.ndarray, valuation_day: int) -> np.ndarray:
+    """Valor de mercado de cada posición al cierre de `valuation_day`"""
+    return amounts * growth[fund_rows, valuation_day] / growth[fund_rows, start_days]
+
+
+def _empty(dtype: str) -> np.ndarray:
+    import numpy as np
+
+    return np.empty(0, dtype=dtype)
+
+
+@dataclass
+class Positions:
+    """Suscripciones activas como columnas de NumPy
+
+    `amounts` incluye los aportes programados ya cobrados; cada aporte está
+    además en los arreglos `lot_*`, con la fila de su suscripción y su fecha.
+    """
+    ids: np.ndarray
+    user_ids: np.ndarray
+    fund_ids: np.ndarray
+    amounts: np.ndarray
+    start_dates: np.ndarray  # datetime64[D]
+    lot_rows: np.ndarray = field(default_factory=lambda: _empty("int64"))
+    lot_amounts: np.ndarray = field(default_factory=lambda: _empty("float64"))
+    lot_dates: np.ndarray = field(default_factory=lambda: _empty("datetime64[D]"))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def initial_amounts(self) -> np.ndarray:
+        """Monto de cada suscripción sin sus aportes programados"""
+        import numpy as np
+
+        return self.amounts - np.bincount(self.lot_rows, self.lot_amounts, minlength=len(self))
+
+    def principal(self, valuation_date: date) -> np.ndarray:
+        """Capital de cada suscripción al cierre de `valuation_date`"""
+        import numpy as np
+
+        included = self.lot_dates <= np.datetime64(valuation_date, "D")
+        return self.initial_amounts() + np.bincount(
+            self.lot_rows[included], self.lot_amounts[included], minlength=len(self)
+        )
+
+
+class ValuationService:
+    """Valoración de todas las posiciones activas a una fecha"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load_positions(self, valuation_date: date, partition_size: int = 100000) -> Positions:
+        """Suscripciones activas abiertas hasta `valuation_date` inclusive
+
+        Lee por Core en particiones que pasan directo a columnas de NumPy, sin
+        materializar una fila de la ORM por posición.
+        """
+        import numpy as np
+
+        result = self.db.connection().execution_options(yield_per=partition_size).execute(
+            select(
+                Subscription.id,
+                Subscription.user_id,
+                Subscription.fund_id,
+                Subscription.amount,
+                # Texto en SQLite y date en PostgreSQL: NumPy interpreta ambos
+                func.date(Subscription.subscribed_at, type_=String)
+            ).where(
+                Subscription.is_active == True,
+                Subscription.subscribed_at < valuation_date + timedelta(days=1)
+            )
+        )
+
+        dtypes = (np.int64, np.int64, np.int64, np.float64, "datetime64[D]")
+        columns = [[] for _ in dtypes]
+        for partition in result.partitions():
+            for parts, values, dtype in zip(columns, zip(*partition), dtypes):
+                parts.append(np.array(values, dtype=dtype))
+
+        positions = Positions(*(
+            np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+            for parts, dtype in zip(columns, dtypes)
+        ))
+        self._load_contribution_lots(positions, valuation_date)
+        return positions
+
+    def _load_contribution_lots(self, positions: Positions, valuation_date: date) -> None:
+        """Aportes programados de las suscripciones cargadas, como lotes con su propia fecha
+
+        Los aportes se registran como transacciones del usuario en el fondo; los
+        de la suscripción activa son los posteriores a su fecha de suscripción.
+        Se cargan todos, también los posteriores a `valuation_date`, para
+        descontarlos del monto de la suscripción.
+        """
+        import numpy as np
+
+        if not len(positions):
+            return
+
+        rows = self.db.execute(
+            select(
+                Subscription.id,
+                Transaction.amount,
+                func.date(Transaction.created_at, type_=String)
+            ).join(
+                Transaction, and_(
+                    Transaction.user_id == Subscription.user_id,
+                    Transaction.fund_id == Subscription.fund_id,
+                    Transaction.created_at >= Subscription.subscribed_at
+                )
+            ).where(
+                Subscription.is_active == True,
+                Subscription.subscribed_at < valuation_date + timedelta(days=1),
+                Transaction.transaction_type == "contribution"
+            )
+        ).all()
+        if not rows:
+            return
+
+        subscription_ids, amounts, dates = zip(*rows)
+        order = np.argsort(positions.ids)
+        positions.lot_rows = order[np.searchsorted(positions.ids, np.array(subscription_ids, dtype=np.int64),
+                                                   sorter=order)]
+        positions.lot_amounts = np.array(amounts, dtype=np.float64)
+        positions.lot_dates = np.array(dates, dtype="datetime64[D]")
+
+    def load_returns(self, fund_ids: np.ndarray, first_date: date, valuation_date: date) -> np.ndarray:
+        """Matriz de rentabilidades (fondo × día) entre las dos fechas, con 0 donde no hay dato"""
+        import numpy as np
+
+        days = (valuation_date - first_date).days + 1
+        returns = np.zeros((len(fund_ids), days))
+
+        rows = self.db.execute(
+            select(FundReturn.fund_id, FundReturn.date, FundReturn.daily_return).where(
+                FundReturn.fund_id.in_(fund_ids.tolist()),
+                FundReturn.date >= first_date,
+                FundReturn.date <= valuation_date
+            )
+        ).all()
+
+        if rows:
+            series_funds, series_dates, series_returns = zip(*rows)
+            fund_rows = np.searchsorted(fund_ids, np.array(series_funds, dtype=np.int64))
+            day_columns = (
+                np.array(series_dates, dtype="datetime64[D]") - np.datetime64(first_date, "D")
+            ).astype(np.int64)
+            returns[fund_rows, day_columns] = series_returns
+
+        return returns
+
+    def value(self, positions: Positions, valuation_date: date) -> np.ndarray:
+        """Valor de mercado de todas las posiciones, redondeado a centavos"""
+        import numpy as np
+
+        if not len(positions):
+            return np.empty(0)
+
+        first_date = positions.start_dates.min().astype(date)
+        fund_ids = np.unique(positions.fund_ids)
+        growth = growth_index(self.load_returns(fund_ids, first_date, valuation_date))
+
+        fund_rows = np.searchsorted(fund_ids, positions.fund_ids)
+        start_days = (positions.start_dates - np.datetime64(first_date, "D")).astype(np.int64)
+        valuation_day = (valuation_date - first_date).days
+
+        values = value_positions(growth, fund_rows, start_days, positions.initial_amounts(), valuation_day)
+
+        # Aportes hasta la fecha de valoración, cada uno desde su propio día
+        included = positions.lot_dates <= np.datetime64(valuation_date, "D")
+        if included.any():
+            lot_rows = positions.lot_rows[included]
+            lot_days = (positions.lot_dates[included] - np.datetime64(first_date, "D")).astype(np.int64)
+            lot_values = value_positions(
+                growth, fund_rows[lot_rows], lot_days, positions.lot_amounts[included], valuation_day
+            )
+            values += np.bincount(lot_rows, lot_values, minlength=len(positions))
+        return np.round(values, 2)
+
+    def write_snapshot(self, valuation_date: date, positions: Positions, values: np.ndarray,
+                       chunk_size: int = 50000) -> int:
+        """Reemplazar el snapshot de `valuation_date` en una sola transacción
+
+        Escribe por DBAPI (COPY en PostgreSQL) en lugar de construir objetos
+        o diccionarios por fila.
+        """
+        import numpy as np
+
+        principal = np.round(positions.principal(valuation_date), 2)
+        accrued = np.round(values - principal, 2)
+        rows = zip(
+            repeat(valuation_date),
+            positions.ids.tolist(),
+            positions.user_ids.tolist(),
+            positions.fund_ids.tolist(),
+            principal.tolist(),
+            values.tolist(),
+            accrued.tolist(),
+        )
+
+        writer = BulkWriter(self.db.get_bind())
+        written = 0
+        try:
+            writer.execute(
+                f"DELETE FROM {SubscriptionValuation.__tablename__} WHERE valuation_date = {{p}}",
+                (valuation_date,)
+            )
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                writer.write(SubscriptionValuation.__tablename__, SNAPSHOT_COLUMNS, chunk)
+                written += len(chunk)
+            writer.commit()
+        except Exception:
+            writer.rollback()
+            raise
+        finally:
+            writer.close()
+
+        return written
+
+    def run(self, valuation_date: date) -> dict:
+        """Valorar todas las posiciones activas y guardar el snapshot"""
+        started = time.perf_counter()
+        positions = self.load_positions(valuation_date)
+        loaded = time.perf_counter()
+        values = self.value(positions, valuation_date)
+        computed = time.perf_counter()
+        written = self.write_snapshot(valuation_date, positions, values)
+        finished = time.perf_counter()
+
+        return {
+            "valuation_date": valuation_date.isoformat(),
+            "positions": written,
+            "principal": round(float(positions.principal(valuation_date).sum()), 2),
+            "market_value": round(float(values.sum()), 2),
+            "load_seconds": round(loaded - started, 3),
+            "compute_seconds": round(computed - loaded, 3),
+            "write_seconds": round(finished - computed, 3),
+        }
+
@@ -25,6 +25,26 @@ export default function HomePage() {
     loadInitialData()
   }, [])
 
+  // Actualizaciones en vivo en lugar de volver a consultar el API
+  useEffect(() => {
+    return apiService.events.subscribe({
+      onBalance: ({ balance }) => {
+        setUser(current => current ? { ...current, balance } : current)
+        setBalance((current: any) => current ? { ...current, balance } : current)
+      },
+      onTransaction: (transaction) => {
+        setTransactions(current => [transaction, ...current.filter(t => t.id !== transaction.id)].slice(0, 10))
+      },
+      onSubscription: (subscription) => {
+        setSubscriptions(current => {
+          const others = current.filter(s => s.id !== subscription.id)
+          return subscription.is_active ? [...others, subscription] : others
+        })
+      },
+      onResync: () => loadInitialData(),
+    })
+  }, [])
+
   const loadInitialData = async () => {
     try {
       setLoading(true)
@@ -159,6 +159,13 @@ export function FundsTab({ funds, subscriptions, onUpdate }: FundsTabProps) {
                   </div>
                   <CardDescription>
                     Invertido: {formatCurrency(subscription.amount)}
+                    {subscription.market_value != null && (
+                      <>
+                        {' · '}Valor: {formatCurrency(subscription.market_value)}
+                        {' ('}{(subscription.accrued_return ?? 0) >= 0 ? '+' : ''}
+                        {formatCurrency(subscription.accrued_return ?? 0)})
+                      </>
+                    )}
                   </CardDescription>
                 </CardHeader>
                 <CardContent>
@@ -14,7 +14,7 @@ import {
   DialogTitle,
   DialogTrigger,
 } from '@/components/ui/dialog'
-import { History, ArrowUpCircle, ArrowDownCircle, X, AlertTriangle } from 'lucide-react'
+import { History, ArrowUpCircle, ArrowDownCircle, Repeat, X, AlertTriangle } from 'lucide-react'
 import { formatCurrency, formatDate } from '@/lib/utils'
 import { useToast } from '@/components/ui/use-toast'
 import apiService from '@/services/api'
@@ -27,7 +27,7 @@ interface TransactionsTabProps {
 }
 
 export function TransactionsTab({ transactions, subscriptions, onUpdate }: TransactionsTabProps) {
-  const [filter, setFilter] = useState<'all' | 'subscription' | 'cancellation'>('all')
+  const [filter, setFilter] = useState<'all' | 'subscription' | 'cancellation' | 'contribution'>('all')
   const [selectedSubscription, setSelectedSubscription] = useState<Subscription | null>(null)
   const [isCancelling, setIsCancelling] = useState(false)
   const [isDialogOpen, setIsDialogOpen] = useState(false)
@@ -68,12 +68,39 @@ export function TransactionsTab({ transactions, subscriptions, onUpdate }: Trans
     }
   }
 
+  const handleCancelAll = async () => {
+    if (!window.confirm('¿Cancelar todas las suscripciones activas? El monto invertido se devolverá a su saldo.')) return
+
+    setIsCancelling(true)
+    try {
+      const result = await apiService.subscriptions.cancelAll()
+
+      toast({
+        title: "¡Liquidación exitosa!",
+        description: `Se cancelaron ${result.cancelled_count} suscripciones por ${formatCurrency(result.total_refunded)}`,
+      })
+
+      onUpdate()
+    } catch (error: any) {
+      console.error('Error cancelling all subscriptions:', error)
+      toast({
+        title: "Error en la liquidación",
+        description: error.response?.data?.detail || "No se pudieron cancelar las suscripciones",
+        variant: "destructive",
+      })
+    } finally {
+      setIsCancelling(false)
+    }
+  }
+
   const getTransactionIcon = (type: string) => {
     switch (type) {
       case 'subscription':
         return <ArrowUpCircle className="h-4 w-4 text-green-600" />
       case 'cancellation':
         return <ArrowDownCircle className="h-4 w-4 text-red-600" />
+      case 'contribution':
+        return <Repeat className="h-4 w-4 text-blue-600" />
       default:
         return <History className="h-4 w-4" />
     }
@@ -85,6 +112,8 @@ export function TransactionsTab({ transactions, subscriptions, onUpdate }: Trans
         return 'text-green-600'
       case 'cancellation':
         return 'text-red-600'
+      case 'contribution':
+        return 'text-blue-600'
       default:
         return 'text-gray-600'
     }
@@ -95,7 +124,15 @@ export function TransactionsTab({ transactions, subscriptions, onUpdate }: Trans
       {/* Active Subscriptions for Cancellation */}
       {activeSubscriptions.length > 0 && (
         <div>
-          <h3 className="text-lg font-semibold mb-4">Cancelar Suscripciones</h3>
+          <div className="flex items-center justify-between mb-4">
+            <h3 className="text-lg font-semibold">Cancelar Suscripciones</h3>
+            {activeSubscriptions.length > 1 && (
+              <Button variant="destructive" size="sm" onClick={handleCancelAll} disabled={isCancelling}>
+                <X className="h-4 w-4 mr-2" />
+                Cancelar todas
+              </Button>
+            )}
+          </div>
           <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
             {activeSubscriptions.map((subscription) => (
               <Card key={subscription.id}>
@@ -146,6 +183,7 @@ export function TransactionsTab({ transactions, subscriptions, onUpdate }: Trans
               <SelectItem value="all">Todas las transacciones</SelectItem>
               <SelectItem value="subscription">Solo suscripciones</SelectItem>
               <SelectItem value="cancellation">Solo cancelaciones</SelectItem>
+              <SelectItem value="contribution">Solo aportes programados</SelectItem>
             </SelectContent>
           </Select>
         </div>
@@ -160,7 +198,7 @@ export function TransactionsTab({ transactions, subscriptions, onUpdate }: Trans
               <p className="text-sm text-muted-foreground text-center">
                 {filter === 'all' 
                   ? 'Aún no has realizado ninguna transacción.'
-                  : `No hay transacciones de tipo ${filter === 'subscription' ? 'suscripción' : 'cancelación'}.`
+                  : `No hay transacciones de tipo ${{ subscription: 'suscripción', cancellation: 'cancelación', contribution: 'aporte programado' }[filter]}.`
                 }
               </p>
             </CardContent>
@@ -185,7 +223,7 @@ export function TransactionsTab({ transactions, subscriptions, onUpdate }: Trans
                     
                     <div className="text-right">
                       <p className={`font-semibold ${getTransactionColor(transaction.transaction_type)}`}>
-                        {transaction.transaction_type === 'subscription' ? '-' : '+'}
+                        {transaction.transaction_type === 'cancellation' ? '+' : '-'}
                         {formatCurrency(transaction.amount)}
                       </p>
                       <p className="text-sm text-muted-foreground">
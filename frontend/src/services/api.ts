@@ -6,9 +6,23 @@ import type {
   Transaction, 
   SubscriptionRequest, 
   CancellationRequest, 
-  EligibilityCheck 
+  EligibilityCheck,
+  FundEligibility,
+  BalanceEvent,
+  BulkCancellationRequest,
+  BulkCancellationResult,
+  PortfolioProjection,
+  RecurringContribution,
+  RecurringContributionRequest
 } from '@/types'
 
+export interface EventHandlers {
+  onBalance?: (event: BalanceEvent) => void
+  onTransaction?: (transaction: Transaction) => void
+  onSubscription?: (subscription: Subscription) => void
+  onResync?: () => void
+}
+
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
 
 const api = axios.create({
@@ -38,6 +52,18 @@ export const apiService = {
     
     updateNotificationPreference: (preference: 'email' | 'sms'): Promise<User> =>
       api.put('/user/notification-preference', { notification_preference: preference }).then(res => res.data),
+    
+    getPortfolioProjection: (years = 10, paths = 10000): Promise<PortfolioProjection> =>
+      api.get('/user/portfolio/projection', { params: { years, paths } }).then(res => res.data),
+    
+    getRecurringContributions: (): Promise<RecurringContribution[]> =>
+      api.get('/user/recurring-contributions').then(res => res.data),
+    
+    scheduleRecurringContribution: (data: RecurringContributionRequest): Promise<RecurringContribution> =>
+      api.post('/user/recurring-contributions', data).then(res => res.data),
+    
+    cancelRecurringContribution: (id: number): Promise<RecurringContribution> =>
+      api.delete(`/user/recurring-contributions/${id}`).then(res => res.data),
   },
 
   // Funds endpoints
@@ -50,6 +76,16 @@ export const apiService = {
     
     checkEligibility: (fundId: number, amount: number): Promise<EligibilityCheck> =>
       api.get(`/funds/${fundId}/eligibility?amount=${amount}`).then(res => res.data),
+    
+    checkEligibilityAll: (amount?: number, fundAmounts?: Record<number, number>): Promise<FundEligibility[]> =>
+      api.get('/funds/eligibility', {
+        params: {
+          amount,
+          amounts: fundAmounts
+            ? Object.entries(fundAmounts).map(([fundId, value]) => `${fundId}:${value}`).join(',')
+            : undefined,
+        },
+      }).then(res => res.data),
   },
 
   // Subscriptions endpoints
@@ -62,6 +98,9 @@ export const apiService = {
     
     cancel: (data: CancellationRequest): Promise<Transaction> =>
       api.post('/cancellations', data).then(res => res.data),
+    
+    cancelAll: (data?: BulkCancellationRequest): Promise<BulkCancellationResult> =>
+      api.post('/subscriptions/cancel-all', data ?? {}).then(res => res.data),
   },
 
   // Transactions endpoints
@@ -69,13 +108,28 @@ export const apiService = {
     getHistory: (params?: {
       limit?: number
       offset?: number
-      transaction_type?: 'subscription' | 'cancellation'
+      transaction_type?: 'subscription' | 'cancellation' | 'contribution'
     }): Promise<Transaction[]> =>
       api.get('/transactions', { params }).then(res => res.data),
     
     getById: (transactionId: string): Promise<Transaction> =>
       api.get(`/transactions/${transactionId}`).then(res => res.data),
   },
+
+  // Stream de eventos (SSE): saldo, transacciones y suscripciones
+  events: {
+    subscribe: (handlers: EventHandlers): (() => void) => {
+      const source = new EventSource(`${API_BASE_URL}/api/v1/events`)
+      const parse = (event: MessageEvent) => JSON.parse(event.data)
+
+      source.addEventListener('balance', (event) => handlers.onBalance?.(parse(event as MessageEvent)))
+      source.addEventListener('transaction', (event) => handlers.onTransaction?.(parse(event as MessageEvent)))
+      source.addEventListener('subscription', (event) => handlers.onSubscription?.(parse(event as MessageEvent)))
+      source.addEventListener('resync', () => handlers.onResync?.())
+
+      return () => source.close()
+    },
+  },
 }
 
 export default apiService
\ No newline at end of file
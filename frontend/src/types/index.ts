@@ -34,6 +34,9 @@ export interface Subscription {
   fund_name?: string
   fund_category?: string
   fund_minimum_amount?: number
+  market_value?: number | null
+  accrued_return?: number | null
+  valued_at?: string | null
 }
 
 export interface Transaction {
@@ -41,7 +44,7 @@ export interface Transaction {
   transaction_id: string
   user_id: number
   fund_id: number
-  transaction_type: 'subscription' | 'cancellation'
+  transaction_type: 'subscription' | 'cancellation' | 'contribution'
   amount: number
   status: string
   description?: string
@@ -52,6 +55,11 @@ export interface Transaction {
   user_email?: string
 }
 
+export interface BalanceEvent {
+  user_id: number
+  balance: number
+}
+
 export interface SubscriptionRequest {
   fund_id: number
   amount: number
@@ -62,6 +70,18 @@ export interface CancellationRequest {
   subscription_id: number
 }
 
+export interface BulkCancellationRequest {
+  fund_ids?: number[]
+  category?: 'FPV' | 'FIC'
+}
+
+export interface BulkCancellationResult {
+  cancelled_count: number
+  total_refunded: number
+  balance: number
+  transactions: Transaction[]
+}
+
 export interface EligibilityCheck {
   eligible: boolean
   message: string
@@ -70,6 +90,69 @@ export interface EligibilityCheck {
   fund_minimum: number
 }
 
+export interface FundEligibility extends EligibilityCheck {
+  fund_id: number
+  fund_name: string
+}
+
+export interface ProjectionPoint {
+  year: number
+  mean: number
+  p5: number
+  p25: number
+  p50: number
+  p75: number
+  p95: number
+}
+
+export interface ProjectionSeries {
+  category: 'FPV' | 'FIC' | 'total' | string
+  current_value: number
+  points: ProjectionPoint[]
+  probability_of_loss: number
+}
+
+export interface FundAssumption {
+  fund_id: number
+  fund_name: string
+  category: string
+  current_value: number
+  annual_return: number
+  annual_volatility: number
+  source: 'history' | 'default'
+}
+
+export interface PortfolioProjection {
+  years: number
+  paths: number
+  seed: number
+  cached: boolean
+  series: ProjectionSeries[]
+  funds: FundAssumption[]
+  estimated_until?: string | null
+}
+
+export interface RecurringContribution {
+  id: number
+  user_id: number
+  fund_id: number
+  fund_name: string
+  fund_category: string
+  amount: number
+  day_of_month: number
+  next_run_on: string
+  is_active: boolean
+  last_run_at?: string | null
+  last_status?: 'completed' | 'insufficient_funds' | 'subscription_inactive' | null
+  created_at: string
+}
+
+export interface RecurringContributionRequest {
+  fund_id: number
+  amount: number
+  day_of_month: number
+}
+
 export interface ApiResponse<T> {
   data?: T
   message?: string